@@ -13,12 +13,16 @@ To ensure the uniqueness of each component's id, DashBlueprints rely on id prefi
 These prefix are automatically added to the blueprint components' id and 
 to the Inputs, Outputs and States of its callbacks. Though, for outer callbacks,
 the prefix needs to be manually added to the Inputs, Outputs and State ids.
+The forms are the exception: their components get pattern-matching ids (see blueprints/form/form_ids.py/form_id)
+and their callbacks are registered only once for all of them, below.
 
 The only app level variable is the backend data "versioned_data" used to run the calculator.
 The "versioned_data" is loaded when the app is launched and then triggers all the callbacks 
 that require backend data (cores, server, location, carbon intensity and "equivalent" callbacks).
 As the name suggests, this data is versioned to ensure the results replicability accross the
-different versions of the app data.
+different versions of the app data. By default, the store only holds the version token and 
+the callbacks resolve the corresponding data from a process-local registry 
+(see utils/handle_inputs.py/resolve_versioned_data).
 
 Because of our usage of DashBlueprint, we also implemented the pages as blueprints.
 The pages are registered in the app and wrapped within a layout made of the
@@ -28,6 +32,7 @@ This script generates and runs the app.
 '''
 
 import os
+import threading
 import dash
 from flask import send_file # Integrating Loader IO
 
@@ -36,9 +41,12 @@ from dash.dependencies import Input, Output, State
 import dash_mantine_components as dmc
 _dash_renderer._set_react_version("18.2.0")
 
-from utils.handle_inputs import load_data, CURRENT_VERSION, DATA_DIR, get_available_versions, APP_VERSION_OPTIONS_LIST
+from utils.handle_inputs import CURRENT_VERSION, PRELOAD_DATA, get_available_versions, get_versioned_data_store_content, APP_VERSION_OPTIONS_LIST
+from utils.handle_inputs import warm_up_versioned_data, is_versioned_data_ready
 from pages.home import HOME_PAGE, HOME_PAGE_ID_PREFIX
 from pages.ai import AI_PAGE, AI_PAGE_ID_PREFIX
+from blueprints.form.form_blueprint import FORM_CALLBACKS
+from blueprints.api.api_blueprint import get_api_blueprint
 
 
 ###################################################
@@ -77,6 +85,7 @@ server = app.server
 
 HOME_PAGE.register(app, module='home', path='/', title='Green Algorithms - Classic view')
 AI_PAGE.register(app, module='ai', path='/ai', title='Green Algorithms - AI view')
+FORM_CALLBACKS.register_callbacks(app)
 
 
 
@@ -175,7 +184,8 @@ app.layout = dmc.MantineProvider(
             dcc.Store(id=f"{HOME_PAGE_ID_PREFIX}-version_from_input"),
             # Used to forward the version coming from a CSV uploaded to the Ai page 
             dcc.Store(id=f"{AI_PAGE_ID_PREFIX}-version_from_input"),
-            # A dictionnary containing all the backend data used everywhere in the app
+            # The backend data used everywhere in the app, or only its version token
+            # when the data is resolved server-side (see SERVER_SIDE_VERSIONED_DATA)
             dcc.Store(id="versioned_data"),
             # The component storing the url state, only used to trigger callback when the app is loaded
             dcc.Location(id='url_content', refresh='callback-nav'), 
@@ -475,6 +485,8 @@ def display_oldVersion(clicks: int, version: str, oldStyle: dict):
 def load_data_from_version(_, new_version:str):
     """
     Loads all the backend data required to propose consistent options to the user.
+    Depending on SERVER_SIDE_VERSIONED_DATA, the store receives either the data itself
+    or only its version token, the data being then resolved server-side by the callbacks.
     """
     # Collect input version and check validity
     if new_version is None:
@@ -482,13 +494,25 @@ def load_data_from_version(_, new_version:str):
     assert new_version in APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION]
 
     # Load corresponding backend data
-    if new_version == CURRENT_VERSION:
-        new_data = load_data(os.path.join(DATA_DIR, 'latest'), version = CURRENT_VERSION)
-    else:
-        new_data = load_data(os.path.join(DATA_DIR, new_version), version=new_version)
+    return get_versioned_data_store_content(new_version)
+
+
+# Readiness probe, answering 503 until the data is loaded when PRELOAD_DATA is set
+@app.server.route('/ready')
+def readiness():
+    if is_versioned_data_ready():
+        return 'OK', 200
+    return 'Loading data', 503
 
-    return vars(new_data)
+# The data is loaded in the background, so that the server answers the readiness probe in the meantime.
+# The gunicorn master waits for it before forking the workers, which then share it (see gunicorn.conf.py).
+WARM_UP_THREAD = None
+if PRELOAD_DATA:
+    WARM_UP_THREAD = threading.Thread(target=warm_up_versioned_data, name='warm_up_versioned_data', daemon=True)
+    WARM_UP_THREAD.start()
 
+# JSON API, computing footprints without going through the Dash callbacks
+app.server.register_blueprint(get_api_blueprint())
 
 # Loader IO
 @app.server.route('/loaderio-1360e50f4009cc7a15a00c7087429524/')
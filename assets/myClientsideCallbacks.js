@@ -1,3 +1,14 @@
+// Same as MY_COLORS['boxesColor'] in utils/graphics.py
+const BOXES_COLOR = '#F9F9F9';
+
+// Keys of the form state, in the same order as FORM_STATE_INPUTS in blueprints/form/form_blueprint.py
+const FORM_STATE_KEYS = [
+    'runTime_hour', 'runTime_min', 'coreType', 'numberCPUs', 'CPUmodel', 'tdpCPU', 'numberGPUs', 'GPUmodel',
+    'tdpGPU', 'memory', 'platformType', 'usageCPUradio', 'usageCPU', 'usageGPUradio', 'usageGPU', 'PUEradio',
+    'mult_factor_radio', 'mult_factor', 'locationContinent', 'locationCountry', 'locationRegion', 'provider',
+    'serverContinent', 'server', 'PUE'
+];
+
 window.dash_clientside = Object.assign({}, window.dash_clientside, {
     clientside: {
         reset_function: function(clicks) {
@@ -9,6 +20,68 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
             } else {
                 return 'Nope '+String(clicks)
             }
+        },
+
+        // Show or hide an input box (usage factors, PUE, multiplicative factors, R&D trainings), based on Yes/No input
+        display_input_if_yes: function(answer, disabled) {
+            let out = {'display': answer === 'No' ? 'none' : 'block'};
+            if (disabled) {
+                out['background-color'] = BOXES_COLOR;
+            }
+            return out;
+        },
+
+        // Shows or hides the CPU/GPU input blocks (and the titles) based on the selected core type
+        show_CPUGPUdiv: function(selected_coreType) {
+            const show = {'display': 'block'};
+            const showFlex = {'display': 'flex'};
+            const hide = {'display': 'none'};
+            if (selected_coreType === 'CPU') {
+                return [show, hide, showFlex, hide, hide, hide];
+            } else if (selected_coreType === 'GPU') {
+                return [hide, hide, hide, show, hide, showFlex];
+            } else {
+                return [show, show, showFlex, show, show, showFlex];
+            }
+        },
+
+        // Shows or hides the TDP input box of the CPUs or GPUs
+        display_TDP_input: function(selected_coreModel) {
+            return {'display': selected_coreModel === 'other' ? 'flex' : 'none'};
+        },
+
+        // Show or not the choice of servers, don't if continent is on "Other"
+        set_server_style: function(selected_continent) {
+            return {'display': selected_continent === 'other' ? 'none' : 'block'};
+        },
+
+        // Only Cloud Computing needs the providers box
+        show_provider_field: function(selected_platform) {
+            return {'display': selected_platform === 'cloudComputing' ? 'block' : 'none'};
+        },
+
+        // Shows or hides the retrainings input fields
+        display_retrainings_div: function(retrainings_radio) {
+            if (retrainings_radio === 'No') {
+                return {'display': 'none'};
+            }
+            return {'display': 'flex', 'flex-direction': 'column'};
+        },
+
+        // Gathers the values of the form fields and the data version in the form state,
+        // only updating it when one of its values changed
+        update_form_state: function(...args) {
+            const prev_state = args.pop();
+            const versioned_data = args.pop();
+            let state = {};
+            FORM_STATE_KEYS.forEach((key, i) => {
+                state[key] = args[i] === undefined ? null : args[i];
+            });
+            state['versioned_data'] = versioned_data === undefined ? null : versioned_data;
+            if (JSON.stringify(state) === JSON.stringify(prev_state)) {
+                return window.dash_clientside.no_update;
+            }
+            return state;
         }
     }
-});
\ No newline at end of file
+});
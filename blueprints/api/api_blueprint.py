@@ -0,0 +1,185 @@
+"""
+JSON API of the calculator, served by the Flask server of the app next to the Dash pages.
+
+Unlike the other blueprints, this is a plain Flask blueprint: it does not go through the
+Dash callbacks but directly runs the computation of utils.batch, with the same validation
+rules as the form (see MainFormValidator).
+"""
+
+import json
+import math
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+
+from utils.handle_inputs import CURRENT_VERSION, APP_VERSION_OPTIONS_LIST, DEFAULT_VALUES, INPUT_KEYS_TO_IGNORE, get_versioned_data
+from utils.batch import HOURLY_EMISSIONS_KEY, RECOMMENDED_START_TIME_KEY, RECOMMENDED_EMISSIONS_KEY, estimate_job
+from utils.placement import DEFAULT_TOP_K, MAX_TOP_K, lowest_carbon_datacenters
+
+
+API_PREFIX = '/api/v1'
+
+# Outputs returned at the top level of the response, the emissions of each component
+# being grouped in its breakdown
+FOOTPRINT_KEYS = ['location', 'carbonIntensity', 'PUE', 'runTime', 'power_needed', 'energy_needed', 'carbonEmissions']
+BREAKDOWN_KEYS = ['CE_CPU', 'CE_GPU', 'CE_core', 'CE_memory']
+
+# Longest line (in bytes) accepted for a job of the NDJSON stream, so that
+# a single line cannot make the server hold an unbounded amount of data
+MAX_JOB_LINE_LENGTH = 64 * 1024
+
+
+def format_footprint_response(results: dict):
+    """ Shapes the results of estimate_job as the response of the footprint endpoint. """
+    response = {key: results[key] for key in ['appVersion'] + FOOTPRINT_KEYS}
+    response['breakdown'] = {key: results[key] for key in BREAKDOWN_KEYS}
+    response['inputs'] = {key: results[key] for key in DEFAULT_VALUES}
+    for key in [HOURLY_EMISSIONS_KEY, RECOMMENDED_START_TIME_KEY, RECOMMENDED_EMISSIONS_KEY]:
+        if key in results:
+            response[key] = results[key]
+    return response
+
+
+def unlist_value(value):
+    """ Same as utils.utils.unlist, leaving the lists of several items unchanged instead of failing. """
+    if isinstance(value, list) and len(value) == 1:
+        return value[0]
+    return value
+
+
+def json_safe(value):
+    """ Non-finite numbers are not valid JSON: they are reported as strings, e.g. in the invalid inputs. """
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, list):
+        return [json_safe(item) for item in value]
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    return value
+
+
+def get_job_response(job):
+    """
+    Computes the footprint of a job given as a dictionary parsed from JSON.
+    Returns the response (see format_footprint_response) or the error, along with the HTTP status code.
+    """
+    if not isinstance(job, dict):
+        return {'error': 'The job must be a JSON object.'}, 400
+    unknown_inputs = [
+        key for key in job if key not in DEFAULT_VALUES and key != 'appVersion' and key not in INPUT_KEYS_TO_IGNORE
+    ]
+    if unknown_inputs:
+        return {'error': 'Unknown inputs.', 'unknown_inputs': unknown_inputs}, 400
+    # as in the exported csv, a value can be given as a list of one item, but not as an array or an object
+    non_scalar_inputs = {key: value for key, value in job.items() if isinstance(unlist_value(value), (list, dict))}
+    if non_scalar_inputs:
+        return {'error': 'Invalid inputs.', 'invalid_inputs': json_safe(non_scalar_inputs)}, 400
+
+    results, invalid_inputs = estimate_job(job)
+    if invalid_inputs:
+        return {'error': 'Invalid inputs.', 'invalid_inputs': json_safe(invalid_inputs)}, 400
+    # the inputs are finite, but large enough ones can still overflow
+    if not all(math.isfinite(results[key]) for key in FOOTPRINT_KEYS + BREAKDOWN_KEYS if key != 'location'):
+        return {'error': 'The footprint of the job is too large to be computed.'}, 400
+    return format_footprint_response(results), 200
+
+
+def get_api_blueprint():
+
+    api_blueprint = Blueprint('api', __name__, url_prefix=API_PREFIX)
+
+    @api_blueprint.route('/footprint', methods=['POST'])
+    def footprint():
+        """
+        Computes the footprint of the job described by the JSON body of the request, which
+        uses the same keys as the csv exported from the app (see DEFAULT_VALUES) plus appVersion.
+        Missing fields take their default value, except the server.
+
+        Returns the energy needed (in kWh), the carbon emissions (in gCO2e) and their breakdown
+        per component, along with the values actually used for the computation.
+        Invalid inputs are reported with a 400 status code.
+        """
+        response, status = get_job_response(request.get_json(silent=True))
+        return jsonify(response), status
+
+    @api_blueprint.route('/footprint/stream', methods=['POST'])
+    def footprint_stream():
+        """
+        Computes the footprints of a stream of jobs sent as newline-delimited JSON, one job per line.
+        The body is read line by line and one line is written back per job as soon as it is computed,
+        so that the memory used does not depend on the number of jobs.
+
+        Each line of the response is either the footprint of the job (same as the footprint endpoint)
+        or the error raised by its inputs, along with the number of the line of the job in the body.
+        An error in the computation of a job is reported on its line and does not stop the stream.
+        Empty lines are skipped, lines longer than MAX_JOB_LINE_LENGTH are rejected.
+        """
+        def generate():
+            stream = request.stream
+            line_number = 0
+            while True:
+                line = stream.readline(MAX_JOB_LINE_LENGTH + 1)
+                if not line:
+                    break
+                line_number += 1
+                if len(line) > MAX_JOB_LINE_LENGTH:
+                    # skips the rest of the line
+                    while line and not line.endswith(b'\n'):
+                        line = stream.readline(MAX_JOB_LINE_LENGTH)
+                    response, status = {'error': 'Line too long.'}, 400
+                elif not line.strip():
+                    continue
+                else:
+                    try:
+                        job = json.loads(line)
+                    except ValueError:
+                        response, status = {'error': 'Invalid JSON.'}, 400
+                    else:
+                        try:
+                            response, status = get_job_response(job)
+                        except Exception:
+                            # a job that cannot be computed must not abort the responses of the next ones
+                            current_app.logger.exception('Job %d of the stream could not be computed', line_number)
+                            response, status = {'error': 'The job could not be computed.'}, 500
+                if status != 200:
+                    response['line'] = line_number
+                yield json.dumps(response) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @api_blueprint.route('/datacenters/lowest-carbon', methods=['GET'])
+    def lowest_carbon():
+        """
+        Returns the datacenters with the lowest emissions factor (carbon intensity of their
+        location times their PUE), from the lowest. Query parameters, all optional:
+            - k: number of datacenters returned (default: 5, at most 100),
+            - provider, continent: only returns the datacenters of this provider or continent,
+            - max_carbon_intensity: only returns the datacenters whose carbon intensity is at most this value (in gCO2e/kWh),
+            - appVersion: the data version used (default: the current one).
+        """
+        args = request.args
+        version = args.get('appVersion') or CURRENT_VERSION
+        if version not in APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION]:
+            return jsonify(error='Invalid inputs.', invalid_inputs={'appVersion': version}), 400
+        try:
+            k = int(args.get('k', DEFAULT_TOP_K))
+            assert 1 <= k <= MAX_TOP_K
+        except (ValueError, AssertionError):
+            return jsonify(error='Invalid inputs.', invalid_inputs={'k': args.get('k')}), 400
+        max_carbon_intensity = args.get('max_carbon_intensity')
+        if max_carbon_intensity is not None:
+            try:
+                max_carbon_intensity = float(max_carbon_intensity)
+                assert not math.isnan(max_carbon_intensity)
+            except (ValueError, AssertionError):
+                return jsonify(error='Invalid inputs.', invalid_inputs={'max_carbon_intensity': args.get('max_carbon_intensity')}), 400
+
+        datacenters = lowest_carbon_datacenters(
+            get_versioned_data(version),
+            k=k,
+            provider=args.get('provider'),
+            continent=args.get('continent'),
+            max_carbon_intensity=max_carbon_intensity,
+        )
+        return jsonify(appVersion=version, datacenters=datacenters)
+
+    return api_blueprint
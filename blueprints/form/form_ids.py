@@ -0,0 +1,56 @@
+"""
+Pattern-matching ids of the form components (Dash-only, kept out of utils/utils.py so that
+the CLI and library modules do not depend on Dash).
+"""
+
+from dash import MATCH
+from dash_extensions.enrich import DashTransform, prefix_recursively
+
+from utils.utils import custom_prefix_escape
+
+
+def form_id(field: str, form=MATCH):
+    """
+    Pattern-matching id of a component of the form(s).
+    The form is the id prefix of the form instance ('main', 'training', 'inference'...),
+    MATCH being used by the callbacks shared by all the forms.
+    """
+    return {'form': form, 'field': field}
+
+
+class FormIdTransform(DashTransform):
+    """
+    Counterpart of the PrefixIdTransform for the forms, giving them pattern-matching ids (see form_id()).
+    Applied to the layout of each form with its own prefix, and once to the callbacks shared by all
+    the forms with MATCH, so that adding a form does not add any callback.
+    The ids escaped by custom_prefix_escape() are left unaltered.
+    """
+
+    def __init__(self, form=MATCH):
+        super().__init__()
+        self.form = form
+
+    def _form_id(self, component_id):
+        if isinstance(component_id, dict) or custom_prefix_escape(component_id):
+            return component_id
+        return form_id(component_id, self.form)
+
+    def _apply(self, callbacks):
+        for callback in callbacks:
+            for dependency in list(callback.inputs) + list(callback.outputs):
+                dependency.component_id = self._form_id(dependency.component_id)
+        return callbacks
+
+    def apply_serverside(self, callbacks):
+        return self._apply(callbacks)
+
+    def apply_clientside(self, callbacks):
+        return self._apply(callbacks)
+
+    def _set_form_id(self, form, component, escape):
+        # same signature as the prefix_func of the PrefixIdTransform
+        if hasattr(component, 'id'):
+            component.id = self._form_id(component.id)
+
+    def transform_layout(self, layout):
+        prefix_recursively(layout, self.form, self._set_form_id, custom_prefix_escape)
@@ -37,6 +37,9 @@ def get_green_algo_form_layout(
             # to the results section
             dcc.Store(id='form_aggregate_data'),
             dcc.Store(id='form_output_metrics'),
+            # Compact state of the form (the values of its fields, keyed as in the exported csv), 
+            # updated in the browser and sent to the server to compute the outputs above
+            dcc.Store(id='form_state'),
 
             #### FORM HEADER ####
 
@@ -1,10 +1,15 @@
 '''
 Implements the import-export blueprint.
 
-When a csv is uploaded, the dcc.Upload component (id=upload-data) is 
-automatically flushed after few seconds to let the user upload the same file again.
-Otherwise, the callbacks with Input upload-data would not trigger because upload-data 
-actually remained the same.
+When a csv is uploaded, its content is forwarded to the import-content store and 
+the dcc.Upload component (id=upload-data) is flushed by the same callback, to let the user 
+upload the same file again. Otherwise, the callbacks with Input upload-data would not trigger 
+because upload-data actually remained the same.
+
+When batch import is enabled, csv files with several rows are also processed as a batch:
+the footprint of each row is computed and the first rows of the results are previewed in a table.
+Only this preview is sent to the browser: the full results are computed again from the uploaded
+csv when they are downloaded.
 '''
 
 import pandas as pd
@@ -14,18 +19,35 @@ from dash import ctx, dcc
 from dash_extensions.enrich import DashBlueprint, PrefixIdTransform, Output, Input, State
 from dash.exceptions import PreventUpdate
 
+from utils.handle_inputs import read_input_csv
+from utils.batch import estimate_batch_from_dataframe, INVALID_INPUTS_KEY
 from blueprints.import_export.import_export_layout import get_green_algo_import_export_layout
+from blueprints.metrics.utils import format_CE_text, format_energy_text
+
+
+# Number of rows of the batch results previewed in the table
+BATCH_PREVIEW_ROWS = 100
+
+
+def compute_batch_results_df(import_data: dict, filename: str):
+    """ Results of the rows of the uploaded csv (see estimate_batch_from_dataframe), None when it has a single row. """
+    if import_data is None:
+        return None
+    input_df, _, _ = read_input_csv(import_data, filename)
+    if (input_df is None) or (len(input_df) <= 1):
+        return None
+    return estimate_batch_from_dataframe(input_df)
 
 
 def get_import_expot_blueprint(  # TODO correct typo
     id_prefix: str,
-    csv_flushing_delay: int = 1500,
+    batch_import: bool = False,
 ):
     """
     Args:
         id_prefix (str): id prefix automatically applied to all components.
-        csv_flushing_delay (int, optional): time delay between csv upload and csv flushing.
-        Given in miliseconds. Defaults to 1500.
+        batch_import (bool, optional): whether csv files with several rows are processed
+        as a batch of jobs. Defaults to False.
     """
     import_export_blueprint = DashBlueprint(
         transforms=[
@@ -38,7 +60,7 @@ def get_import_expot_blueprint(  # TODO correct typo
     ##### IMPORT THE COMPONENT LAYOUT
     #################################
 
-    import_export_blueprint.layout = get_green_algo_import_export_layout(csv_flushing_delay)
+    import_export_blueprint.layout = get_green_algo_import_export_layout(batch_import)
 
 
     ##### DEFINE ITS CALLBACKS
@@ -67,54 +89,79 @@ def get_import_expot_blueprint(  # TODO correct typo
     ################## IMPORT DATA
 
     @import_export_blueprint.callback(
-        Output('import-content', 'data'),
+        [
+            Output('import-content', 'data'),
+            Output('upload-data', 'contents'),
+        ],
         Input('upload-data', 'contents'),
-        State('import-content', 'data'),
+        prevent_initial_call=True,
     )
-    def read_input(upload_content: dict, current_import_data: dict):
+    def read_input(upload_content: dict):
         """
         Open input file and extract data from csv if possible.
         Does not process the content, just proceeds to raw extraction.
+        The uploaded content is flushed in the same request, so that uploading the same csv 
+        again still changes upload-data and triggers this callback. As the flush is an output
+        of this very callback, it does not trigger it again.
         """
-        # NOTE this callback fires for no reason (ctx.triggered_id is None) which happens after each regular trigger of the callback
-        # this is also the case for most of the callbacks taking the csv upload content as input, and was already the case when using 
-        # the url instead of csv files for sharing the results
-        # TODO understand this behaviour
-        if ctx.triggered_id is None:
-            raise PreventUpdate 
-        
-        # The following case only happens when the upload-data is automatically flushed 
-        # Therefore, we want to return the data that was previously uploaded
         if upload_content is None:
-            return current_import_data
-    
-        return upload_content
-    
+            raise PreventUpdate
+        return upload_content, None
+
+    ################## BATCH IMPORT
+
+    if not batch_import:
+        return import_export_blueprint
+
     @import_export_blueprint.callback(
-        Output('upload-data', 'contents'),
-        Input('csv-input-timer', 'n_intervals'),
-        prevent_initial_call=True,
+        [
+            Output('batch-results-table', 'data'),
+            Output('batch-results-table', 'columns'),
+            Output('batch-summary', 'children'),
+            Output('batch-results', 'style'),
+        ],
+        Input('import-content', 'data'),
+        State('upload-data', 'filename'),
     )
-    def flush_input_csv_content(n):
+    def compute_batch_results(import_data, filename):
         """
-        Flushes the input csv.
-        This is required if we want to enable the user to load the same csv again.
-        Otherwise, if not flushed, the csv content does not change so it does not trigger
-        the reading of its content.
+        Computes the footprint of each row of the uploaded csv, when it has several rows,
+        and previews the results of the first BATCH_PREVIEW_ROWS rows.
+        The form itself is filled in with the first row only.
         """
-        return None
-    
+        hide = {'display': 'none'}
+        results_df = compute_batch_results_df(import_data, filename)
+        if results_df is None:
+            return [], [], '', hide
+
+        valid_rows = results_df[INVALID_INPUTS_KEY] == ''
+        summary = f"{valid_rows.sum()} out of {len(results_df)} jobs could be computed, " \
+                  f"for a total of {format_energy_text(results_df['energy_needed'].sum())} " \
+                  f"and {format_CE_text(results_df['carbonEmissions'].sum())}."
+        if not valid_rows.all():
+            summary += ' The other rows have invalid inputs, listed in the last column.'
+        if len(results_df) > BATCH_PREVIEW_ROWS:
+            summary += f' Only the first {BATCH_PREVIEW_ROWS} rows are shown below, download the csv for all of them.'
+        preview_df = results_df.head(BATCH_PREVIEW_ROWS)
+        data = preview_df.astype(object).where(preview_df.notnull(), None).to_dict(orient='records')
+        columns = [{'name': column, 'id': column} for column in results_df.columns]
+        return data, columns, summary, {'display': 'block'}
+
     @import_export_blueprint.callback(
-        Output('csv-input-timer', 'disabled'),
-        Input('upload-data', 'contents'),
+        Output("batch-results-csv", "data"),
+        Input("btn-download_batch_csv", "n_clicks"),
+        State('import-content', 'data'),
+        State('upload-data', 'filename'),
         prevent_initial_call=True,
     )
-    def trigger_timer_to_flush_input_csv(input_csv):
+    def export_batch_results_as_csv(_, import_data, filename):
         """
-        When a csv is dropped, triggers a timer that allows to flush this csv.
-        If the input is none, this means that we just flushed it so we do not
-        trigger the timer again.
+        Exports the results of all the rows of the imported csv, in the same format as the exported form data.
         """
-        return input_csv is None
-    
+        results_df = compute_batch_results_df(import_data, filename)
+        if results_df is None:
+            raise PreventUpdate
+        now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        return dcc.send_data_frame(results_df.to_csv, f"GreenAlgorithms_batch_results_{now}.csv", index=False, sep=';')
+
     return import_export_blueprint
\ No newline at end of file
@@ -1,11 +1,41 @@
 """ Import-export layout. """
 
-from dash import html, dcc
+from dash import html, dcc, dash_table
 import dash_bootstrap_components as dbc 
 
 
+def get_batch_results_layout():
+    """
+    Preview of the results computed for each row of a csv with several rows,
+    that can be downloaded as a csv file.
+    """
+    return html.Div(
+        [
+            html.B("Results of the imported jobs"),
+            html.Div(id='batch-summary', className='batch-summary'),
+            dash_table.DataTable(
+                id='batch-results-table',
+                page_action='native',
+                page_size=10,
+                style_table={'overflowX': 'auto'},
+                style_cell={'font-family': 'Raleway', 'font-size': '12px', 'textAlign': 'left'},
+                style_header={'font-weight': 'bold'},
+            ),
+            html.Div(
+                [
+                    html.A(html.B('Download all the results as a csv file'), id='btn-download_batch_csv', className='btn-download_csv'),
+                    dcc.Download(id="batch-results-csv"),
+                ],
+            ),
+        ],
+        className='container footer batch-results',
+        id='batch-results',
+        style={'display': 'none'},
+    )
+
+
 def get_green_algo_import_export_layout(
-    csv_flushing_delay: int
+    batch_import: bool = False,
 ):
     return html.Div(
         [
@@ -77,15 +107,9 @@ def get_green_algo_import_export_layout(
                 duration=60000,
             ),
 
-            dcc.Interval(
-                id='csv-input-timer',
-                interval=csv_flushing_delay, 
-                # in milliseconds, should not be lower than 1000
-                # otherwise the update of the upload csv content is done too soon
-                # and there is not consistency between the state of the form and 
-                # the content  of the csv
-                disabled=True
-            ),
+            #### BATCH RESULTS ####
+
+            get_batch_results_layout() if batch_import else html.Div(),
         ],
         id='import-export',
         className='import-export-container'
@@ -3,6 +3,7 @@ from dash_extensions.enrich import DashBlueprint, PrefixIdTransform, Output, Inp
 from dash import html
 
 from utils.utils import custom_prefix_escape
+from utils.handle_inputs import resolve_versioned_data
 from blueprints.metrics.metrics_layout import get_green_algo_metrics_layout
 import blueprints.metrics.utils as utils
 
@@ -56,6 +57,7 @@ def get_metrics_blueprint(
         carbon_emissions = results_dict['carbonEmissions']  # in g CO2e
         text_CE = utils.format_CE_text(carbon_emissions)
         # Compute corresponding metrics
+        versioned_data = resolve_versioned_data(versioned_data)
         if versioned_data is not None: 
             versioned_data = SimpleNamespace(**versioned_data)
             text_ty = utils.write_tree_months_equivalent(carbon_emissions, versioned_data.refValues_dict)
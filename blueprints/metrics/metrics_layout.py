@@ -210,4 +210,19 @@ def get_metric_per_form_layout(training_id, inference_id):
             html.B(id=inference_id, className='metric-per-form-value'),
         ],
         className='detailed-metric-container'
-    )
\ No newline at end of file
+    )
+
+###################################################
+# METRIC INTERVAL LAYOUT
+
+def get_metric_interval_layout(interval_id):
+    """ Range of plausible values of a metric, hidden until it is computed (see utils/uncertainty.py). """
+    return html.P(
+        [
+            html.B('90% interval:'),
+            html.B(id=interval_id, className='metric-per-form-value'),
+        ],
+        className='detailed-metric-container',
+        id=f'{interval_id}_container',
+        style={'display': 'none'},
+    )
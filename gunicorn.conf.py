@@ -0,0 +1,20 @@
+"""
+Gunicorn settings, automatically read by gunicorn when launched from the repository root.
+
+With PRELOAD_DATA=1, the app (and thus all the data versions, see app.py) is loaded
+in the master process before the workers are forked, so that the workers share the
+same memory pages (copy-on-write) and do not pay for data loading on their first requests.
+The data is loaded in a background thread of the master, which forks the workers once it is done.
+"""
+
+import os
+import sys
+
+preload_app = os.environ.get('PRELOAD_DATA', '0') == '1'
+
+
+def when_ready(server):
+    """ Called in the master before the workers are forked: waits for the data to be loaded (see app.py). """
+    warm_up_thread = getattr(sys.modules.get('app'), 'WARM_UP_THREAD', None)
+    if warm_up_thread is not None:
+        warm_up_thread.join()
@@ -12,13 +12,14 @@ These additional fields must be taken into account:
 
 import os
 
-from dash import html, Input, Output, State, dcc
+from dash import html, Input, Output, State, dcc, ClientsideFunction
 import dash_mantine_components as dmc
 from dash_iconify import DashIconify
 
 from dash_extensions.enrich import DashBlueprint, html
 
 from blueprints.form.form_blueprint import get_form_blueprint
+from blueprints.form.form_ids import form_id
 from blueprints.import_export.import_export_blueprint import get_import_expot_blueprint
 from blueprints.metrics.metrics_blueprint import get_metrics_blueprint
 from blueprints.methodology.methodology_blueprint import get_methodology_blueprint
@@ -28,7 +29,6 @@ import blueprints.metrics.utils as metrics_utils
 import blueprints.methodology.methodology_layout as methodo_layout
 import blueprints.form.form_layout as form_layout
 
-from utils.graphics import MY_COLORS
 from utils.handle_inputs import get_available_versions, filter_wrong_inputs, clean_non_used_inputs_for_export,  open_input_csv_and_comment, read_base_form_inputs_from_csv, AI_PAGE_DEFAULT_VALUES, validate_ai_page_specific_inputs
 
 
@@ -62,9 +62,7 @@ inference_form = get_form_blueprint(
     continuous_inf_scheme_properties={'display': 'block'}
 )
 
-### WARNING: the csv_flushing_delay below should not be lower than 
-# 2000 milliseconds to avoid rendering bugs of the server fields
-import_export = get_import_expot_blueprint(id_prefix=AI_PAGE_ID_PREFIX, csv_flushing_delay=2500) 
+import_export = get_import_expot_blueprint(id_prefix=AI_PAGE_ID_PREFIX)
 
 methodo_content = get_methodology_blueprint(
     id_prefix=AI_PAGE_ID_PREFIX,
@@ -303,8 +301,8 @@ AI_PAGE.layout = get_ai_page_layout()
 
 @AI_PAGE.callback(
     [
-        Output(f'{TRAINING_ID_PREFIX}-form_data_imported_from_csv', 'data'),
-        Output(f'{INFERENCE_ID_PREFIX}-form_data_imported_from_csv', 'data'),
+        Output(form_id('form_data_imported_from_csv', TRAINING_ID_PREFIX), 'data'),
+        Output(form_id('form_data_imported_from_csv', INFERENCE_ID_PREFIX), 'data'),
         Output(f'{AI_PAGE_ID_PREFIX}-import-error-message', 'is_open'),
         Output(f'{AI_PAGE_ID_PREFIX}-log-error-subtitle', 'children'),
         Output(f'{AI_PAGE_ID_PREFIX}-log-error-content', 'children'),
@@ -316,8 +314,8 @@ AI_PAGE.layout = get_ai_page_layout()
     ],
     [
         State(f'{AI_PAGE_ID_PREFIX}-upload-data', 'filename'),
-        State(f'{TRAINING_ID_PREFIX}-form_aggregate_data', 'data'),
-        State(f'{INFERENCE_ID_PREFIX}-form_aggregate_data', 'data'),
+        State(form_id('form_aggregate_data', TRAINING_ID_PREFIX), 'data'),
+        State(form_id('form_aggregate_data', INFERENCE_ID_PREFIX), 'data'),
         State('specific_ai_page_inputs', 'data'),
         State('app_versions_dropdown','value'),
     ]
@@ -434,11 +432,11 @@ def forward_reporting_scope_inputs(_, specific_ai_inputs: dict):
 
 @AI_PAGE.callback(
         [
-            Output(f'{TRAINING_ID_PREFIX}-RandD_radio','value'),
-            Output(f'{TRAINING_ID_PREFIX}-RandD_MF_input','value'),
-            Output(f'{TRAINING_ID_PREFIX}-retrainings_radio','value'),
-            Output(f'{TRAINING_ID_PREFIX}-retrainings_number_input', 'value'),
-            Output(f'{TRAINING_ID_PREFIX}-retrainings_MF_input','value'),
+            Output(form_id('RandD_radio', TRAINING_ID_PREFIX),'value'),
+            Output(form_id('RandD_MF_input', TRAINING_ID_PREFIX),'value'),
+            Output(form_id('retrainings_radio', TRAINING_ID_PREFIX),'value'),
+            Output(form_id('retrainings_number_input', TRAINING_ID_PREFIX), 'value'),
+            Output(form_id('retrainings_MF_input', TRAINING_ID_PREFIX),'value'),
         ],
         [
             # To force initial triggering
@@ -472,9 +470,9 @@ def load_RandD_and_retrainings_inputs(_, specific_ai_inputs: dict):
 
 @AI_PAGE.callback(
         [
-            Output(f'{INFERENCE_ID_PREFIX}-continuous_inference_scheme_switcher', 'checked'),
-            Output(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_dropdown', 'value'),
-            Output(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_input', 'value'),
+            Output(form_id('continuous_inference_scheme_switcher', INFERENCE_ID_PREFIX), 'checked'),
+            Output(form_id('input_data_time_scope_dropdown', INFERENCE_ID_PREFIX), 'value'),
+            Output(form_id('input_data_time_scope_input', INFERENCE_ID_PREFIX), 'value'),
         ],
         [
             # To force initial triggering
@@ -505,12 +503,12 @@ def load_inference_specific_inputs(_, specific_ai_inputs: dict):
 
 @AI_PAGE.callback(
     [
-        Output(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_section', 'style'),
-        Output(f'{INFERENCE_ID_PREFIX}-mult_factor_div', 'style'),
-        Output(f'{INFERENCE_ID_PREFIX}-mult_factor_radio', 'value', allow_duplicate=True),
-        Output(f'{INFERENCE_ID_PREFIX}-mult_factor_input', 'value', allow_duplicate=True),
+        Output(form_id('input_data_time_scope_section', INFERENCE_ID_PREFIX), 'style'),
+        Output(form_id('mult_factor_div', INFERENCE_ID_PREFIX), 'style'),
+        Output(form_id('mult_factor_radio', INFERENCE_ID_PREFIX), 'value', allow_duplicate=True),
+        Output(form_id('mult_factor_input', INFERENCE_ID_PREFIX), 'value', allow_duplicate=True),
     ],
-    Input(f'{INFERENCE_ID_PREFIX}-continuous_inference_scheme_switcher', 'checked'),
+    Input(form_id('continuous_inference_scheme_switcher', INFERENCE_ID_PREFIX), 'checked'),
     prevent_initial_call = True
 )
 def adapt_the_form_depending_on_inference_mode(is_inference_continuous):
@@ -521,44 +519,24 @@ def adapt_the_form_depending_on_inference_mode(is_inference_continuous):
 
 ################## ADDITIONAL TRAININGS FIELDS SECTIONS
 
-@AI_PAGE.callback(
-    Output(f'{TRAINING_ID_PREFIX}-RandD_MF_input','style'),
+# Shows or hides the R&D trainings input box
+AI_PAGE.clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='display_input_if_yes'),
+    Output(form_id('RandD_MF_input', TRAINING_ID_PREFIX),'style'),
     [
-        Input(f'{TRAINING_ID_PREFIX}-RandD_radio', 'value'),
-        Input(f'{TRAINING_ID_PREFIX}-RandD_MF_input','disabled')
+        Input(form_id('RandD_radio', TRAINING_ID_PREFIX), 'value'),
+        Input(form_id('RandD_MF_input', TRAINING_ID_PREFIX),'disabled')
     ]
 )
-def display_RandD_trainings_input(RandD_trainings_radio, disabled):
-    """
-    Shows or hides the  R&D trainings input box
-    """
-    if RandD_trainings_radio == 'No':
-        out = {'display': 'none'}
-    else:
-        out = {'display': 'block'}
-
-    if disabled:
-        out['background-color'] = MY_COLORS['boxesColor']
-
-    return out
 
-
-@AI_PAGE.callback(
-    Output(f'{TRAINING_ID_PREFIX}-retraining-additional-inputs', 'style'),
+# Shows or hides the retrainings input fields
+AI_PAGE.clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='display_retrainings_div'),
+    Output(form_id('retraining-additional-inputs', TRAINING_ID_PREFIX), 'style'),
     [
-        Input(f'{TRAINING_ID_PREFIX}-retrainings_radio', 'value'),
+        Input(form_id('retrainings_radio', TRAINING_ID_PREFIX), 'value'),
     ]
 )
-def display_retrainings_div(retrainings_radio):
-    """
-    Shows or hides the retrainings input fields
-    """
-    if retrainings_radio == 'No':
-        out = {'display': 'none'}
-    else:
-        out = {'display': 'flex', 'flex-direction': 'column'}
-
-    return out
 
 
 ################## EXPORT DATA
@@ -569,18 +547,18 @@ def display_retrainings_div(retrainings_radio):
         [
             State(f'reporting_time_scope_input', 'value'),
             State(f'reporting_time_scope_dropdown', 'value'),
-            State(f'{TRAINING_ID_PREFIX}-form_aggregate_data', 'data'),
+            State(form_id('form_aggregate_data', TRAINING_ID_PREFIX), 'data'),
             State(f'training_processed_output_metrics', 'data'),
-            State(f'{INFERENCE_ID_PREFIX}-form_aggregate_data', 'data'),
+            State(form_id('form_aggregate_data', INFERENCE_ID_PREFIX), 'data'),
             State(f'inference_processed_output_metrics', 'data'),
-            State(f'{TRAINING_ID_PREFIX}-retrainings_radio', 'value'),
-            State(f'{TRAINING_ID_PREFIX}-retrainings_number_input', 'value'),
-            State(f'{TRAINING_ID_PREFIX}-retrainings_MF_input', 'value'),
-            State(f'{TRAINING_ID_PREFIX}-RandD_radio', 'value'),
-            State(f'{TRAINING_ID_PREFIX}-RandD_MF_input', 'value'),
-            State(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_input', 'value'),
-            State(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_dropdown', 'value'),
-            State(f'{INFERENCE_ID_PREFIX}-continuous_inference_scheme_switcher', 'checked'),
+            State(form_id('retrainings_radio', TRAINING_ID_PREFIX), 'value'),
+            State(form_id('retrainings_number_input', TRAINING_ID_PREFIX), 'value'),
+            State(form_id('retrainings_MF_input', TRAINING_ID_PREFIX), 'value'),
+            State(form_id('RandD_radio', TRAINING_ID_PREFIX), 'value'),
+            State(form_id('RandD_MF_input', TRAINING_ID_PREFIX), 'value'),
+            State(form_id('input_data_time_scope_input', INFERENCE_ID_PREFIX), 'value'),
+            State(form_id('input_data_time_scope_dropdown', INFERENCE_ID_PREFIX), 'value'),
+            State(form_id('continuous_inference_scheme_switcher', INFERENCE_ID_PREFIX), 'checked'),
             State(f'{AI_PAGE_ID_PREFIX}-base_results', 'data'),
         ],
         prevent_initial_call=True,
@@ -659,12 +637,12 @@ def forward_form_input_to_export_module(
 @AI_PAGE.callback(
         Output('inference_processed_output_metrics', 'data'),
         [
-            Input(f'{INFERENCE_ID_PREFIX}-form_output_metrics', 'data'),
+            Input(form_id('form_output_metrics', INFERENCE_ID_PREFIX), 'data'),
             Input(f'reporting_time_scope_input', 'value'),
             Input(f'reporting_time_scope_dropdown', 'value'),
-            Input(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_input', 'value'),
-            Input(f'{INFERENCE_ID_PREFIX}-input_data_time_scope_dropdown', 'value'),
-            Input(f'{INFERENCE_ID_PREFIX}-continuous_inference_scheme_switcher', 'checked'),
+            Input(form_id('input_data_time_scope_input', INFERENCE_ID_PREFIX), 'value'),
+            Input(form_id('input_data_time_scope_dropdown', INFERENCE_ID_PREFIX), 'value'),
+            Input(form_id('continuous_inference_scheme_switcher', INFERENCE_ID_PREFIX), 'checked'),
         ],
 )
 def process_inference_form_outputs_based_on_reporting_scope(
@@ -714,12 +692,12 @@ def process_inference_form_outputs_based_on_reporting_scope(
 @AI_PAGE.callback(
         Output('training_processed_output_metrics', 'data'),
         [
-            Input(f'{TRAINING_ID_PREFIX}-form_output_metrics', 'data'),
-            Input(f'{TRAINING_ID_PREFIX}-retrainings_radio', 'value'),
-            Input(f'{TRAINING_ID_PREFIX}-retrainings_number_input', 'value'),
-            Input(f'{TRAINING_ID_PREFIX}-retrainings_MF_input', 'value'),
-            Input(f'{TRAINING_ID_PREFIX}-RandD_radio', 'value'),
-            Input(f'{TRAINING_ID_PREFIX}-RandD_MF_input', 'value'),
+            Input(form_id('form_output_metrics', TRAINING_ID_PREFIX), 'data'),
+            Input(form_id('retrainings_radio', TRAINING_ID_PREFIX), 'value'),
+            Input(form_id('retrainings_number_input', TRAINING_ID_PREFIX), 'value'),
+            Input(form_id('retrainings_MF_input', TRAINING_ID_PREFIX), 'value'),
+            Input(form_id('RandD_radio', TRAINING_ID_PREFIX), 'value'),
+            Input(form_id('RandD_MF_input', TRAINING_ID_PREFIX), 'value'),
         ]
 )
 def add_retrainings_and_RandD_to_training_outputs(
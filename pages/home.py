@@ -9,17 +9,27 @@ and then, when the page is registered in the app, as app callbacks.
 
 import os
 
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, dash_table, Input, Output, State, ClientsideFunction
 from types import SimpleNamespace
 
-from utils.handle_inputs import get_available_versions, filter_wrong_inputs, clean_non_used_inputs_for_export, open_input_csv_and_comment, read_base_form_inputs_from_csv
+from utils.handle_inputs import get_available_versions, filter_wrong_inputs, clean_non_used_inputs_for_export, open_input_csv_and_comment, read_base_form_inputs_from_csv, resolve_versioned_data
 from utils.graphics import BLANK_FIGURE, loading_wrapper
-from utils.graphics import create_cores_bar_chart_graphic, create_ci_bar_chart_graphic, create_cores_memory_pie_graphic
+from utils.graphics import create_cores_bar_chart_graphic, create_ci_bar_chart_graphic, create_cores_memory_pie_graphic, create_placement_heatmap_graphic, create_pareto_front_graphic
+from utils.placement import DEFAULT_TOP_K, MAX_TOP_K, compute_emissions_matrix, rank_sites, get_datacenter_index, lowest_carbon_datacenters
+from utils.utils import YES_NO_OPTIONS
+from utils.hourly_ci import get_hourly_carbon_intensity, recommend_start_times
+from utils.pareto import DEFAULT_PARALLEL_FRACTION, DEFAULT_MAX_CORES, optimise_workload
+from utils.uncertainty import DISTRIBUTIONS, DEFAULT_UNCERTAINTIES, UNCERTAIN_INPUTS, footprint_percentiles, percentile_key
+from blueprints.metrics.utils import format_energy_text, format_CE_text
+from blueprints.metrics.metrics_layout import get_metric_interval_layout
 
 from dash_extensions.enrich import DashBlueprint, html
 from blueprints.form.form_blueprint import get_form_blueprint
+from blueprints.form.form_ids import form_id
 from blueprints.methodology.methodology_blueprint import get_methodology_blueprint
 from blueprints.metrics.metrics_blueprint import get_metrics_blueprint
 from blueprints.import_export.import_export_blueprint import get_import_expot_blueprint
@@ -56,9 +66,13 @@ form = get_form_blueprint(
 
 methodology_content = get_methodology_blueprint(id_prefix=HOME_PAGE_ID_PREFIX)
 
-metrics = get_metrics_blueprint(id_prefix=HOME_PAGE_ID_PREFIX)
+metrics = get_metrics_blueprint(
+    id_prefix=HOME_PAGE_ID_PREFIX,
+    energy_needed_details=get_metric_interval_layout('energy_needed_interval'),
+    carbon_footprint_details=get_metric_interval_layout('carbonEmissions_interval'),
+)
 
-import_export = get_import_expot_blueprint(id_prefix=HOME_PAGE_ID_PREFIX) 
+import_export = get_import_expot_blueprint(id_prefix=HOME_PAGE_ID_PREFIX, batch_import=True)
 
 
 ###################################################
@@ -69,10 +83,77 @@ data_dir = os.path.join(os.path.abspath(''),'data')
 
 appVersions_options = get_available_versions()
 
+PLACEMENT_TABLE_COLUMNS = {
+    'rank': 'Rank',
+    'label': 'Place',
+    'kind': 'Type',
+    'continent': 'Continent',
+    'carbonIntensity': 'Carbon intensity (gCO2e/kWh)',
+    'PUE': 'PUE',
+    'carbonEmissions': 'Carbon emissions',
+    'change': 'Compared to now',
+}
+
+LOWEST_CARBON_TABLE_COLUMNS = {
+    'provider': 'Provider',
+    'Name': 'Data centre',
+    'country': 'Country',
+    'carbonIntensity': 'Carbon intensity (gCO2e/kWh)',
+    'PUE': 'PUE',
+    'emissionsFactor': 'Emissions factor (gCO2e/kWh)',
+}
+
+# Number of places and hardware options shown on the heatmap
+PLACEMENT_HEATMAP_SITES = 20
+PLACEMENT_HEATMAP_HARDWARE = 15
+
+# Number of hours within which the start time is recommended by default
+DEFAULT_START_HORIZON = 24
+
+WORKLOAD_TYPE_OPTIONS = [
+    {'label': 'CPU core-hours', 'value': 'CPU'},
+    {'label': 'GPU-hours', 'value': 'GPU'},
+]
+
+UNCERTAIN_INPUTS_LABELS = {
+    'PUE': 'PUE',
+    'usage': 'Usage factor of the cores',
+    'tdp': 'Power draw of the cores (TDP)',
+    'carbonIntensity': 'Carbon intensity',
+}
+
 
 ###################################################
 # DEFINE PAGE LAYOUT
 
+def get_uncertainty_input_row(input_key: str):
+    """ Distribution and relative spread (in %) of an uncertain input. """
+    return html.Div(
+        [
+            html.Label(UNCERTAIN_INPUTS_LABELS[input_key]),
+            html.Div(
+                [
+                    dcc.Dropdown(
+                        id=f'uncertainty_{input_key}_distribution',
+                        options=DISTRIBUTIONS,
+                        value=DEFAULT_UNCERTAINTIES[input_key]['distribution'],
+                        clearable=False,
+                    ),
+                    dcc.Input(
+                        id=f'uncertainty_{input_key}_spread',
+                        type='number',
+                        min=0,
+                        max=100,
+                        value=100 * DEFAULT_UNCERTAINTIES[input_key]['spread'],
+                    ),
+                    html.Div('%'),
+                ],
+                className='box-fields'
+            ),
+        ],
+        className='form-row short-input'
+    )
+
 def get_home_page_layout():
     page_layout = html.Div(
         [
@@ -89,6 +170,51 @@ def get_home_page_layout():
 
                     metrics.embed(HOME_PAGE),
 
+            #### UNCERTAINTY ####
+
+                    html.Div(
+                        [
+                            dcc.Store(id='uncertainty_results'),
+
+                            html.Div(
+                                [
+                                    html.Label("Take the uncertainty of the inputs into account?"),
+                                    html.Div(
+                                        dcc.RadioItems(
+                                            id='uncertainty_radio',
+                                            options=YES_NO_OPTIONS,
+                                            value='No',
+                                            className='radio-input',
+                                        ),
+                                        className='radio-and-field'
+                                    ),
+                                    html.Div(
+                                        [
+                                            html.Div('i', className='tooltip-icon'),
+                                            html.P(
+                                                "The PUE, usage factors, power draw of the cores and carbon intensity are drawn "
+                                                "from the distributions below, centred on the values used above "
+                                                "(the spread is the half-width of the uniform and triangular distributions, "
+                                                "and the standard deviation of the normal one). "
+                                                "The 90% interval goes from the 5th to the 95th percentile of the results.",
+                                                className='tooltip-text'
+                                            ),
+                                        ],
+                                        className='tooltip',
+                                    ),
+                                ],
+                                className='form-row radio-row',
+                            ),
+
+                            html.Div(
+                                [get_uncertainty_input_row(input_key) for input_key in UNCERTAIN_INPUTS],
+                                id='uncertainty_inputs_div',
+                                style={'display': 'none'},
+                            ),
+                        ],
+                        className='container uncertainty'
+                    ),
+
             #### DYNAMIC GRAPHS ####
         
                     html.Div(
@@ -195,6 +321,210 @@ def get_home_page_layout():
                 ],
                 className='container core-comparison'
             ),
+
+            #### WHERE TO RUN ####
+
+            html.Div(
+                [
+                    html.H2("Where would this job emit least?"),
+
+                    html.P(
+                        "Emissions of the same job in each location and data centre, "
+                        "the data centres using their own PUE.",
+                    ),
+
+                    loading_wrapper(
+                        dash_table.DataTable(
+                            id='placement_table',
+                            columns=[{'name': name, 'id': key} for key, name in PLACEMENT_TABLE_COLUMNS.items()],
+                            page_action='native',
+                            page_size=10,
+                            sort_action='native',
+                            style_table={'overflowX': 'auto'},
+                            style_cell={'font-family': 'Raleway', 'font-size': '12px', 'textAlign': 'left'},
+                            style_header={'font-weight': 'bold'},
+                        ),
+                    ),
+
+                    html.P(
+                        f"Emissions of the {PLACEMENT_HEATMAP_SITES} lowest-emitting places "
+                        "with other models of the cores used by the job.",
+                    ),
+
+                    html.Div(
+                        [
+                            loading_wrapper(
+                                dcc.Graph(
+                                    id="placement_heatmap",
+                                    config={'displaylogo': False},
+                                    figure=BLANK_FIGURE,
+                                ),
+                            ),
+                        ],
+                        className='graph-container'
+                    )
+                ],
+                className='container placement'
+            ),
+
+            #### LOWEST-CARBON DATA CENTRES ####
+
+            html.Div(
+                [
+                    html.H2("Lowest-carbon data centres"),
+
+                    html.P(
+                        "Data centres with the lowest emissions factor, "
+                        "i.e. the carbon intensity of their location times their PUE.",
+                    ),
+
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.Label("Provider"),
+                                    dcc.Dropdown(id='lowest_carbon_provider', placeholder='Any'),
+                                ],
+                                className='form-row short-input'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Continent"),
+                                    dcc.Dropdown(id='lowest_carbon_continent', placeholder='Any'),
+                                ],
+                                className='form-row short-input'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Maximum carbon intensity (gCO2e/kWh)"),
+                                    dcc.Input(id='lowest_carbon_max_CI', type='number', min=0),
+                                ],
+                                className='form-row short-input'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Number of data centres"),
+                                    dcc.Input(id='lowest_carbon_k', type='number', min=1, max=MAX_TOP_K, step=1, value=DEFAULT_TOP_K),
+                                ],
+                                className='form-row short-input'
+                            ),
+                        ],
+                        className='lowest-carbon-filters'
+                    ),
+
+                    dash_table.DataTable(
+                        id='lowest_carbon_table',
+                        columns=[{'name': name, 'id': key} for key, name in LOWEST_CARBON_TABLE_COLUMNS.items()],
+                        style_table={'overflowX': 'auto'},
+                        style_cell={'font-family': 'Raleway', 'font-size': '12px', 'textAlign': 'left'},
+                        style_header={'font-weight': 'bold'},
+                    ),
+                ],
+                className='container lowest-carbon'
+            ),
+
+            #### WHEN TO RUN ####
+
+            html.Div(
+                [
+                    html.H2("When would this job emit least?"),
+
+                    html.P(
+                        "Start time minimising the emissions of the job within the given horizon, "
+                        "using the hourly carbon intensity of its location when available.",
+                    ),
+
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.Label("Earliest start (UTC)"),
+                                    dcc.Input(id='start_time_earliest', type='text', placeholder='YYYY-MM-DD HH:MM', debounce=True),
+                                ],
+                                className='form-row short-input'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Horizon (hours)"),
+                                    dcc.Input(id='start_time_horizon', type='number', min=0, step=1, value=DEFAULT_START_HORIZON),
+                                ],
+                                className='form-row short-input'
+                            ),
+                        ],
+                        className='start-time-inputs'
+                    ),
+
+                    html.P(id='start_time_recommendation'),
+                ],
+                className='container start-time'
+            ),
+
+            #### EMISSIONS VS RUNTIME ####
+
+            html.Div(
+                [
+                    html.H2("Emissions vs runtime"),
+
+                    html.P(
+                        "Lowest emissions of a workload for each runtime, depending on the number of cores it is spread over, "
+                        "on the best site of each platform. The workload is that of the job above unless given below.",
+                    ),
+
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.Label("Workload"),
+                                    dcc.RadioItems(
+                                        id='pareto_workload_type',
+                                        options=WORKLOAD_TYPE_OPTIONS,
+                                        value='CPU',
+                                        className='radio-input',
+                                    ),
+                                    dcc.Input(id='pareto_workload', type='number', min=0, placeholder='From the job above'),
+                                ],
+                                className='form-row short-input'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Models"),
+                                    dcc.Dropdown(id='pareto_models', multi=True, placeholder='Model of the job above'),
+                                ],
+                                className='form-row'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Parallel fraction"),
+                                    dcc.Input(id='pareto_parallel_fraction', type='number', min=0, max=1, step=0.01, value=DEFAULT_PARALLEL_FRACTION),
+                                ],
+                                className='form-row short-input'
+                            ),
+                            html.Div(
+                                [
+                                    html.Label("Maximum number of cores"),
+                                    dcc.Input(id='pareto_max_cores', type='number', min=1, step=1, value=DEFAULT_MAX_CORES),
+                                ],
+                                className='form-row short-input'
+                            ),
+                        ],
+                        className='pareto-inputs'
+                    ),
+
+                    html.Div(
+                        [
+                            loading_wrapper(
+                                dcc.Graph(
+                                    id="pareto_graph",
+                                    config={'displaylogo': False},
+                                    figure=BLANK_FIGURE,
+                                ),
+                            ),
+                        ],
+                        className='graph-container'
+                    )
+                ],
+                className='container pareto'
+            ),
         ],
         className='page_content'
 
@@ -212,7 +542,7 @@ HOME_PAGE.layout = get_home_page_layout()
 
 @HOME_PAGE.callback(
     [
-        Output(f'{HOME_PAGE_ID_PREFIX}-form_data_imported_from_csv', 'data'),
+        Output(form_id('form_data_imported_from_csv', HOME_PAGE_ID_PREFIX), 'data'),
         Output(f'{HOME_PAGE_ID_PREFIX}-import-error-message', 'is_open'),
         Output(f'{HOME_PAGE_ID_PREFIX}-log-error-subtitle', 'children'),
         Output(f'{HOME_PAGE_ID_PREFIX}-log-error-content', 'children'),
@@ -223,7 +553,7 @@ HOME_PAGE.layout = get_home_page_layout()
     ],
     [
         State(f'{HOME_PAGE_ID_PREFIX}-upload-data', 'filename'),
-        State(f'{HOME_PAGE_ID_PREFIX}-form_aggregate_data', 'data'),
+        State(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), 'data'),
         State('app_versions_dropdown','value'),
     ]
 )
@@ -262,14 +592,16 @@ def forward_imported_content_to_form(import_data, filename, current_form_data, c
 @HOME_PAGE.callback(
         Output(f'{HOME_PAGE_ID_PREFIX}-export-content', 'data'),
         Input(f"{HOME_PAGE_ID_PREFIX}-btn-download_csv", "n_clicks"),
-        State(f'{HOME_PAGE_ID_PREFIX}-form_aggregate_data', 'data'),
-        State(f'{HOME_PAGE_ID_PREFIX}-form_output_metrics', "data"),
+        State(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), 'data'),
+        State(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
+        State('uncertainty_results', 'data'),
         prevent_initial_call=True,
 )
-def forward_form_input_to_export_module(_, form_aggregate_data, form_output_metrics):
+def forward_form_input_to_export_module(_, form_aggregate_data, form_output_metrics, uncertainty_results):
     """
     Intermediate processing specific to the HOME page before exporting data.
-    We forward the inputs of the form to the export file along with the main outputs.
+    We forward the inputs of the form to the export file along with the main outputs
+    and their percentiles when the uncertainty mode is on.
     """
     to_export = {}
     # Raw inputs of the form
@@ -277,6 +609,7 @@ def forward_form_input_to_export_module(_, form_aggregate_data, form_output_metr
     to_export.update(form_aggregate_data)
     # Outputs of the form
     to_export.update(form_output_metrics)
+    to_export.update(uncertainty_results or {})
     return to_export
 
 
@@ -284,7 +617,7 @@ def forward_form_input_to_export_module(_, form_aggregate_data, form_output_metr
 
 @HOME_PAGE.callback(
     Output(f'{HOME_PAGE_ID_PREFIX}-base_results', 'data'),
-    Input(f'{HOME_PAGE_ID_PREFIX}-form_output_metrics', 'data')
+    Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), 'data')
 )
 def forward_results_from_form_to_metrics(form_metrics):
     return {
@@ -292,14 +625,82 @@ def forward_results_from_form_to_metrics(form_metrics):
         'carbonEmissions': form_metrics['carbonEmissions'],
     }
 
+## UNCERTAINTY
+
+# Shows or hides the uncertainty inputs, based on Yes/No input
+HOME_PAGE.clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='display_input_if_yes'),
+    Output('uncertainty_inputs_div', 'style'),
+    Input('uncertainty_radio', 'value'),
+)
+
+@HOME_PAGE.callback(
+    [
+        Output('uncertainty_results', 'data'),
+        Output(f'{HOME_PAGE_ID_PREFIX}-energy_needed_interval', 'children'),
+        Output(f'{HOME_PAGE_ID_PREFIX}-energy_needed_interval_container', 'style'),
+        Output(f'{HOME_PAGE_ID_PREFIX}-carbonEmissions_interval', 'children'),
+        Output(f'{HOME_PAGE_ID_PREFIX}-carbonEmissions_interval_container', 'style'),
+    ],
+    [
+        Input('uncertainty_radio', 'value'),
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
+        Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
+    ] + [
+        Input(f'uncertainty_{input_key}_{field}', 'value')
+        for input_key in UNCERTAIN_INPUTS for field in ['distribution', 'spread']
+    ],
+    State('versioned_data', 'data'),
+)
+def compute_uncertainty(uncertainty_radio, form_agg_data, form_metrics, *args):
+    """
+    Computes the percentiles of the energy needed and of the carbon emissions
+    by sampling the uncertain inputs (see utils/uncertainty.py).
+    """
+    *uncertainty_values, versioned_data = args
+    hide = {'display': 'none'}
+    versioned_data = resolve_versioned_data(versioned_data)
+    if (uncertainty_radio != 'Yes') or (versioned_data is None) or (form_metrics['runTime'] is None):
+        return {}, '', hide, '', hide
+
+    uncertainties = {}
+    for i, input_key in enumerate(UNCERTAIN_INPUTS):
+        distribution, spread = uncertainty_values[2 * i: 2 * i + 2]
+        uncertainties[input_key] = {'distribution': distribution, 'spread': (spread or 0) / 100}
+    uses_CPU = form_agg_data['coreType'] in ['CPU', 'Both']
+    uses_GPU = form_agg_data['coreType'] in ['GPU', 'Both']
+    inputs = dict(
+        runTime=form_metrics['runTime'],
+        PUE=form_agg_data['PUE'],
+        numberCPUs=form_agg_data['numberCPUs'] if uses_CPU else 0,
+        tdpCPU=form_agg_data['tdpCPU'],
+        usageCPU=form_agg_data['usageCPU'],
+        numberGPUs=form_agg_data['numberGPUs'] if uses_GPU else 0,
+        tdpGPU=form_agg_data['tdpGPU'],
+        usageGPU=form_agg_data['usageGPU'],
+        memory=form_agg_data['memory'],
+        memoryPower=versioned_data['refValues_dict']['memoryPower'],
+        carbonIntensity=form_agg_data['carbonIntensity'],
+        mult_factor=form_agg_data['mult_factor'],
+    )
+    results = footprint_percentiles(inputs, uncertainties)
+
+    show = {'display': 'inline-flex'}
+    text_energy = f"{format_energy_text(results[percentile_key('energy_needed', 5)])} - " \
+                  f"{format_energy_text(results[percentile_key('energy_needed', 95)])}"
+    text_CE = f"{format_CE_text(results[percentile_key('carbonEmissions', 5)])} - " \
+              f"{format_CE_text(results[percentile_key('carbonEmissions', 95)])}"
+    return results, text_energy, show, text_CE, show
+
+
 ## OUTPUT GRAPHICS
 
 
 @HOME_PAGE.callback(
     Output("pie_graph", "figure"),
     [
-        Input(f'{HOME_PAGE_ID_PREFIX}-form_aggregate_data', "data"),
-        Input(f'{HOME_PAGE_ID_PREFIX}-form_output_metrics', "data"),
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
+        Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
     ]
 )
 def create_pie_graph(form_agg_data, form_metrics):
@@ -309,11 +710,12 @@ def create_pie_graph(form_agg_data, form_metrics):
 @HOME_PAGE.callback(
     Output("barPlotComparison", "figure"),
     [
-        Input(f'{HOME_PAGE_ID_PREFIX}-form_output_metrics', "data"),
+        Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
         Input('versioned_data','data')
     ],
 )
 def create_bar_chart(form_metrics, versioned_data):
+    versioned_data = resolve_versioned_data(versioned_data)
     if versioned_data is not None:
         versioned_data = SimpleNamespace(**versioned_data)
         return create_ci_bar_chart_graphic(form_metrics, versioned_data)
@@ -322,11 +724,12 @@ def create_bar_chart(form_metrics, versioned_data):
 @HOME_PAGE.callback(
     Output("barPlotComparison_cores", "figure"),
     [
-        Input(f'{HOME_PAGE_ID_PREFIX}-form_aggregate_data', "data"),
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
         Input('versioned_data','data')
     ],
 )
 def create_bar_chart_cores(form_agg_data, versioned_data):
+    versioned_data = resolve_versioned_data(versioned_data)
     if versioned_data is not None:
         versioned_data = SimpleNamespace(**versioned_data)
         if form_agg_data['coreType'] is None:
@@ -334,13 +737,224 @@ def create_bar_chart_cores(form_agg_data, versioned_data):
         return create_cores_bar_chart_graphic(form_agg_data, versioned_data)
     return None
 
+## WHERE TO RUN
+
+@HOME_PAGE.callback(
+    [
+        Output('placement_table', 'data'),
+        Output('placement_heatmap', 'figure'),
+    ],
+    [
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
+        Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
+    ],
+    State('versioned_data', 'data'),
+)
+def rank_places_to_run(form_agg_data, form_metrics, versioned_data):
+    """
+    Ranks all the locations and data centres by the emissions of the job (see utils/placement.py)
+    and shows the lowest-emitting ones for different hardware on a heatmap.
+    """
+    versioned_data = resolve_versioned_data(versioned_data)
+    if (versioned_data is None) or (form_metrics['runTime'] is None):
+        return [], BLANK_FIGURE
+
+    sites, PUE, hardware_labels, emissions = compute_emissions_matrix(form_agg_data, form_metrics['runTime'], versioned_data)
+    order = rank_sites(emissions[:, 0])
+    current_emissions = form_metrics['carbonEmissions']
+    table = []
+    for rank, i in enumerate(order, start=1):
+        carbonEmissions = emissions[i, 0]
+        if current_emissions > 0:
+            change = f'{100 * (carbonEmissions / current_emissions - 1):+.0f}%'
+        else:
+            change = ''
+        table.append({
+            'rank': rank,
+            'label': sites.label[i],
+            'kind': sites.kind[i],
+            'continent': sites.continent[i],
+            'carbonIntensity': round(float(sites.carbonIntensity[i]), 2),
+            'PUE': float(PUE[i]),
+            'carbonEmissions': format_CE_text(float(carbonEmissions)),
+            'change': change,
+        })
+
+    # The current hardware, then the options needing the least energy
+    top_sites = order[:PLACEMENT_HEATMAP_SITES]
+    top_hardware = np.concatenate([[0], 1 + np.argsort(emissions[top_sites[0], 1:], kind='stable')])[:PLACEMENT_HEATMAP_HARDWARE]
+    figure = create_placement_heatmap_graphic(
+        sites.label[top_sites], hardware_labels[top_hardware], emissions[np.ix_(top_sites, top_hardware)]
+    )
+    return table, figure
+
+@HOME_PAGE.callback(
+    [
+        Output('lowest_carbon_provider', 'options'),
+        Output('lowest_carbon_continent', 'options'),
+    ],
+    Input('versioned_data', 'data'),
+)
+def set_lowest_carbon_filters_options(versioned_data):
+    versioned_data = resolve_versioned_data(versioned_data)
+    if versioned_data is None:
+        return [], []
+    index = get_datacenter_index(versioned_data)
+    return sorted(set(index.provider)), sorted(set(index.continent))
+
+@HOME_PAGE.callback(
+    Output('lowest_carbon_table', 'data'),
+    [
+        Input('lowest_carbon_provider', 'value'),
+        Input('lowest_carbon_continent', 'value'),
+        Input('lowest_carbon_max_CI', 'value'),
+        Input('lowest_carbon_k', 'value'),
+        Input('versioned_data', 'data'),
+    ],
+)
+def show_lowest_carbon_datacenters(provider, continent, max_carbon_intensity, k, versioned_data):
+    """
+    Lists the data centres with the lowest emissions factor matching the filters (see utils/placement.py).
+    """
+    versioned_data = resolve_versioned_data(versioned_data)
+    if versioned_data is None:
+        return []
+    datacenters = lowest_carbon_datacenters(
+        versioned_data,
+        k=min(int(k or DEFAULT_TOP_K), MAX_TOP_K),
+        provider=provider,
+        continent=continent,
+        max_carbon_intensity=max_carbon_intensity,
+    )
+    for datacenter in datacenters:
+        datacenter['emissionsFactor'] = round(datacenter['emissionsFactor'], 2)
+    return datacenters
+
+def format_utc_time(time: np.datetime64):
+    return np.datetime_as_string(time, unit='m').replace('T', ' ')
+
+@HOME_PAGE.callback(
+    Output('start_time_recommendation', 'children'),
+    [
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
+        Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
+        Input('start_time_earliest', 'value'),
+        Input('start_time_horizon', 'value'),
+    ],
+    State('versioned_data', 'data'),
+)
+def recommend_start_time(form_agg_data, form_metrics, earliest, horizon, versioned_data):
+    """
+    Recommends the start time minimising the emissions of the job within the horizon
+    (see utils/hourly_ci.py). By default, the job can start from the current hour.
+    """
+    versioned_data = resolve_versioned_data(versioned_data)
+    if (versioned_data is None) or (form_metrics['runTime'] is None):
+        return ''
+    location = form_agg_data['location']
+    series = get_hourly_carbon_intensity(versioned_data).get(location)
+    if series is None:
+        return f"No hourly carbon intensity is available for {location} in this version of the data."
+    if earliest:
+        try:
+            earliest = pd.Timestamp(earliest)
+        except ValueError:
+            return "The earliest start should be given as YYYY-MM-DD HH:MM."
+        earliest = earliest.tz_convert(None) if earliest.tz is not None else earliest
+    else:
+        earliest = pd.Timestamp.now(tz='UTC').tz_convert(None).floor('h')
+    if (horizon is None) or (horizon < 0):
+        horizon = DEFAULT_START_HORIZON
+
+    runTime = form_agg_data['runTime_hour'] + form_agg_data['runTime_min'] / 60
+    best_start, best_integral, integral_at_earliest = recommend_start_times(
+        location, earliest.to_datetime64(), runTime, int(horizon), versioned_data
+    )
+    if np.isnat(best_start[0]):
+        return (
+            f"The hourly carbon intensity of {location} covers {format_utc_time(series.start)} "
+            f"to {format_utc_time(series.end)} (UTC), which does not include the whole job "
+            "for any start time within this horizon."
+        )
+
+    # power_needed includes the PUE, in W
+    factor = form_metrics['power_needed'] / 1000 * form_agg_data['mult_factor']
+    text = f"Starting at {format_utc_time(best_start[0])} (UTC) " \
+           f"would emit {format_CE_text(factor * best_integral[0])}"
+    if not np.isnan(integral_at_earliest[0]):
+        text += f", against {format_CE_text(factor * integral_at_earliest[0])} when starting at the earliest"
+    return text + '.'
+
+@HOME_PAGE.callback(
+    Output('pareto_models', 'options'),
+    [
+        Input('pareto_workload_type', 'value'),
+        Input('versioned_data', 'data'),
+    ],
+)
+def set_pareto_models_options(coreType, versioned_data):
+    versioned_data = resolve_versioned_data(versioned_data)
+    if versioned_data is None:
+        return []
+    return sorted(versioned_data['cores_dict'][coreType])
+
+@HOME_PAGE.callback(
+    Output('pareto_graph', 'figure'),
+    [
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
+        Input(form_id('form_output_metrics', HOME_PAGE_ID_PREFIX), "data"),
+        Input('pareto_workload_type', 'value'),
+        Input('pareto_workload', 'value'),
+        Input('pareto_models', 'value'),
+        Input('pareto_parallel_fraction', 'value'),
+        Input('pareto_max_cores', 'value'),
+    ],
+    State('versioned_data', 'data'),
+)
+def show_pareto_front(form_agg_data, form_metrics, coreType, workload, models, parallel_fraction, max_cores, versioned_data):
+    """
+    Shows the Pareto front of the emissions vs runtime of the workload (see utils/pareto.py),
+    using the other inputs of the form. By default, the workload is the core-hours of the job
+    and only the model of the job is considered.
+    """
+    versioned_data = resolve_versioned_data(versioned_data)
+    if (versioned_data is None) or (form_metrics['runTime'] is None):
+        return BLANK_FIGURE
+
+    uses_coreType = form_agg_data['coreType'] in [coreType, 'Both']
+    # the job itself is shown when the workload is taken from it
+    current = form_metrics if (workload is None) and (form_agg_data['coreType'] == coreType) else None
+    if workload is None:
+        workload = form_metrics['runTime'] * form_agg_data[f'number{coreType}s'] if uses_coreType else 0
+    if (workload <= 0) or (parallel_fraction is None) or not (0 <= parallel_fraction <= 1) or not max_cores:
+        return BLANK_FIGURE
+    if not models and uses_coreType:
+        models = [form_agg_data[f'{coreType}model']]
+    if form_agg_data['platformType'] == 'cloudComputing':
+        location_PUE = versioned_data['pueDefault_dict']['Unknown']
+    else:
+        location_PUE = form_agg_data['PUE']
+
+    fronts, overall = optimise_workload(
+        workload=workload,
+        coreType=coreType,
+        models=models or [],
+        memory=form_agg_data['memory'],
+        usage=(form_agg_data[f'usage{coreType}'] if uses_coreType else 0) or 1.,
+        location_PUE=location_PUE,
+        versioned_data=versioned_data,
+        parallel_fraction=parallel_fraction,
+        max_cores=int(max_cores),
+    )
+    return create_pareto_front_graphic(fronts, overall, current)
+
 ## OUTPUT SUMMARY
 
 
 @HOME_PAGE.callback(
     Output('report_markdown', 'children'),
     [
-        Input(f'{HOME_PAGE_ID_PREFIX}-form_aggregate_data', "data"),
+        Input(form_id('form_aggregate_data', HOME_PAGE_ID_PREFIX), "data"),
         Input('versioned_data', 'data'),
         Input(f'{HOME_PAGE_ID_PREFIX}-energy_text', 'children'),
         Input(f'{HOME_PAGE_ID_PREFIX}-carbonEmissions_text', 'children'),
@@ -352,6 +966,7 @@ def fillin_report_text(form_agg_data, versioned_data, text_CE, text_energy, text
     Writes a summary text of the current computation that is shown as an example
     for the user on how to report its impact.
     """
+    versioned_data = resolve_versioned_data(versioned_data)
     if (form_agg_data['numberCPUs'] is None)&(form_agg_data['numberGPUs'] is None):
         return ""
     elif versioned_data is None:
@@ -0,0 +1,58 @@
+"""
+Shared fixtures of the tests, run from the root of the repository with `python -m pytest`.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.handle_inputs import CURRENT_VERSION, get_versioned_data
+
+
+@pytest.fixture(scope='session')
+def versioned_data():
+    return get_versioned_data(CURRENT_VERSION)
+
+
+@pytest.fixture(scope='session')
+def api_client():
+    """ Client of the JSON API alone, without building the Dash pages. """
+    from flask import Flask
+    from blueprints.api.api_blueprint import get_api_blueprint
+
+    server = Flask(__name__)
+    server.register_blueprint(get_api_blueprint())
+    return server.test_client()
+
+
+@pytest.fixture
+def hourly_series(tmp_path, monkeypatch):
+    """
+    Random hourly carbon intensity series for FR (three days from 2024-01-01) and DE (two days
+    from 2024-01-02), loaded as those of the current version for the duration of a test.
+    """
+    from utils import hourly_ci
+    from utils.handle_inputs import DATA_REGISTRY
+
+    rng = np.random.default_rng(0)
+    series = {
+        'FR': hourly_ci.HourlySeries(np.datetime64('2024-01-01T00:00'), rng.uniform(10, 100, 72)),
+        'DE': hourly_ci.HourlySeries(np.datetime64('2024-01-02T00:00'), rng.uniform(200, 600, 48)),
+    }
+    os.makedirs(tmp_path / hourly_ci.HOURLY_CI_DIRNAME)
+    for location, location_series in series.items():
+        hours = location_series.start + np.arange(len(location_series)) * hourly_ci.ONE_HOUR
+        csv = pd.DataFrame({'datetime': np.datetime_as_string(hours, unit='m'), 'carbonIntensity': location_series.carbonIntensity})
+        with open(tmp_path / hourly_ci.HOURLY_CI_DIRNAME / f'{location}.csv', 'w') as file:
+            file.write('Test hourly carbon intensity\n')
+            csv.to_csv(file, index=False)
+
+    monkeypatch.setattr(hourly_ci, 'get_data_dir', lambda version: str(tmp_path))
+    hourly_CI = hourly_ci.HourlyCarbonIntensity(get_versioned_data(CURRENT_VERSION))
+    monkeypatch.setitem(DATA_REGISTRY._indexes, (CURRENT_VERSION, 'hourly_CI'), hourly_CI)
+    return series
@@ -0,0 +1,160 @@
+"""
+Footprint endpoints of the JSON API: errors are reported as JSON with a 400 status code, naming the faulty inputs
+(on their own line for the NDJSON stream). The lowest-carbon data centres respect the query filters.
+"""
+
+import json
+
+import pytest
+
+import blueprints.api.api_blueprint as api_blueprint
+from utils.handle_inputs import CURRENT_VERSION, DEFAULT_VALUES
+from utils.placement import DEFAULT_TOP_K, MAX_TOP_K
+
+
+def test_footprint_of_a_job_with_a_few_fields(api_client):
+    response = api_client.post('/api/v1/footprint', json={'runTime_hour': 12, 'numberCPUs': 4})
+    assert response.status_code == 200
+    footprint = response.get_json()
+    assert (footprint['inputs']['runTime_hour'], footprint['inputs']['numberCPUs']) == (12, 4)
+    for key in ['coreType', 'CPUmodel', 'platformType', 'locationContinent', 'locationCountry', 'locationRegion']:
+        assert footprint['inputs'][key] == DEFAULT_VALUES[key]
+    assert footprint['location'] == DEFAULT_VALUES['locationRegion']
+    assert footprint['carbonEmissions'] > 0
+
+
+def test_footprint_of_an_empty_job(api_client):
+    response = api_client.post('/api/v1/footprint', json={})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('job, invalid_inputs', [
+    ({'numberCPUs': [1, 2]}, {'numberCPUs': [1, 2]}),
+    ({'numberCPUs': {'value': 1}}, {'numberCPUs': {'value': 1}}),
+    ({'memory': [[64]]}, {'memory': [[64]]}),
+    ({'coreType': 'TPU'}, {'coreType': 'TPU'}),
+    ({'usageCPUradio': 'Yes', 'usageCPU': 2}, {'usageCPU': 2}),
+    ({'appVersion': 'v0.1'}, {'appVersion': 'v0.1'}),
+    ({'memory': '1e400'}, {'memory': '1e400'}),
+    ({'CPUmodel': 'other', 'tdpCPU': 'inf'}, {'tdpCPU': 'inf'}),
+    ({'platformType': 'localServer', 'PUEradio': 'Yes', 'PUE': 'nan'}, {'PUE': 'nan'}),
+])
+def test_footprint_rejects_invalid_inputs(api_client, job, invalid_inputs):
+    response = api_client.post('/api/v1/footprint', json=job)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid inputs.', 'invalid_inputs': invalid_inputs}
+
+
+@pytest.mark.parametrize('body, invalid_inputs', [
+    ('{"runTime_min": 1e400}', {'runTime_min': 'inf'}),
+    ('{"memory": Infinity}', {'memory': 'inf'}),
+    ('{"numberCPUs": NaN}', {'numberCPUs': 'nan'}),
+    ('{"numberCPUs": [1, -Infinity]}', {'numberCPUs': [1, '-inf']}),
+])
+def test_footprint_rejects_non_finite_numbers_with_valid_json(api_client, body, invalid_inputs):
+    response = api_client.post('/api/v1/footprint', data=body, content_type='application/json')
+    assert response.status_code == 400
+    # the response must be strict JSON, without Infinity or NaN
+    assert json.loads(response.get_data(as_text=True), parse_constant=pytest.fail) == {
+        'error': 'Invalid inputs.', 'invalid_inputs': invalid_inputs
+    }
+
+
+def test_footprint_too_large_to_be_computed(api_client):
+    response = api_client.post('/api/v1/footprint', json={'runTime_hour': 1e300, 'numberCPUs': 1e300})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'The footprint of the job is too large to be computed.'}
+
+
+def test_footprint_rejects_unknown_inputs(api_client):
+    response = api_client.post('/api/v1/footprint', json={'numberTPUs': 4})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Unknown inputs.', 'unknown_inputs': ['numberTPUs']}
+
+
+@pytest.mark.parametrize('body', ['not json', '[1, 2]', '3'])
+def test_footprint_rejects_bodies_that_are_not_objects(api_client, body):
+    response = api_client.post('/api/v1/footprint', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'The job must be a JSON object.'}
+
+
+def test_footprint_accepts_lists_of_one_item(api_client):
+    response = api_client.post('/api/v1/footprint', json={'numberCPUs': [4]})
+    assert response.status_code == 200
+    assert response.get_json()['inputs']['numberCPUs'] == 4
+
+
+def read_stream(response):
+    return [json.loads(line, parse_constant=pytest.fail) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_reports_errors_on_their_own_line(api_client, monkeypatch):
+    estimate_job = api_blueprint.estimate_job
+
+    def failing_estimate_job(job, *args, **kwargs):
+        if job.get('numberCPUs') == 13:
+            raise RuntimeError('unexpected failure')
+        return estimate_job(job, *args, **kwargs)
+
+    monkeypatch.setattr(api_blueprint, 'estimate_job', failing_estimate_job)
+    lines = [
+        json.dumps({'numberCPUs': 4}),
+        '{"numberCPUs": ',
+        '',
+        json.dumps({'numberCPUs': [1, 2]}),
+        json.dumps({'numberCPUs': 13}),
+        '{"memory": Infinity}',
+        json.dumps({'numberCPUs': 2}),
+    ]
+    response = api_client.post('/api/v1/footprint/stream', data='\n'.join(lines) + '\n')
+    assert response.status_code == 200
+    records = read_stream(response)
+
+    assert len(records) == 6
+    assert records[0]['inputs']['numberCPUs'] == 4
+    assert records[1] == {'error': 'Invalid JSON.', 'line': 2}
+    assert records[2] == {'error': 'Invalid inputs.', 'invalid_inputs': {'numberCPUs': [1, 2]}, 'line': 4}
+    assert records[3] == {'error': 'The job could not be computed.', 'line': 5}
+    assert records[4] == {'error': 'Invalid inputs.', 'invalid_inputs': {'memory': 'inf'}, 'line': 6}
+    assert records[5]['inputs']['numberCPUs'] == 2
+
+
+def test_stream_rejects_lines_too_long(api_client):
+    job = json.dumps({'numberCPUs': 4})
+    body = job + '\n' + 'x' * (api_blueprint.MAX_JOB_LINE_LENGTH + 10) + '\n' + job + '\n'
+    records = read_stream(api_client.post('/api/v1/footprint/stream', data=body))
+    assert [record.get('error') for record in records] == [None, 'Line too long.', None]
+    assert records[1]['line'] == 2
+
+
+def test_lowest_carbon_applies_the_filters(api_client):
+    response = api_client.get('/api/v1/datacenters/lowest-carbon?k=3&provider=gcp&continent=Europe&max_carbon_intensity=200')
+    assert response.status_code == 200
+    datacenters = response.get_json()['datacenters']
+    assert len(datacenters) == 3
+    for datacenter in datacenters:
+        assert (datacenter['provider'], datacenter['continent']) == ('gcp', 'Europe')
+        assert datacenter['carbonIntensity'] <= 200
+    emissions_factors = [datacenter['emissionsFactor'] for datacenter in datacenters]
+    assert emissions_factors == sorted(emissions_factors)
+
+
+def test_lowest_carbon_default_number_of_datacenters(api_client):
+    response = api_client.get('/api/v1/datacenters/lowest-carbon')
+    assert response.get_json()['appVersion'] == CURRENT_VERSION
+    assert len(response.get_json()['datacenters']) == DEFAULT_TOP_K
+
+
+@pytest.mark.parametrize('query, invalid_inputs', [
+    ('k=0', {'k': '0'}),
+    ('k=abc', {'k': 'abc'}),
+    (f'k={MAX_TOP_K + 1}', {'k': str(MAX_TOP_K + 1)}),
+    ('max_carbon_intensity=low', {'max_carbon_intensity': 'low'}),
+    ('max_carbon_intensity=nan', {'max_carbon_intensity': 'nan'}),
+    ('appVersion=v0.1', {'appVersion': 'v0.1'}),
+])
+def test_lowest_carbon_rejects_invalid_inputs(api_client, query, invalid_inputs):
+    response = api_client.get(f'/api/v1/datacenters/lowest-carbon?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid inputs.', 'invalid_inputs': invalid_inputs}
@@ -0,0 +1,32 @@
+"""
+Routes of the Flask server of the app.
+"""
+
+import pytest
+
+import utils.handle_inputs as handle_inputs
+
+
+@pytest.fixture(scope='module')
+def app_client():
+    from app import app
+    return app.server.test_client()
+
+
+def test_pages_are_served(app_client):
+    assert app_client.get('/').status_code == 200
+    assert app_client.get('/ai').status_code == 200
+
+
+def test_ready_waits_for_the_preloaded_data(app_client, monkeypatch):
+    monkeypatch.setattr(handle_inputs, 'PRELOAD_DATA', True)
+    monkeypatch.setattr(handle_inputs.DATA_REGISTRY, 'warmed_up', False)
+    assert app_client.get('/ready').status_code == 503
+    monkeypatch.setattr(handle_inputs.DATA_REGISTRY, 'warmed_up', True)
+    assert app_client.get('/ready').status_code == 200
+
+
+def test_ready_without_preloading(app_client, monkeypatch):
+    monkeypatch.setattr(handle_inputs, 'PRELOAD_DATA', False)
+    monkeypatch.setattr(handle_inputs.DATA_REGISTRY, 'warmed_up', False)
+    assert app_client.get('/ready').status_code == 200
@@ -0,0 +1,107 @@
+"""
+Command-line batch estimator: output schema and reporting of the invalid inputs.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils.handle_inputs import DEFAULT_VALUES
+from utils.batch import (
+    BATCH_OUTPUT_KEYS, INVALID_INPUTS_KEY, START_TIME_KEY, HORIZON_KEY, HOURLY_EMISSIONS_KEY,
+    RECOMMENDED_START_TIME_KEY, RECOMMENDED_EMISSIONS_KEY, estimate_batch_from_dataframe, main,
+)
+
+
+LOCATION = 'locationContinent;locationCountry;locationRegion'
+IN_FRANCE = 'Europe;France;FR'
+
+
+def run_batch(tmp_path, manifest: str, extension: str = 'csv', args: tuple = ()):
+    manifest_path = tmp_path / f'jobs.{extension}'
+    manifest_path.write_text(manifest)
+    output_path = tmp_path / f'results.{extension}'
+    main([str(manifest_path), '-o', str(output_path), '--workers', '1', '--chunksize', '2', *args])
+    if extension == 'csv':
+        return pd.read_csv(output_path, sep=';', keep_default_na=False)
+    return [json.loads(line) for line in output_path.read_text().splitlines()]
+
+
+def test_csv_output_without_start_times(tmp_path):
+    results_df = run_batch(tmp_path, f'runTime_hour;numberCPUs;{LOCATION}\n12;4;{IN_FRANCE}\n2;8;{IN_FRANCE}\n3;x;{IN_FRANCE}\n')
+    expected_columns = ['runTime_hour', 'numberCPUs'] + LOCATION.split(';')
+    expected_columns += [key for key in DEFAULT_VALUES if key not in expected_columns]
+    assert list(results_df.columns) == expected_columns + ['appVersion'] + BATCH_OUTPUT_KEYS + [INVALID_INPUTS_KEY]
+    assert results_df[INVALID_INPUTS_KEY].tolist() == ['', '', 'numberCPUs']
+
+
+def test_start_horizon_option_needs_start_times(tmp_path):
+    results_df = run_batch(tmp_path, f'runTime_hour;{LOCATION}\n12;{IN_FRANCE}\n', args=('--start-horizon', '6'))
+    assert HORIZON_KEY not in results_df
+    assert RECOMMENDED_START_TIME_KEY not in results_df
+
+
+def test_csv_output_with_start_times(tmp_path):
+    results_df = run_batch(
+        tmp_path,
+        f'runTime_hour;{LOCATION};{START_TIME_KEY};{HORIZON_KEY}\n'
+        f'12;{IN_FRANCE};2024-01-01T00:00;12\n'
+        f'2;{IN_FRANCE};2024-01-01T00:00;abc\n'
+        f'2;{IN_FRANCE};yesterday;3\n'
+        f'2;{IN_FRANCE};2024-01-01T00:00;-1\n'
+        f'2;{IN_FRANCE};;\n'
+    )
+    assert list(results_df.columns[-4:]) == [
+        HOURLY_EMISSIONS_KEY, RECOMMENDED_START_TIME_KEY, RECOMMENDED_EMISSIONS_KEY, INVALID_INPUTS_KEY
+    ]
+    assert results_df[INVALID_INPUTS_KEY].tolist() == ['', HORIZON_KEY, START_TIME_KEY, HORIZON_KEY, '']
+    assert (results_df['carbonEmissions'] != '').tolist() == [True, False, False, False, True]
+
+
+def test_json_lines_keep_the_columns_of_later_chunks(tmp_path):
+    jobs = [
+        {'runTime_hour': 1, 'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR'},
+        {'runTime_hour': 2, 'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR'},
+        {'runTime_hour': 3, 'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR',
+         START_TIME_KEY: '2024-01-01T00:00'},
+    ]
+    records = run_batch(tmp_path, ''.join(json.dumps(job) + '\n' for job in jobs), extension='jsonl')
+    assert [record['runTime_hour'] for record in records] == [1, 2, 3]
+    assert all(record[INVALID_INPUTS_KEY] == '' for record in records)
+    assert HOURLY_EMISSIONS_KEY not in records[0]
+    assert HOURLY_EMISSIONS_KEY in records[2]
+
+
+def test_empty_manifest(tmp_path, capsys):
+    (tmp_path / 'jobs.jsonl').write_text('')
+    main([str(tmp_path / 'jobs.jsonl'), '-o', str(tmp_path / 'results.jsonl'), '--workers', '1'])
+    assert '0 jobs processed' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('horizon, valid', [(0, True), (24, True), ('6', True), (2.5, False), (-1, False), ('soon', False)])
+def test_start_horizon_validation(horizon, valid):
+    input_df = pd.DataFrame([{
+        'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR',
+        START_TIME_KEY: '2024-01-01T00:00', HORIZON_KEY: horizon,
+    }])
+    results_df = estimate_batch_from_dataframe(input_df)
+    assert results_df.at[0, INVALID_INPUTS_KEY] == ('' if valid else HORIZON_KEY)
+
+
+def test_manifest_with_a_few_fields(tmp_path):
+    results_df = run_batch(tmp_path, 'runTime_hour;numberCPUs\n12;4\n2;8\n')
+    assert results_df[INVALID_INPUTS_KEY].tolist() == ['', '']
+    assert results_df['location'].tolist() == [DEFAULT_VALUES['locationRegion']] * 2
+
+
+@pytest.mark.parametrize('job, invalid_inputs', [
+    ({'memory': '1e400'}, 'memory'),
+    ({'CPUmodel': 'other', 'tdpCPU': 'inf'}, 'tdpCPU'),
+    ({'runTime_min': float('nan')}, 'runTime_min'),
+    ({'platformType': 'localServer', 'PUEradio': 'Yes', 'PUE': '-inf'}, 'PUE'),
+    ({'memory': 32}, ''),
+])
+def test_non_finite_numbers_are_invalid(job, invalid_inputs):
+    results_df = estimate_batch_from_dataframe(pd.DataFrame([job], dtype=object))
+    assert results_df.at[0, INVALID_INPUTS_KEY] == invalid_inputs
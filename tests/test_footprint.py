@@ -0,0 +1,81 @@
+"""
+The form, the batch and the API compute the same footprint for the same inputs.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.handle_inputs import CURRENT_VERSION, DEFAULT_VALUES
+from utils.batch import estimate_batch, estimate_job
+from utils.footprint import get_used_fields, get_job_used_fields
+from blueprints.form.form_blueprint import aggregate_input_values
+
+
+JOBS = {
+    'local server': dict(locationRegion='CA-ON'),
+    'gpu with usage, PUE and multiplicative factor': dict(
+        coreType='GPU', GPUmodel='NVIDIA A100 40GB PCIe', numberGPUs=2, usageGPUradio='Yes', usageGPU=0.5,
+        PUEradio='Yes', PUE=1.3, mult_factor_radio='Yes', mult_factor=3,
+        locationContinent='Europe', locationCountry='France', locationRegion='FR',
+    ),
+    'both cores with a custom TDP on a personal computer': dict(
+        coreType='Both', CPUmodel='other', tdpCPU=10, numberCPUs=4, GPUmodel='Any', numberGPUs=1,
+        platformType='personalComputer', runTime_hour=1, runTime_min=30, locationRegion='CA-ON',
+    ),
+    'gcp data centre': dict(
+        platformType='cloudComputing', provider='gcp', serverContinent='North America', server='gcp--us-central1',
+    ),
+    'other azure data centre': dict(
+        platformType='cloudComputing', provider='azure', serverContinent='Europe', server='other',
+        PUEradio='Yes', PUE=1.2, locationContinent='Europe', locationCountry='France', locationRegion='FR',
+    ),
+    'aws, without data centres': dict(
+        platformType='cloudComputing', provider='aws', serverContinent='other', server='other',
+        locationContinent='North America', locationCountry='United States of America', locationRegion='US',
+    ),
+    'other provider': dict(
+        platformType='cloudComputing', provider='other', serverContinent='other', server='other',
+        locationContinent='Europe', locationCountry='France', locationRegion='FR',
+    ),
+}
+
+OUTPUT_KEYS = ['power_needed', 'energy_needed', 'carbonEmissions', 'CE_CPU', 'CE_GPU', 'CE_core', 'CE_memory']
+
+
+def compute_with_form(job: dict):
+    output, metrics = aggregate_input_values({**job, 'versioned_data': {'version': CURRENT_VERSION}})
+    return {**metrics, 'location': output['location'], 'carbonIntensity': output['carbonIntensity'], 'PUE': output['PUE']}
+
+
+@pytest.mark.parametrize('name', list(JOBS))
+def test_batch_and_api_match_the_form(name, api_client):
+    job = {**DEFAULT_VALUES, **JOBS[name]}
+    expected = compute_with_form(job)
+
+    batch_results = estimate_batch([job])[0]
+    assert batch_results['invalid_inputs'] == ''
+    job_results, invalid_inputs = estimate_job(job)
+    assert invalid_inputs == {}
+
+    response = api_client.post('/api/v1/footprint', json=job)
+    assert response.status_code == 200
+    api_results = response.get_json()
+    api_results.update(api_results.pop('breakdown'))
+
+    for results in [batch_results, job_results, api_results]:
+        assert results['location'] == expected['location']
+        for key in OUTPUT_KEYS + ['carbonIntensity', 'PUE']:
+            assert results[key] == pytest.approx(expected[key]), key
+
+
+def test_used_fields_of_a_batch_match_those_of_each_job(versioned_data):
+    jobs = [{**DEFAULT_VALUES, **job} for job in JOBS.values()]
+    used_fields, use_server, show_PUE_question = get_used_fields(
+        pd.DataFrame(jobs, dtype=object), np.ones(len(jobs), dtype=bool), versioned_data
+    )
+    for i, job in enumerate(jobs):
+        job_used_fields, job_use_server, job_show_PUE_question = get_job_used_fields(job, True, versioned_data)
+        assert set(used_fields.columns[used_fields.iloc[i].to_numpy()]) == job_used_fields
+        assert use_server[i] == job_use_server
+        assert show_PUE_question[i] == job_show_PUE_question
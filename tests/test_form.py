@@ -0,0 +1,89 @@
+"""
+Callbacks of the form shared by the pages, called as Dash would after a change of the given fields.
+"""
+
+import contextvars
+import json
+
+import pytest
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+
+from utils.handle_inputs import CURRENT_VERSION, DEFAULT_VALUES
+from blueprints.form.form_blueprint import resolve_location_and_server, display_pue_question, aggregate_input_values
+
+
+VERSION_TOKEN = {'version': CURRENT_VERSION}
+
+
+def call_callback(callback, triggered_fields: list, *args):
+    """ Calls a callback of the main form as if the given fields had just changed. """
+    triggered_inputs = [
+        {'prop_id': json.dumps({'field': field, 'form': 'main'}, separators=(',', ':')) + '.value'}
+        for field in triggered_fields
+    ]
+
+    def run():
+        context_value.set(AttributeDict(triggered_inputs=triggered_inputs))
+        return callback(*args)
+
+    return contextvars.copy_context().run(run)
+
+
+def resolve_server(provider: str, prev_serverContinent: str, prev_server: str, triggered_field: str = 'provider_dropdown'):
+    outputs = call_callback(
+        resolve_location_and_server, [triggered_field],
+        'cloudComputing', provider, prev_serverContinent, prev_server, 'Europe', 'France', 'FR', VERSION_TOKEN, None,
+    )
+    serverContinent, server, location_style, server_style = outputs[3], outputs[5], outputs[6], outputs[7]
+    return serverContinent, server, location_style['display'], server_style['display']
+
+
+def test_server_of_providers_with_data_centres():
+    assert resolve_server('gcp', 'Europe', 'gcp--europe-west1') == ('Europe', 'gcp--europe-west1', 'none', 'flex')
+    serverContinent, server, _, _ = resolve_server('azure', 'Europe', 'gcp--europe-west1')
+    assert (serverContinent, server.split('--')[0]) == ('Europe', 'azure')
+    assert resolve_server('gcp', 'Europe', 'other', 'server_dropdown') == ('Europe', 'other', 'flex', 'flex')
+    assert resolve_server('gcp', 'other', 'gcp--europe-west1', 'server_continent_dropdown') == ('other', 'other', 'flex', 'flex')
+
+
+def test_providers_without_data_centres_have_no_server():
+    # aws has no data centres: it gets no server, not even 'other', whatever the previous one
+    for prev_serverContinent, prev_server in [('Europe', 'gcp--europe-west1'), ('other', 'other'), (None, None)]:
+        assert resolve_server('aws', prev_serverContinent, prev_server) == (None, None, 'flex', 'none')
+        assert resolve_server('aws', prev_serverContinent, prev_server, 'versioned_data') == (None, None, 'flex', 'none')
+    assert resolve_server('other', 'other', 'other') == (None, None, 'flex', 'none')
+
+
+def get_form_state(**values):
+    return {
+        **DEFAULT_VALUES, 'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR',
+        'PUEradio': 'Yes', 'PUE': 3.0, **values, 'versioned_data': VERSION_TOKEN,
+    }
+
+
+def test_aws_ignores_the_PUE_of_the_user():
+    serverContinent, server, _, _ = resolve_server('aws', 'other', 'other')
+    form_state = get_form_state(platformType='cloudComputing', provider='aws', serverContinent=serverContinent, server=server)
+    assert display_pue_question(form_state) == {'display': 'none'}
+    output, _ = aggregate_input_values(form_state)
+    assert output['PUE'] == 1.2
+
+
+@pytest.mark.parametrize('values, shown', [
+    (dict(platformType='localServer'), True),
+    (dict(platformType='personalComputer'), False),
+    (dict(platformType='cloudComputing', provider='gcp', serverContinent='Europe', server='gcp--europe-west1'), False),
+    (dict(platformType='cloudComputing', provider='gcp', serverContinent='Europe', server='other'), True),
+    (dict(platformType='cloudComputing', provider='gcp', serverContinent='other', server='other'), True),
+    (dict(platformType='cloudComputing', provider='other', serverContinent=None, server=None), True),
+    # whatever the server left in the state, aws has no data centres and uses its own PUE
+    (dict(platformType='cloudComputing', provider='aws', serverContinent=None, server=None), False),
+    (dict(platformType='cloudComputing', provider='aws', serverContinent='other', server='other'), False),
+])
+def test_PUE_question_is_shown_when_its_answer_is_used(values, shown):
+    assert display_pue_question(get_form_state(**values)) == {'display': 'flex' if shown else 'none'}
+    output, _ = aggregate_input_values(get_form_state(**values))
+    output_without_PUE, _ = aggregate_input_values(get_form_state(**values, PUEradio='No'))
+    assert (output['PUE'] == 3.0) == shown
+    assert (output['PUE'] != output_without_PUE['PUE']) == shown
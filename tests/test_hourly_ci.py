@@ -0,0 +1,157 @@
+"""
+Hourly carbon intensity: the integrals from the prefix sums and the recommended start times
+match a direct hour-by-hour computation.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.handle_inputs import DEFAULT_VALUES
+from utils import hourly_ci
+from utils.hourly_ci import (
+    ONE_HOUR, HOURLY_CI_DIRNAME, MAX_CANDIDATES_PER_CHUNK, HourlySeries, read_hourly_series, compute_emissions_over_windows,
+    sliding_window_argmin, recommend_start_times,
+)
+from utils.batch import START_TIME_KEY, HOURLY_EMISSIONS_KEY, INVALID_INPUTS_KEY, estimate_batch_from_dataframe
+
+
+def direct_integral(series: HourlySeries, start, end):
+    """ Carbon intensity integrated over [start, end), adding up the overlap of the window with each hour. """
+    start, end = series.to_hours(start)[0], series.to_hours(end)[0]
+    if (start < 0) or (end > len(series)):
+        return np.nan
+    return sum(
+        carbonIntensity * max(0., min(end, hour + 1) - max(start, hour))
+        for hour, carbonIntensity in enumerate(series.carbonIntensity)
+    )
+
+
+def random_windows(series: HourlySeries, n: int, seed: int = 0):
+    """ Windows starting anywhere from an hour before the series and lasting up to a day. """
+    rng = np.random.default_rng(seed)
+    start = series.start + (rng.uniform(-1, len(series), n) * 3600e9).astype('timedelta64[ns]')
+    end = start + (rng.uniform(0, 24, n) * 3600e9).astype('timedelta64[ns]')
+    return start, end
+
+
+def test_integrals_match_a_direct_computation(hourly_series):
+    series = hourly_series['FR']
+    start, end = random_windows(series, 200)
+    expected = [direct_integral(series, s, e) for s, e in zip(start, end)]
+    assert np.isnan(expected).any() and not np.isnan(expected).all()
+    np.testing.assert_allclose(series.integrate(start, end), expected)
+
+
+def test_integrals_of_whole_hours(hourly_series):
+    series = hourly_series['FR']
+    assert series.integrate(series.start, series.end)[0] == pytest.approx(series.carbonIntensity.sum())
+    assert series.integrate(series.start + ONE_HOUR, series.start + 3 * ONE_HOUR)[0] == pytest.approx(series.carbonIntensity[1:3].sum())
+    assert series.mean('2024-01-01T05:00', '2024-01-01T05:30')[0] == pytest.approx(series.carbonIntensity[5])
+    assert np.isnan(series.integrate(series.start, series.end + ONE_HOUR)[0])
+
+
+def test_emissions_over_windows_in_several_locations(hourly_series, versioned_data):
+    start, end = random_windows(hourly_series['FR'], 100)
+    location = np.array(['FR', 'DE', 'US'] * 34, dtype=object)[:100]
+    power_needed = np.linspace(10, 1000, 100)
+    emissions = compute_emissions_over_windows(power_needed, start, end, location, versioned_data, mult_factor=2)
+
+    for i in range(100):
+        if location[i] in hourly_series:
+            expected = power_needed[i] / 1000 * direct_integral(hourly_series[location[i]], start[i], end[i]) * 2
+        else:
+            expected = np.nan
+        np.testing.assert_allclose(emissions[i], expected, err_msg=location[i])
+
+
+def test_hourly_emissions_of_a_batch(hourly_series):
+    input_df = pd.DataFrame([
+        {'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR', START_TIME_KEY: '2024-01-01T10:30'},
+        {'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR', START_TIME_KEY: '2024-01-03T20:00'},
+        {'locationContinent': 'Europe', 'locationCountry': 'France', 'locationRegion': 'FR', START_TIME_KEY: ''},
+    ])
+    results_df = estimate_batch_from_dataframe(input_df)
+    assert results_df[INVALID_INPUTS_KEY].tolist() == ['', '', '']
+
+    runTime = DEFAULT_VALUES['runTime_hour'] + DEFAULT_VALUES['runTime_min'] / 60
+    start = np.datetime64('2024-01-01T10:30')
+    integral = direct_integral(hourly_series['FR'], start, start + np.timedelta64(int(runTime * 60), 'm'))
+    assert results_df.at[0, HOURLY_EMISSIONS_KEY] == pytest.approx(results_df.at[0, 'power_needed'] / 1000 * integral)
+    # the second job ends after the series, the third one has no start time
+    assert results_df[HOURLY_EMISSIONS_KEY].isna().tolist() == [False, True, True]
+
+
+def test_hours_must_be_consecutive(tmp_path):
+    csv_path = tmp_path / HOURLY_CI_DIRNAME / 'FR.csv'
+    csv_path.parent.mkdir()
+    csv_path.write_text('metadata\ndatetime,carbonIntensity\n2024-01-01T00:00,10\n2024-01-01T02:00,20\n')
+    with pytest.raises(AssertionError):
+        read_hourly_series(str(csv_path))
+
+
+def brute_force_argmin(values: np.ndarray, width: int):
+    return np.array([i + np.argmin(values[i:i + width]) for i in range(len(values))])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_sliding_window_argmin_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    # few distinct values, so that ties are frequent
+    values = rng.integers(0, 5, size=50).astype(float)
+    for width in [1, 2, 3, 7, 49, 50, 60]:
+        assert sliding_window_argmin(values, width).tolist() == brute_force_argmin(values, width).tolist()
+
+
+def test_sliding_window_argmin_of_sorted_values():
+    assert sliding_window_argmin(np.arange(5.), 3).tolist() == [0, 1, 2, 3, 4]
+    assert sliding_window_argmin(np.arange(5.)[::-1], 3).tolist() == [2, 3, 4, 4, 4]
+
+
+def scan_start_times(series: HourlySeries, earliest, runTime: float, horizon: int):
+    """
+    Tries the earliest start and every whole hour up to the end of the horizon,
+    keeping the first window with the least carbon intensity (whole hours first).
+    """
+    duration = np.timedelta64(int(round(runTime * 3600e9)), 'ns')
+    first_hour = series.start + int(np.ceil(series.to_hours(earliest)[0])) * ONE_HOUR
+    candidates = list(np.arange(first_hour, earliest + horizon * ONE_HOUR + np.timedelta64(1, 'ns'), ONE_HOUR))
+    if earliest != first_hour:
+        candidates.append(earliest)
+    best_start, best_integral = np.datetime64('NaT'), np.nan
+    for start in candidates:
+        integral = direct_integral(series, start, start + duration)
+        if not (integral >= best_integral):
+            if not np.isnan(integral):
+                best_start, best_integral = start, integral
+    return best_start, best_integral
+
+
+@pytest.mark.parametrize('max_candidates_per_chunk', [MAX_CANDIDATES_PER_CHUNK, 50])
+def test_recommended_start_times_match_a_direct_scan(hourly_series, versioned_data, monkeypatch, max_candidates_per_chunk):
+    monkeypatch.setattr(hourly_ci, 'MAX_CANDIDATES_PER_CHUNK', max_candidates_per_chunk)
+    rng = np.random.default_rng(1)
+    n_jobs = 300
+    # jobs with random earliest starts (on whole hours or not), runtimes and horizons...
+    earliest = hourly_series['FR'].start + (rng.uniform(-5, 80, n_jobs) * 60).astype(int) * np.timedelta64(1, 'm')
+    earliest[::3] = earliest[::3].astype('datetime64[h]')
+    runTime = rng.uniform(0.5, 20, n_jobs)
+    runTime[::4] = np.round(runTime[::4])
+    horizon = rng.integers(0, 30, n_jobs)
+    location = rng.choice(np.array(['FR', 'DE', 'US'], dtype=object), n_jobs)
+    # ... and many jobs with the same runtime and horizon, which share a sliding window pass
+    runTime[:100], horizon[:100], location[:100] = 3., 12, 'FR'
+
+    best_start, best_integral, integral_at_earliest = recommend_start_times(location, earliest, runTime, horizon, versioned_data)
+
+    for i in range(n_jobs):
+        series = hourly_series.get(location[i])
+        if series is None:
+            assert np.isnat(best_start[i]) and np.isnan(best_integral[i])
+            continue
+        expected_start, expected_integral = scan_start_times(series, earliest[i], runTime[i], horizon[i])
+        assert best_start[i] == expected_start or (np.isnat(best_start[i]) and np.isnat(expected_start)), i
+        np.testing.assert_allclose(best_integral[i], expected_integral, err_msg=str(i))
+        duration = np.timedelta64(int(round(runTime[i] * 3600e9)), 'ns')
+        np.testing.assert_allclose(integral_at_earliest[i], direct_integral(series, earliest[i], earliest[i] + duration))
+    assert (~np.isnat(best_start)).sum() > n_jobs / 2
@@ -0,0 +1,24 @@
+"""
+Batch import of the csv files with several rows.
+"""
+
+import base64
+
+from blueprints.import_export.import_export_blueprint import compute_batch_results_df
+
+
+def get_upload_content(rows: list):
+    return 'data:text/csv;base64,' + base64.b64encode(('\n'.join(rows) + '\n').encode()).decode()
+
+
+def test_batch_results_of_a_csv_with_several_rows():
+    rows = ['runTime_hour;numberCPUs;locationRegion', '12;4;CA-ON', '1;8;CA-ON', '2;abc;CA-ON']
+    results_df = compute_batch_results_df(get_upload_content(rows), 'jobs.csv')
+    assert len(results_df) == 3
+    assert results_df['invalid_inputs'].tolist() == ['', '', 'numberCPUs']
+    assert results_df['carbonEmissions'].notnull().tolist() == [True, True, False]
+
+
+def test_no_batch_results_for_a_single_row():
+    assert compute_batch_results_df(get_upload_content(['runTime_hour;numberCPUs', '12;4']), 'jobs.csv') is None
+    assert compute_batch_results_df(None, None) is None
@@ -0,0 +1,37 @@
+"""
+The Pareto front of emissions vs runtime matches a brute-force dominance check.
+"""
+
+import numpy as np
+import pytest
+
+from utils.pareto import pareto_front
+
+
+def brute_force_front(runTime: np.ndarray, carbonEmissions: np.ndarray):
+    front = []
+    for i in range(len(runTime)):
+        dominated = any(
+            (runTime[j] <= runTime[i]) and (carbonEmissions[j] <= carbonEmissions[i])
+            and ((runTime[j] < runTime[i]) or (carbonEmissions[j] < carbonEmissions[i]))
+            for j in range(len(runTime))
+        )
+        if not dominated:
+            front.append(i)
+    return sorted(front, key=lambda i: runTime[i])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pareto_front_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    runTime = rng.random(200)
+    carbonEmissions = rng.random(200)
+    assert pareto_front(runTime, carbonEmissions).tolist() == brute_force_front(runTime, carbonEmissions)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pareto_front_with_equal_runtimes(seed):
+    rng = np.random.default_rng(seed)
+    runTime = rng.integers(1, 10, size=100).astype(float)
+    carbonEmissions = rng.random(100)
+    assert pareto_front(runTime, carbonEmissions).tolist() == brute_force_front(runTime, carbonEmissions)
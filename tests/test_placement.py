@@ -0,0 +1,132 @@
+"""
+Ranking of the places where a job can run and lowest-carbon data centres,
+checked against a place-by-place computation.
+"""
+
+import math
+
+import pytest
+
+from utils.handle_inputs import CURRENT_VERSION, DEFAULT_VALUES
+from utils.footprint import compute_footprint
+from utils.placement import compute_emissions_matrix, rank_sites, lowest_carbon_datacenters
+from blueprints.form.form_blueprint import aggregate_input_values
+
+
+JOB = dict(
+    coreType='Both', CPUmodel='Xeon E5-2683 v4', numberCPUs=8, GPUmodel='NVIDIA Tesla V100', numberGPUs=2,
+    usageGPUradio='Yes', usageGPU=0.7, memory=32, runTime_hour=5, runTime_min=30,
+    PUEradio='Yes', PUE=1.4, mult_factor_radio='Yes', mult_factor=2,
+)
+
+
+def compute_with_form(job: dict):
+    return aggregate_input_values({**DEFAULT_VALUES, **job, 'versioned_data': {'version': CURRENT_VERSION}})
+
+
+def site_PUE(name: str, job_PUE: float, versioned_data: dict):
+    datacenter = versioned_data['datacenters_dict_byName'].get(name)
+    if datacenter is None:
+        return job_PUE
+    if not math.isnan(datacenter['PUE']):
+        return datacenter['PUE']
+    return versioned_data['pueDefault_dict'].get(datacenter['provider'], versioned_data['pueDefault_dict']['Unknown'])
+
+
+def test_ranking_matches_a_site_by_site_computation(versioned_data):
+    form_agg_data, form_metrics = compute_with_form(JOB)
+    sites, PUE, hardware_labels, emissions = compute_emissions_matrix(form_agg_data, form_metrics['runTime'], versioned_data)
+    assert hardware_labels[0] == 'Current hardware'
+
+    expected = []
+    for i, name in enumerate(sites.name):
+        location = versioned_data['datacenters_dict_byName'].get(name, {}).get('location', name)
+        expected.append(float(compute_footprint(
+            runTime=form_metrics['runTime'], PUE=site_PUE(name, JOB['PUE'], versioned_data),
+            numberCPUs=8, tdpCPU=form_agg_data['tdpCPU'], usageCPU=1., numberGPUs=2, tdpGPU=form_agg_data['tdpGPU'], usageGPU=0.7,
+            memory=32, memoryPower=versioned_data['refValues_dict']['memoryPower'],
+            carbonIntensity=versioned_data['CI_dict_byLoc'][location]['carbonIntensity'], mult_factor=2,
+        )['carbonEmissions']))
+        assert emissions[i, 0] == pytest.approx(expected[i]), name
+
+    assert list(rank_sites(emissions[:, 0])) == sorted(range(len(expected)), key=lambda i: (expected[i], i))
+
+
+def test_emissions_of_the_current_hardware_match_the_form(versioned_data):
+    form_agg_data, form_metrics = compute_with_form(JOB)
+    sites, _, _, emissions = compute_emissions_matrix(form_agg_data, form_metrics['runTime'], versioned_data)
+    emissions_by_name = dict(zip(sites.name, emissions[:, 0]))
+
+    assert emissions_by_name[form_agg_data['location']] == pytest.approx(form_metrics['carbonEmissions'])
+    for location in ['FR', 'US-CA']:
+        location_data = versioned_data['CI_dict_byLoc'][location]
+        _, metrics = compute_with_form(dict(
+            JOB, locationContinent=location_data['continentName'], locationCountry=location_data['countryName'],
+            locationRegion=location,
+        ))
+        assert emissions_by_name[location] == pytest.approx(metrics['carbonEmissions'])
+    for server in ['gcp--us-west1', 'gcp--us-west2']:
+        _, metrics = compute_with_form(dict(
+            JOB, platformType='cloudComputing', provider='gcp', serverContinent='North America', server=server, PUEradio='No',
+        ))
+        assert emissions_by_name[server] == pytest.approx(metrics['carbonEmissions'])
+
+
+def test_other_hardware_options(versioned_data):
+    form_agg_data, form_metrics = compute_with_form(JOB)
+    sites, PUE, hardware_labels, emissions = compute_emissions_matrix(form_agg_data, form_metrics['runTime'], versioned_data)
+    # the job uses GPUs: the options are the GPU models, used as much as the current GPUs
+    GPU_models = versioned_data['cores_dict']['GPU']
+    assert list(hardware_labels[1:]) == list(GPU_models)
+    first = rank_sites(emissions[:, 0])[0]
+    for j, model in enumerate(hardware_labels[1:], start=1):
+        expected = compute_footprint(
+            runTime=form_metrics['runTime'], PUE=PUE[first],
+            numberCPUs=8, tdpCPU=form_agg_data['tdpCPU'], usageCPU=1., numberGPUs=2, tdpGPU=GPU_models[model], usageGPU=0.7,
+            memory=32, memoryPower=versioned_data['refValues_dict']['memoryPower'],
+            carbonIntensity=sites.carbonIntensity[first], mult_factor=2,
+        )['carbonEmissions']
+        assert emissions[first, j] == pytest.approx(float(expected)), model
+
+
+def brute_force_lowest_carbon(versioned_data: dict, k: int, provider=None, continent=None, max_carbon_intensity=None):
+    datacenters = []
+    for name, datacenter in versioned_data['datacenters_dict_byName'].items():
+        location_data = versioned_data['CI_dict_byLoc'].get(datacenter['location'])
+        if location_data is None:
+            continue
+        if (provider is not None) and (datacenter['provider'] != provider):
+            continue
+        if (continent is not None) and (location_data['continentName'] != continent):
+            continue
+        if (max_carbon_intensity is not None) and (location_data['carbonIntensity'] > max_carbon_intensity):
+            continue
+        datacenters.append((location_data['carbonIntensity'] * site_PUE(name, None, versioned_data), name))
+    return [name for _, name in sorted(datacenters)[:k]]
+
+
+@pytest.mark.parametrize('k, provider, continent, max_carbon_intensity', [
+    (5, None, None, None),
+    (100, None, None, None),
+    (3, 'gcp', None, None),
+    (10, None, 'Europe', None),
+    (10, 'azure', 'North America', None),
+    (100, None, None, 100.),
+    (4, 'gcp', 'Asia', 500.),
+    (5, 'aws', None, None),
+    (5, 'unknown provider', None, None),
+    (5, None, None, 0.),
+])
+def test_lowest_carbon_datacenters_match_a_brute_force_scan(versioned_data, k, provider, continent, max_carbon_intensity):
+    datacenters = lowest_carbon_datacenters(versioned_data, k, provider, continent, max_carbon_intensity)
+    assert [datacenter['name_unique'] for datacenter in datacenters] == brute_force_lowest_carbon(
+        versioned_data, k, provider, continent, max_carbon_intensity
+    )
+    assert len(datacenters) <= k
+    for datacenter in datacenters:
+        assert provider in [None, datacenter['provider']]
+        assert continent in [None, datacenter['continent']]
+        assert (max_carbon_intensity is None) or (datacenter['carbonIntensity'] <= max_carbon_intensity)
+        assert datacenter['emissionsFactor'] == pytest.approx(datacenter['carbonIntensity'] * datacenter['PUE'])
+    emissions_factors = [datacenter['emissionsFactor'] for datacenter in datacenters]
+    assert emissions_factors == sorted(emissions_factors)
@@ -0,0 +1,60 @@
+"""
+Discrete-event scheduling of the jobs on the sites, on small cases with known start times.
+"""
+
+import numpy as np
+
+from utils.simulation import schedule
+
+
+class FixedCarbonIntensity:
+    """ Same interface as SiteCarbonIntensity, with a constant carbon intensity per site. """
+
+    def __init__(self, carbonIntensities: list):
+        self.carbonIntensities = carbonIntensities
+
+    def at(self, site: int, seconds: float):
+        return self.carbonIntensities[site]
+
+
+def test_schedule_fifo_on_a_single_site():
+    start, ran_on = schedule(
+        release=np.array([0., 0., 0., 10., 20.]),
+        runTime=np.array([100., 50., 10., 5., 1.]),
+        cores=np.array([2, 2, 2, 1, 8]),
+        gpus=np.zeros(5, dtype=int),
+        sites=np.zeros(5, dtype=int),
+        capacities=[{'cores': 4, 'gpus': 0}],
+    )
+    # the third job waits for the second one, and the fourth one is not allowed to overtake it;
+    # the last one never fits on the site
+    assert start[:4].tolist() == [0., 0., 50., 60.]
+    assert np.isnan(start[4])
+    assert ran_on.tolist() == [0, 0, 0, 0, 0]
+
+
+def test_schedule_fifo_queues_each_site_separately():
+    start, ran_on = schedule(
+        release=np.array([0., 0., 1.]),
+        runTime=np.array([10., 10., 10.]),
+        cores=np.array([1, 1, 1]),
+        gpus=np.array([1, 1, 0]),
+        sites=np.array([0, 0, 1]),
+        capacities=[{'cores': 4, 'gpus': 1}, {'cores': 1, 'gpus': 0}],
+    )
+    assert start.tolist() == [0., 10., 1.]
+    assert ran_on.tolist() == [0, 0, 1]
+
+
+def test_schedule_cross_site_picks_the_lowest_carbon_site_with_room():
+    start, ran_on = schedule(
+        release=np.array([0., 0., 0.]),
+        runTime=np.array([10., 30., 5.]),
+        cores=np.array([2, 2, 2]),
+        gpus=np.zeros(3, dtype=int),
+        sites=np.zeros(3, dtype=int),
+        capacities=[{'cores': 2, 'gpus': 0}, {'cores': 2, 'gpus': 0}],
+        site_CI=FixedCarbonIntensity([300., 100.]),
+    )
+    assert start.tolist() == [0., 0., 10.]
+    assert ran_on.tolist() == [1, 0, 1]
@@ -0,0 +1,68 @@
+"""
+Monte Carlo uncertainty of the footprint: truncated distributions and percentiles.
+"""
+
+import numpy as np
+import pytest
+
+from utils.footprint import compute_footprint
+from utils.uncertainty import (
+    DISTRIBUTIONS, UNCERTAIN_INPUTS, PERCENTILES, UNCERTAIN_OUTPUTS,
+    sample_distribution, footprint_percentiles, percentile_key,
+)
+
+
+INPUTS = dict(
+    runTime=12, PUE=1.67, numberCPUs=12, tdpCPU=12, usageCPU=1., numberGPUs=1, tdpGPU=200, usageGPU=0.8,
+    memory=64, memoryPower=0.3725, carbonIntensity=300., mult_factor=1,
+)
+
+
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+@pytest.mark.parametrize('input_key, value', [('PUE', 1.05), ('PUE', 1.), ('usage', 0.95), ('usage', 1.), ('tdp', 5.)])
+def test_truncated_samples_stay_within_their_bounds(distribution, input_key, value):
+    bounds = UNCERTAIN_INPUTS[input_key]
+    samples = sample_distribution(value, distribution, 0.5, 10_000, np.random.default_rng(0), bounds)
+    assert len(samples) == 10_000
+    assert (samples >= bounds[0]).all() and (samples <= bounds[1]).all()
+    # truncated rather than clipped: the samples do not pile up on the bounds
+    assert np.mean(samples == bounds[0]) < 0.01
+    assert np.mean(samples == bounds[1]) < 0.01
+
+
+def test_truncated_uniform_distribution():
+    # uniform on [0.5, 1.5] truncated to [1, inf) is uniform on [1, 1.5]
+    samples = sample_distribution(1., 'uniform', 0.5, 100_000, np.random.default_rng(0), (1, np.inf))
+    assert samples.min() >= 1 and samples.max() <= 1.5
+    assert samples.mean() == pytest.approx(1.25, abs=0.005)
+    assert np.histogram(samples, bins=5, range=(1, 1.5))[0] / len(samples) == pytest.approx([0.2] * 5, abs=0.01)
+
+
+def test_values_without_uncertainty_are_not_sampled():
+    assert sample_distribution(1.5, 'normal', 0, 100, np.random.default_rng(0)) == 1.5
+    assert sample_distribution(0, 'normal', 0.1, 100, np.random.default_rng(0)) == 0
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        sample_distribution(1.5, 'poisson', 0.1, 100, np.random.default_rng(0))
+
+
+def test_percentiles_without_uncertainty_are_the_point_estimate():
+    no_uncertainty = {key: {'spread': 0.} for key in UNCERTAIN_INPUTS}
+    results = footprint_percentiles(INPUTS, no_uncertainty, n_samples=1000)
+    point_estimate = compute_footprint(**INPUTS)
+    for key in UNCERTAIN_OUTPUTS:
+        for percentile in PERCENTILES:
+            assert results[percentile_key(key, percentile)] == pytest.approx(float(point_estimate[key]))
+
+
+def test_percentiles_around_the_point_estimate():
+    uncertainties = {'carbonIntensity': {'distribution': 'normal', 'spread': 0.2}}
+    results = footprint_percentiles(INPUTS, uncertainties, n_samples=100_000)
+    point_estimate = float(compute_footprint(**INPUTS)['carbonEmissions'])
+    assert results['carbonEmissions_p5'] < results['carbonEmissions_p50'] < results['carbonEmissions_p95']
+    assert results['carbonEmissions_p50'] == pytest.approx(point_estimate, rel=0.02)
+    # only the carbon intensity is uncertain with a normal distribution: p95 is about 1.645 standard deviations above
+    assert results['carbonEmissions_p95'] == pytest.approx(point_estimate * (1 + 1.645 * 0.2), rel=0.02)
+    assert footprint_percentiles(INPUTS, uncertainties, n_samples=1000) == footprint_percentiles(INPUTS, uncertainties, n_samples=1000)
@@ -0,0 +1,138 @@
+"""
+The compiled validator (see MainFormValidator) accepts and rejects the same inputs as the
+per-field checks it replaced, which looked the options up in the lists of the dropdowns.
+"""
+
+import copy
+
+import pandas as pd
+import pytest
+
+from utils.utils import unlist
+from utils.handle_inputs import (
+    CURRENT_VERSION, APP_VERSION_OPTIONS_LIST, DEFAULT_VALUES, get_versioned_data, get_main_form_validator,
+    availableLocations_continent, availableOptions_servers, availableOptions_country, availableOptions_region,
+)
+
+
+def previous_validateKey(key, value, input_dict: dict, data: dict):
+    """ The per-field checks of validate_main_form_inputs before the validator was compiled. """
+    new_val = copy.copy(value)
+    if key in ['runTime_hour', 'numberCPUs', 'numberGPUs']:
+        new_val = int(float(new_val))
+    elif key in ['runTime_min']:
+        new_val = float(new_val)
+        assert new_val >= 0
+    elif key in ['mult_factor']:
+        new_val = int(new_val)
+        assert new_val >= 1
+    elif key in ['tdpCPU', 'tdpGPU', 'memory']:
+        new_val = float(new_val)
+        assert new_val >= 0
+    elif key in ['usageCPU', 'usageGPU']:
+        new_val = float(new_val)
+        assert (new_val >= 0) & (new_val <= 1)
+    elif key in ['usageCPUradio', 'usageGPUradio', 'PUEradio', 'mult_factor_radio']:
+        assert new_val in ['Yes', 'No']
+    elif key == 'coreType':
+        assert new_val in ['CPU', 'GPU', 'Both']
+    elif key in ['CPUmodel', 'GPUmodel']:
+        assert new_val in list(data['cores_dict'][key[:3]]) + ['other']
+    elif key == 'platformType':
+        assert new_val in list(data['providersTypes']) + ['personalComputer', 'localServer']
+    elif key == 'provider':
+        if unlist(input_dict['platformType']) == 'cloudComputing':
+            assert (new_val in data['platformName_byType']['cloudComputing']) | (new_val == 'other')
+    elif key == 'serverContinent':
+        assert new_val in availableLocations_continent(unlist(input_dict['provider']), versioned_data=data) + ['other']
+    elif key == 'server':
+        list_servers = availableOptions_servers(
+            unlist(input_dict['provider']), unlist(input_dict['serverContinent']), versioned_data=data
+        )
+        assert new_val in [x['name_unique'] for x in list_servers] + ['other']
+    elif key == 'locationContinent':
+        assert new_val in list(data['CI_dict_byName'].keys())
+    elif key == 'locationCountry':
+        assert new_val in availableOptions_country(unlist(input_dict['locationContinent']), versioned_data=data)
+    elif key == 'locationRegion':
+        assert new_val in availableOptions_region(
+            unlist(input_dict['locationContinent']), unlist(input_dict['locationCountry']), data=data
+        )
+    elif key == 'PUE':
+        new_val = float(new_val)
+        assert new_val >= 1
+    elif key == 'appVersion':
+        assert new_val in APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION]
+    else:
+        assert False, 'Unknown key'
+    return new_val
+
+
+def previous_validate(input_dict: dict, data: dict, keys_of_interest: list):
+    clean_inputs, wrong_inputs = {}, {}
+    for key in keys_of_interest:
+        value = unlist(input_dict[key])
+        try:
+            clean_inputs[key] = previous_validateKey(key, value, input_dict, data)
+        except Exception:
+            wrong_inputs[key] = value
+    return clean_inputs, wrong_inputs
+
+
+def get_test_inputs():
+    """
+    Inputs differing from the default values by one field, valid or not, along with
+    combinations of the fields whose validity depends on each other.
+    """
+    candidates = {
+        'runTime_hour': [0, 3, '4', '2.5', -1, 'abc', None],
+        'runTime_min': [0, 30.5, '15', -1, 'abc'],
+        'numberCPUs': [1, '8', 2.7, 'x'],
+        'numberGPUs': [0, 4, None],
+        'tdpCPU': [0, 12.5, -3, '7'],
+        'memory': [16, -1, 'lots'],
+        'usageCPU': [0, 0.5, 1, 1.5, -0.1],
+        'usageCPUradio': ['Yes', 'No', 'yes', None],
+        'mult_factor': [1, 3, 0, '2'],
+        'coreType': ['CPU', 'GPU', 'Both', 'TPU'],
+        'CPUmodel': ['Xeon E5-2683 v4', 'Any', 'other', 'Pentium'],
+        'GPUmodel': ['NVIDIA A100 40GB PCIe', 'other', 'Voodoo'],
+        'platformType': ['localServer', 'personalComputer', 'cloudComputing', 'mainframe'],
+        'PUE': [1, 1.5, 0.9, 'abc'],
+        'appVersion': [CURRENT_VERSION, 'v2.2', 'v0.1'],
+    }
+    inputs = [dict(DEFAULT_VALUES, appVersion=CURRENT_VERSION)]
+    for key, values in candidates.items():
+        inputs += [dict(inputs[0], **{key: value}) for value in values]
+    for platformType in ['cloudComputing', 'localServer']:
+        for provider in ['gcp', 'azure', 'aws', 'other', 'ovh']:
+            for serverContinent in ['Europe', 'North America', 'Antarctica', 'other']:
+                for server in ['gcp--europe-west1', 'gcp--us-central1', 'azure--France Central', 'other', 'nowhere']:
+                    inputs.append(dict(
+                        inputs[0], platformType=platformType, provider=provider,
+                        serverContinent=serverContinent, server=server,
+                    ))
+    for locationContinent in ['Europe', 'North America', 'Atlantis']:
+        for locationCountry in ['France', 'Canada', 'United States of America', 'Narnia']:
+            for locationRegion in ['FR', 'CA-ON', 'Ontario', 'US', 'US-AL', 'XX']:
+                inputs.append(dict(
+                    inputs[0], locationContinent=locationContinent,
+                    locationCountry=locationCountry, locationRegion=locationRegion,
+                ))
+    return inputs
+
+
+@pytest.mark.parametrize('version', [CURRENT_VERSION, 'v2.2'])
+def test_validator_matches_the_previous_checks(version):
+    data = get_versioned_data(version)
+    validator = get_main_form_validator(data)
+    keys = list(DEFAULT_VALUES) + ['appVersion']
+    inputs = get_test_inputs()
+
+    expected = [previous_validate(input_dict, data, keys) for input_dict in inputs]
+    assert [validator.validate(input_dict, keys) for input_dict in inputs] == expected
+
+    clean_inputs, valid_inputs = validator.validate_columns(pd.DataFrame(inputs, dtype=object), keys)
+    for i, (expected_clean, expected_wrong) in enumerate(expected):
+        assert set(valid_inputs.columns[~valid_inputs.iloc[i].to_numpy()]) == set(expected_wrong)
+        assert {key: clean_inputs.at[i, key] for key in expected_clean} == expected_clean
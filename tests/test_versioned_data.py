@@ -0,0 +1,18 @@
+"""
+The version token of the "versioned_data" store is resolved to the backend data of its version.
+"""
+
+import pytest
+
+from utils.handle_inputs import CURRENT_VERSION, APP_VERSION_OPTIONS_LIST, get_versioned_data, resolve_versioned_data
+
+
+def test_resolve_version_token():
+    version = APP_VERSION_OPTIONS_LIST[0]
+    assert resolve_versioned_data({'version': version}) is get_versioned_data(version)
+    assert resolve_versioned_data(None) is None
+
+
+@pytest.mark.parametrize('token', [{'version': 'v0.1'}, {'version': '../data'}, {'version': ['v3.0']}, {}, 'v3.0'])
+def test_unknown_version_token_falls_back_on_the_current_version(token):
+    assert resolve_versioned_data(token) is get_versioned_data(CURRENT_VERSION)
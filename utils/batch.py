@@ -0,0 +1,576 @@
+"""
+Batch estimation of the footprint of many jobs, e.g. the rows of an imported csv.
+
+Each row is validated like the inputs of the form (see MainFormValidator), against the
+data of its own version. The footprints of all the valid rows of a version are then
+computed at once with the vectorized kernel of utils.footprint.
+This module does not depend on Dash.
+
+It can also be run from the command line on large manifests of jobs (csv or JSON lines),
+processed by chunks across a pool of processes:
+    python -m utils.batch jobs.csv -o results.csv [--data-version v2.2] [--workers 8]
+"""
+
+import os
+import sys
+import math
+import argparse
+import itertools
+import collections
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from utils.utils import unlist
+from utils.handle_inputs import CURRENT_VERSION, APP_VERSION_OPTIONS_LIST, DEFAULT_VALUES, get_versioned_data, get_pinned_versioned_data, get_main_form_validator
+from utils.footprint import get_platform_PUE, resolve_PUE, lookup_carbon_intensity, compute_footprint, get_used_fields, get_job_used_fields
+from utils.hourly_ci import compute_emissions_over_windows, recommend_start_times
+
+
+# Columns added to each row of the batch
+BATCH_OUTPUT_KEYS = [
+    'location',
+    'carbonIntensity',
+    'runTime',
+    'power_needed',
+    'energy_needed',
+    'carbonEmissions',
+    'CE_CPU',
+    'CE_GPU',
+    'CE_core',
+    'CE_memory',
+]
+
+# Column listing the invalid inputs of each row. Rows with invalid inputs are not computed.
+INVALID_INPUTS_KEY = 'invalid_inputs'
+
+# Optional column with the time (in UTC) at which each job started. When provided, the emissions
+# of the jobs are also computed with the hourly carbon intensity of their location (see utils.hourly_ci).
+START_TIME_KEY = 'startTime'
+HOURLY_EMISSIONS_KEY = 'carbonEmissions_hourly'
+
+# Optional column with the number of hours each job can be delayed by. When provided along with
+# the start time, the start time minimising the emissions of the job within that horizon is
+# recommended, along with the corresponding emissions (see recommend_start_times).
+HORIZON_KEY = 'startHorizon'
+RECOMMENDED_START_TIME_KEY = 'recommendedStartTime'
+RECOMMENDED_EMISSIONS_KEY = 'carbonEmissions_recommended'
+
+
+def _is_missing(column: pd.Series):
+    """ Empty cells of a csv, as well as fields exported as None, are considered as not provided. """
+    return column.isna() | column.isin(['', 'None'])
+
+
+def _lookup(column, mapping: dict, key: str = None):
+    """
+    Maps each value of the column through the mapping (or through mapping[value][key]),
+    looking up each distinct value only once. Unknown values are mapped to NaN.
+    """
+    codes, uniques = pd.factorize(pd.Series(column, dtype=object), use_na_sentinel=False)
+    table = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        try:
+            table[i] = mapping[value] if key is None else mapping[value][key]
+        except (KeyError, TypeError):
+            table[i] = np.nan
+    return table[codes]
+
+
+def _compute_version_batch(values: pd.DataFrame, use_server, show_PUE_question, versioned_data: dict):
+    """
+    Computes the footprints of validated jobs that all use the same data version.
+    Returns the output columns (see BATCH_OUTPUT_KEYS) along with the values actually used.
+    """
+    outputs = {}
+    for coreType in ['CPU', 'GPU']:
+        use_core = values['coreType'].isin([coreType, 'Both']).to_numpy()
+        model = values[f'{coreType}model'].to_numpy()
+        tdp = np.where(
+            model == 'other',
+            values[f'tdp{coreType}'].to_numpy(),
+            _lookup(model, versioned_data['cores_dict'][coreType]),
+        )
+        usage = np.where((values[f'usage{coreType}radio'] == 'Yes').to_numpy(), values[f'usage{coreType}'].to_numpy(), 1.)
+        outputs[f'number{coreType}s'] = np.where(use_core, values[f'number{coreType}s'].to_numpy(), 0).astype(float)
+        outputs[f'tdp{coreType}'] = np.where(use_core, tdp, 0).astype(float)
+        outputs[f'usage{coreType}'] = np.where(use_core, usage, 0).astype(float)
+
+    location = np.where(
+        use_server,
+        _lookup(values['server'].to_numpy(), versioned_data['datacenters_dict_byName'], 'location'),
+        values['locationRegion'].to_numpy(),
+    )
+    PUE = resolve_PUE(
+        values['platformType'].to_numpy(), values['provider'].to_numpy(),
+        np.where(use_server, values['server'].to_numpy(), None), versioned_data,
+        PUE=values['PUE'].to_numpy(dtype=float),
+        use_PUE=show_PUE_question & (values['PUEradio'] == 'Yes').to_numpy(),
+    )
+    carbonIntensity = lookup_carbon_intensity(location, versioned_data)
+    runTime = values['runTime_hour'].to_numpy(dtype=float) + values['runTime_min'].to_numpy(dtype=float) / 60.
+    mult_factor = np.where((values['mult_factor_radio'] == 'Yes').to_numpy(), values['mult_factor'].to_numpy(), 1)
+
+    footprint = compute_footprint(
+        runTime=runTime,
+        PUE=PUE,
+        numberCPUs=outputs.pop('numberCPUs'),
+        tdpCPU=outputs['tdpCPU'],
+        usageCPU=outputs['usageCPU'],
+        numberGPUs=outputs.pop('numberGPUs'),
+        tdpGPU=outputs['tdpGPU'],
+        usageGPU=outputs['usageGPU'],
+        memory=values['memory'].to_numpy(dtype=float),
+        memoryPower=versioned_data['refValues_dict']['memoryPower'],
+        carbonIntensity=carbonIntensity,
+        mult_factor=mult_factor.astype(float),
+    )
+    outputs.update(footprint)
+    outputs.update(
+        location=location,
+        carbonIntensity=carbonIntensity,
+        runTime=runTime,
+        PUE=PUE,
+        mult_factor=mult_factor,
+    )
+    return outputs
+
+
+def parse_start_time(start_time):
+    """ Parses start times as UTC datetime64, missing or invalid ones giving NaT. """
+    start_time = pd.Series(start_time, dtype=object)
+    start = pd.to_datetime(start_time.where(~_is_missing(start_time)), errors='coerce', utc=True, format='ISO8601')
+    return start.dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+
+def validate_start_inputs(start_time, horizon=None):
+    """
+    Checks the optional start times and horizons of the jobs (see START_TIME_KEY and HORIZON_KEY).
+    Missing values are allowed, the jobs being then computed without them, but a start time must be
+    a valid date and a horizon a whole number of hours, at least 0.
+    Returns whether the start time and the horizon of each job are valid.
+    """
+    start_time = pd.Series(start_time, dtype=object)
+    valid_start = _is_missing(start_time).to_numpy() | ~np.isnat(parse_start_time(start_time))
+    if horizon is None:
+        return valid_start, np.ones(len(start_time), dtype=bool)
+    horizon = pd.Series(horizon, dtype=object)
+    hours = pd.to_numeric(horizon, errors='coerce').to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        whole_hours = np.isfinite(hours) & (hours >= 0) & (hours == np.floor(hours))
+    return valid_start, _is_missing(horizon).to_numpy() | whole_hours
+
+
+def compute_hourly_emissions(start_time, outputs: dict, versioned_data: dict):
+    """
+    Emissions of jobs started at the given times, integrating their power draw over their actual
+    window with the hourly carbon intensity of their location. The outputs are those of
+    _compute_version_batch. Jobs with a missing start time or not covered by the hourly series give NaN.
+    """
+    start = parse_start_time(start_time)
+    end = start + (np.asarray(outputs['runTime'], dtype=float) * 3600e9).astype('timedelta64[ns]')
+    return compute_emissions_over_windows(
+        outputs['power_needed'], start, end, outputs['location'], versioned_data, mult_factor=outputs['mult_factor']
+    )
+
+
+def compute_recommended_start_times(start_time, horizon, outputs: dict, versioned_data: dict):
+    """
+    Recommends, for each job, the start time minimising its emissions between its start time
+    and the end of its horizon (see recommend_start_times). The outputs are those of _compute_version_batch.
+
+    Returns:
+        The recommended start times (as 'YYYY-MM-DDTHH:MM' strings in UTC) and the emissions
+        of the jobs started at these times (in gCO2e). Jobs with a missing start time, a missing or
+        invalid horizon (which must be a whole number of hours), or not covered by the hourly series
+        give None and NaN respectively.
+    """
+    start = parse_start_time(start_time)
+    horizon = pd.to_numeric(pd.Series(horizon, dtype=object), errors='coerce').to_numpy(dtype=float)
+    valid = ~np.isnat(start) & (horizon >= 0) & (horizon == np.floor(horizon))
+
+    best_start = np.full(len(start), np.datetime64('NaT'), dtype='datetime64[ns]')
+    best_integral = np.full(len(start), np.nan)
+    if valid.any():
+        best_start[valid], best_integral[valid], _ = recommend_start_times(
+            np.broadcast_to(np.asarray(outputs['location'], dtype=object), start.shape)[valid],
+            start[valid],
+            np.broadcast_to(np.asarray(outputs['runTime'], dtype=float), start.shape)[valid],
+            horizon[valid].astype(np.intp),
+            versioned_data,
+        )
+    emissions = np.asarray(outputs['power_needed'], dtype=float) / 1000 * best_integral * np.asarray(outputs['mult_factor'], dtype=float)
+    best_start = np.where(np.isnat(best_start), None, np.datetime_as_string(best_start, unit='m'))
+    return best_start, emissions
+
+
+def estimate_batch_from_dataframe(input_df: pd.DataFrame, data_version: str = None):
+    """
+    Validates and computes the footprint of each row.
+
+    Args:
+        input_df (pd.DataFrame): the rows of the batch, with the same columns as the csv
+        exported from the app. Missing fields take their default value.
+        data_version (str, optional): the data used for all the rows, which can be any
+        directory under data/. By default, each row uses the data of its appVersion.
+
+    Returns:
+        A DataFrame with, for each row, the values used for the computation (in the same
+        format as the exported csv), the outputs (see BATCH_OUTPUT_KEYS) and the comma-separated
+        list of the invalid inputs of the row. The outputs of the rows with invalid inputs are
+        left empty. The other columns of the input are passed through.
+        When the input has a START_TIME_KEY column, the emissions computed with the hourly carbon
+        intensity are added as well (see compute_hourly_emissions), and when it also has a HORIZON_KEY
+        column, the recommended start time of each job (see compute_recommended_start_times).
+        Invalid start times and horizons are reported with the other invalid inputs (see validate_start_inputs).
+    """
+    input_df = input_df.reset_index(drop=True)
+    if 'server' in input_df:
+        server_provided = ~_is_missing(input_df['server']).to_numpy()
+    else:
+        server_provided = np.zeros(len(input_df), dtype=bool)
+    for key, value in DEFAULT_VALUES.items():
+        if key not in input_df:
+            input_df[key] = value
+    results_df = input_df.astype(object)
+    if START_TIME_KEY in input_df:
+        valid_start, valid_horizon = validate_start_inputs(input_df[START_TIME_KEY], input_df.get(HORIZON_KEY))
+    output_keys = BATCH_OUTPUT_KEYS + ([HOURLY_EMISSIONS_KEY] if START_TIME_KEY in input_df else [])
+    if (START_TIME_KEY in input_df) and (HORIZON_KEY in input_df):
+        output_keys += [RECOMMENDED_START_TIME_KEY, RECOMMENDED_EMISSIONS_KEY]
+    for key in ['appVersion'] + output_keys:
+        results_df[key] = None
+    results_df[INVALID_INPUTS_KEY] = ''
+
+    if data_version is not None:
+        versions = pd.Series(get_pinned_versioned_data(data_version)['version'], index=input_df.index)
+    elif 'appVersion' in input_df:
+        versions = input_df['appVersion'].where(~_is_missing(input_df['appVersion']), CURRENT_VERSION)
+        unknown_version = ~versions.isin(APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION])
+        results_df.loc[unknown_version, 'appVersion'] = input_df.loc[unknown_version, 'appVersion']
+        results_df.loc[unknown_version, INVALID_INPUTS_KEY] = 'appVersion'
+        versions = versions[~unknown_version]
+    else:
+        versions = pd.Series(CURRENT_VERSION, index=input_df.index)
+
+    for version, rows in versions.groupby(versions).groups.items():
+        if data_version is not None:
+            versioned_data = get_pinned_versioned_data(version)
+        else:
+            versioned_data = get_versioned_data(version)
+        validator = get_main_form_validator(versioned_data)
+
+        # Fields of the form are validated, the other columns are passed through
+        inputs = input_df.loc[rows]
+        clean_inputs, valid_inputs = validator.validate_columns(inputs, list(DEFAULT_VALUES.keys()))
+        values = clean_inputs.where(valid_inputs, pd.DataFrame(
+            {key: [value] * len(inputs) for key, value in DEFAULT_VALUES.items()}, index=inputs.index, dtype=object
+        ))
+        results_df.loc[rows, list(DEFAULT_VALUES.keys())] = values
+        results_df.loc[rows, 'appVersion'] = version
+
+        used_fields, use_server, show_PUE_question = get_used_fields(values, server_provided[rows], versioned_data)
+        invalid_inputs = used_fields & ~valid_inputs[used_fields.columns]
+        if START_TIME_KEY in input_df:
+            invalid_inputs[START_TIME_KEY] = ~valid_start[rows]
+            if HORIZON_KEY in input_df:
+                invalid_inputs[HORIZON_KEY] = ~valid_horizon[rows]
+        has_invalid_inputs = invalid_inputs.any(axis=1).to_numpy()
+        invalid_keys = np.array(invalid_inputs.columns)
+        results_df.loc[rows[has_invalid_inputs], INVALID_INPUTS_KEY] = [
+            ', '.join(invalid_keys[row]) for row in invalid_inputs.to_numpy()[has_invalid_inputs]
+        ]
+
+        valid_rows = ~has_invalid_inputs
+        if not valid_rows.any():
+            continue
+        outputs = _compute_version_batch(
+            values[valid_rows], use_server[valid_rows], show_PUE_question[valid_rows], versioned_data
+        )
+        if START_TIME_KEY in input_df:
+            outputs[HOURLY_EMISSIONS_KEY] = compute_hourly_emissions(
+                inputs[START_TIME_KEY].to_numpy()[valid_rows], outputs, versioned_data
+            )
+            if HORIZON_KEY in input_df:
+                outputs[RECOMMENDED_START_TIME_KEY], outputs[RECOMMENDED_EMISSIONS_KEY] = compute_recommended_start_times(
+                    inputs[START_TIME_KEY].to_numpy()[valid_rows], inputs[HORIZON_KEY].to_numpy()[valid_rows], outputs, versioned_data
+                )
+        for key, column in outputs.items():
+            results_df.loc[rows[valid_rows], key] = column
+
+    return results_df
+
+
+def estimate_batch(input_rows: list, data_version: str = None):
+    """
+    Same as estimate_batch_from_dataframe, taking the rows as a list of dictionaries
+    (using the same keys as the csv exported from the app) and returning them as such.
+    The fields missing from a row take their default value, except the server.
+    """
+    input_df = pd.DataFrame.from_records([
+        {**DEFAULT_VALUES, 'server': None, **{key: unlist(value) for key, value in row.items()}} for row in input_rows
+    ])
+    results_df = estimate_batch_from_dataframe(input_df, data_version=data_version)
+    return results_df.astype(object).where(results_df.notnull(), None).to_dict(orient='records')
+
+
+###################################################
+## SINGLE JOB
+
+def _is_missing_value(value):
+    return (value is None) or (value in ['', 'None']) or (isinstance(value, float) and math.isnan(value))
+
+
+def estimate_job(job: dict, data_version: str = None):
+    """
+    Validates and computes the footprint of a single job, with the same rules and results
+    as estimate_batch but without the overhead of building DataFrames.
+
+    Args:
+        job (dict): the inputs of the job, using the same keys as the csv exported from the app.
+        The fields missing from the job take their default value, except the server.
+        data_version (str, optional): see estimate_batch_from_dataframe.
+
+    Returns:
+        The values used for the computation, appVersion and the outputs (see BATCH_OUTPUT_KEYS,
+        and HOURLY_EMISSIONS_KEY when the job has a start time), along with the dictionary of the invalid inputs (empty when the job could be computed).
+    """
+    job = {key: unlist(value) for key, value in job.items()}
+    if data_version is not None:
+        versioned_data = get_pinned_versioned_data(data_version)
+    else:
+        version = job.get('appVersion')
+        if _is_missing_value(version):
+            version = CURRENT_VERSION
+        if version not in APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION]:
+            return {'appVersion': version}, {'appVersion': version}
+        versioned_data = get_versioned_data(version)
+    validator = get_main_form_validator(versioned_data)
+
+    inputs = {**DEFAULT_VALUES, 'server': None, **job}
+    clean_inputs, wrong_inputs = validator.validate(inputs, list(DEFAULT_VALUES.keys()))
+    values = {key: clean_inputs.get(key, value) for key, value in DEFAULT_VALUES.items()}
+    results = {**values, 'appVersion': versioned_data['version']}
+
+    used_fields, use_server, show_PUE_question = get_job_used_fields(
+        values, not _is_missing_value(job.get('server')), versioned_data
+    )
+    invalid_inputs = {key: value for key, value in wrong_inputs.items() if key in used_fields}
+    if not _is_missing_value(job.get(START_TIME_KEY)):
+        horizon = job.get(HORIZON_KEY)
+        valid_start, valid_horizon = validate_start_inputs([job[START_TIME_KEY]], [horizon])
+        if not valid_start[0]:
+            invalid_inputs[START_TIME_KEY] = job[START_TIME_KEY]
+        if not valid_horizon[0]:
+            invalid_inputs[HORIZON_KEY] = horizon
+    if invalid_inputs:
+        return results, invalid_inputs
+
+    cores = {}
+    for coreType in ['CPU', 'GPU']:
+        if values['coreType'] in [coreType, 'Both']:
+            model = values[f'{coreType}model']
+            tdp = values[f'tdp{coreType}'] if model == 'other' else versioned_data['cores_dict'][coreType][model]
+            usage = values[f'usage{coreType}'] if values[f'usage{coreType}radio'] == 'Yes' else 1.
+            cores[coreType] = (values[f'number{coreType}s'], float(tdp), float(usage))
+        else:
+            cores[coreType] = (0, 0., 0.)
+
+    if use_server:
+        location = versioned_data['datacenters_dict_byName'][values['server']]['location']
+    else:
+        location = values['locationRegion']
+    if show_PUE_question and values['PUEradio'] == 'Yes':
+        PUE = values['PUE']
+    else:
+        PUE = get_platform_PUE(values['platformType'], values['provider'], values['server'] if use_server else None, versioned_data)
+    carbonIntensity = versioned_data['CI_dict_byLoc'][location]['carbonIntensity']
+    runTime = values['runTime_hour'] + values['runTime_min'] / 60.
+    mult_factor = values['mult_factor'] if values['mult_factor_radio'] == 'Yes' else 1
+
+    footprint = compute_footprint(
+        runTime=runTime,
+        PUE=PUE,
+        numberCPUs=cores['CPU'][0],
+        tdpCPU=cores['CPU'][1],
+        usageCPU=cores['CPU'][2],
+        numberGPUs=cores['GPU'][0],
+        tdpGPU=cores['GPU'][1],
+        usageGPU=cores['GPU'][2],
+        memory=values['memory'],
+        memoryPower=versioned_data['refValues_dict']['memoryPower'],
+        carbonIntensity=carbonIntensity,
+        mult_factor=mult_factor,
+    )
+    results.update({key: float(value) for key, value in footprint.items()})
+    results.update(
+        tdpCPU=cores['CPU'][1],
+        usageCPU=cores['CPU'][2],
+        tdpGPU=cores['GPU'][1],
+        usageGPU=cores['GPU'][2],
+        location=location,
+        carbonIntensity=float(carbonIntensity),
+        runTime=float(runTime),
+        PUE=float(PUE),
+        mult_factor=mult_factor,
+    )
+    if not _is_missing_value(job.get(START_TIME_KEY)):
+        hourly_emissions = float(compute_hourly_emissions([job[START_TIME_KEY]], results, versioned_data)[0])
+        results[HOURLY_EMISSIONS_KEY] = None if math.isnan(hourly_emissions) else hourly_emissions
+        if not _is_missing_value(job.get(HORIZON_KEY)):
+            best_start, best_emissions = compute_recommended_start_times(
+                [job[START_TIME_KEY]], [job[HORIZON_KEY]], results, versioned_data
+            )
+            results[RECOMMENDED_START_TIME_KEY] = best_start[0]
+            results[RECOMMENDED_EMISSIONS_KEY] = None if math.isnan(best_emissions[0]) else float(best_emissions[0])
+    return results, invalid_inputs
+
+
+###################################################
+## COMMAND LINE
+
+def _is_json_lines(path: str):
+    return os.path.splitext(path)[1].lower() in ['.jsonl', '.ndjson', '.json']
+
+
+def read_manifest(path: str, chunksize: int, json_lines: bool, sep: str = ';'):
+    """
+    Iterates over the jobs of a manifest by DataFrames of at most chunksize rows,
+    so that files larger than the memory can be processed.
+    """
+    source = sys.stdin if path == '-' else path
+    if json_lines:
+        return pd.read_json(source, lines=True, chunksize=chunksize, dtype=False)
+    return pd.read_csv(source, sep=sep, chunksize=chunksize)
+
+
+def get_output_columns(input_columns: list):
+    """
+    Columns of the results of estimate_batch_from_dataframe for an input with the given columns:
+    the input columns, the fields of the form (see get_used_fields), appVersion and the outputs,
+    the optional ones being included only when the input has the start time (and horizon) they need.
+    The schema is computed once for the whole manifest, so that it does not depend on the rows of each chunk.
+    """
+    columns = list(input_columns)
+    optional_outputs = []
+    if START_TIME_KEY in columns:
+        optional_outputs.append(HOURLY_EMISSIONS_KEY)
+        if HORIZON_KEY in columns:
+            optional_outputs += [RECOMMENDED_START_TIME_KEY, RECOMMENDED_EMISSIONS_KEY]
+    for key in list(DEFAULT_VALUES) + ['appVersion'] + BATCH_OUTPUT_KEYS + optional_outputs + [INVALID_INPUTS_KEY]:
+        if key not in columns:
+            columns.append(key)
+    return columns
+
+
+def _estimate_chunk(args):
+    chunk, data_version, start_horizon = args
+    if (start_horizon is not None) and (START_TIME_KEY in chunk) and (HORIZON_KEY not in chunk):
+        chunk[HORIZON_KEY] = start_horizon
+    return estimate_batch_from_dataframe(chunk, data_version=data_version)
+
+
+def _imap_bounded(pool, function, iterable, max_pending: int):
+    """
+    Same as pool.imap, but reads the iterable only as the results are consumed,
+    so that at most max_pending chunks are held in memory at once.
+    """
+    pending = collections.deque()
+    for item in iterable:
+        pending.append(pool.apply_async(function, (item,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def write_results(results_df: pd.DataFrame, output, json_lines: bool, header: bool, sep: str = ';'):
+    """ Appends the results of a chunk to the output file. """
+    if json_lines:
+        records = results_df.to_json(orient='records', lines=True)
+        if records and not records.endswith('\n'):
+            records += '\n'
+        output.write(records)
+    else:
+        results_df.to_csv(output, sep=sep, index=False, header=header)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.batch',
+        description='Computes the carbon footprint of each job of a manifest, '
+                    'in the same format as the csv exported from the app.',
+    )
+    parser.add_argument('manifest', help="csv (';'-separated) or JSON lines (.jsonl, .ndjson, .json) file of jobs, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file, csv or JSON lines depending on its extension ('-' for stdout)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                        help='format of the manifest, and of the output when written to stdout (default: from the extension of the manifest)')
+    parser.add_argument('--data-version', default=None,
+                        help='pins the data used for all the jobs to any directory under data/ '
+                             "(e.g. v2.2, latest or dev). By default, each job uses the data of its appVersion")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of processes (default: number of CPUs)')
+    parser.add_argument('--chunksize', type=int, default=50000, help='number of jobs processed at once by a process')
+    parser.add_argument('--sep', default=';', help="separator of the csv files (default: ';')")
+    parser.add_argument('--start-horizon', type=int, default=None,
+                        help=f'number of hours within which to recommend the start time of the jobs with a {START_TIME_KEY}, '
+                             f'for those without a {HORIZON_KEY} column')
+    args = parser.parse_args(argv)
+
+    if args.format is None:
+        json_lines_input = _is_json_lines(args.manifest)
+    else:
+        json_lines_input = args.format == 'jsonl'
+    json_lines_output = json_lines_input if args.output == '-' else _is_json_lines(args.output)
+
+    if args.data_version is not None:
+        # fails early on unknown versions, and loads the data before forking
+        get_pinned_versioned_data(args.data_version)
+
+    manifest = read_manifest(args.manifest, args.chunksize, json_lines_input, args.sep)
+    first_chunk = next(manifest, None)
+    if first_chunk is None:
+        print('0 jobs processed, 0 with invalid inputs.', file=sys.stderr)
+        return
+    input_columns = list(first_chunk.columns)
+    if (args.start_horizon is not None) and (START_TIME_KEY in input_columns) and (HORIZON_KEY not in input_columns):
+        input_columns.append(HORIZON_KEY)
+    columns = get_output_columns(input_columns)
+    chunks = ((chunk, args.data_version, args.start_horizon) for chunk in itertools.chain([first_chunk], manifest))
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 else None
+    n_jobs, n_invalid = 0, 0
+    dropped_columns = set()
+    try:
+        if pool is not None:
+            results = _imap_bounded(pool, _estimate_chunk, chunks, max_pending=2 * args.workers)
+        else:
+            results = map(_estimate_chunk, chunks)
+        for results_df in results:
+            extra_columns = [column for column in results_df.columns if column not in columns]
+            if json_lines_output:
+                # each record has its own keys, so the columns of the later chunks can be kept
+                results_df = results_df.reindex(columns=columns + extra_columns)
+            else:
+                # the csv header is written with the first chunk
+                dropped_columns.update(extra_columns)
+                results_df = results_df.reindex(columns=columns)
+            write_results(results_df, output, json_lines_output, header=(n_jobs == 0), sep=args.sep)
+            n_jobs += len(results_df)
+            n_invalid += (results_df[INVALID_INPUTS_KEY] != '').sum()
+        if pool is not None:
+            pool.close()
+            pool.join()
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if output is not sys.stdout:
+            output.close()
+    if dropped_columns:
+        print(f"Columns missing from the first jobs were not written: {', '.join(sorted(dropped_columns))}.", file=sys.stderr)
+    print(f'{n_jobs} jobs processed, {n_invalid} with invalid inputs.', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
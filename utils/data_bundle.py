@@ -0,0 +1,133 @@
+"""
+Precompiled data bundles.
+
+Parsing the CSVs of a data version with pandas and building the dictionaries
+used by the app is the most expensive part of a cold start. To avoid paying for it
+at every worker boot, the output of the loading function is serialized once per data
+directory in a single binary file (data/<version>/bundle.pickle), along with a
+fingerprint of the source CSVs and of the loading code (including the helpers it calls).
+The bundle is automatically rebuilt when this fingerprint changes.
+
+The bundles can be built ahead of time (e.g. at deployment) with:
+    python -m utils.data_bundle [version ...]
+Otherwise they are built lazily, the first time a version is loaded.
+
+NOTE: bundles are pickle files, they must only be read from the trusted data directory.
+"""
+
+import os
+import sys
+import glob
+import pickle
+import hashlib
+import inspect
+
+
+BUNDLE_FILENAME = 'bundle.pickle'
+
+# To be incremented when the structure of the bundle itself changes
+BUNDLE_FORMAT_VERSION = 1
+
+
+def get_source_modules(build_function):
+    """
+    Returns the module implementing the function building the data, along with all the modules
+    of the same package it (transitively) uses, sorted by name: the data may depend on any of them.
+    """
+    build_module = inspect.getmodule(build_function)
+    package = build_module.__name__.split('.')[0]
+    modules = {}
+    to_visit = [build_module]
+    while to_visit:
+        module = to_visit.pop()
+        if module.__name__ in modules:
+            continue
+        modules[module.__name__] = module
+        for value in vars(module).values():
+            dependency = value if inspect.ismodule(value) else inspect.getmodule(value)
+            if (dependency is not None) and (dependency.__name__.split('.')[0] == package):
+                to_visit.append(dependency)
+    return [modules[name] for name in sorted(modules)]
+
+
+def compute_fingerprint(data_dir: str, build_function, **kwargs):
+    """
+    Hashes the content of the CSVs of the data directory, the source code of the
+    modules used to build the data from these CSVs (see get_source_modules) and the
+    arguments passed to it.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(str(BUNDLE_FORMAT_VERSION).encode())
+    for module in get_source_modules(build_function):
+        hasher.update(module.__name__.encode())
+        hasher.update(inspect.getsource(module).encode())
+    hasher.update(repr(sorted(kwargs.items())).encode())
+    for csv_path in sorted(glob.glob(os.path.join(data_dir, '*.csv'))):
+        hasher.update(os.path.basename(csv_path).encode())
+        with open(csv_path, 'rb') as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def read_bundle(data_dir: str, fingerprint: str):
+    """
+    Returns the data stored in the bundle of the data directory,
+    or None if there is no bundle or if it is outdated.
+    """
+    bundle_path = os.path.join(data_dir, BUNDLE_FILENAME)
+    try:
+        with open(bundle_path, 'rb') as f:
+            bundle = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if bundle.get('fingerprint') != fingerprint:
+        return None
+    return bundle['data']
+
+
+def write_bundle(data_dir: str, fingerprint: str, data: dict):
+    """
+    Writes the bundle atomically, so that concurrent workers never read a partial file.
+    Does nothing if the data directory is read-only.
+    """
+    bundle_path = os.path.join(data_dir, BUNDLE_FILENAME)
+    tmp_path = f'{bundle_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'fingerprint': fingerprint, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, bundle_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_or_build_bundle(data_dir: str, build_function, **kwargs):
+    """
+    Returns the data built by build_function(data_dir, **kwargs), reading it from the
+    bundle of the data directory when it is up to date, and (re)building the bundle otherwise.
+    build_function must return a picklable dictionary.
+    """
+    fingerprint = compute_fingerprint(data_dir, build_function, **kwargs)
+    data = read_bundle(data_dir, fingerprint)
+    if data is None:
+        data = build_function(data_dir, **kwargs)
+        write_bundle(data_dir, fingerprint, data)
+    return data
+
+
+def main(versions: list):
+    """ Builds the bundles of the given versions, or of all of them if none is given. """
+    from utils.handle_inputs import CURRENT_VERSION, APP_VERSION_OPTIONS_LIST, build_versioned_data, get_data_dir
+
+    for version in versions or [CURRENT_VERSION] + APP_VERSION_OPTIONS_LIST:
+        data_dir = get_data_dir(version)
+        fingerprint = compute_fingerprint(data_dir, build_versioned_data, version=version)
+        if read_bundle(data_dir, fingerprint) is not None:
+            print(f'{version}: bundle up to date')
+            continue
+        write_bundle(data_dir, fingerprint, build_versioned_data(data_dir, version=version))
+        print(f'{version}: bundle built in {os.path.join(data_dir, BUNDLE_FILENAME)}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,280 @@
+"""
+In-process registry of the backend data.
+
+Each data version is parsed only once per process (i.e. once per worker) and
+then handed out as a read-only snapshot, so that all the callbacks share the
+same objects without copying them nor being able to corrupt them.
+The snapshots of the different versions share their identical rows (see InternPool).
+"""
+
+import gc
+import sys
+import math
+import threading
+
+from collections.abc import Mapping
+
+
+###################################################
+## READ-ONLY CONTAINERS
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+
+class FrozenDict(dict):
+    """
+    A read-only dictionary. Being a dict subclass, it can still be unpacked
+    (e.g. SimpleNamespace(**frozen_dict)) or serialized like a regular one.
+    Copying it returns a regular (mutable) dictionary.
+    """
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self):
+        return thaw(self)
+
+    def __copy__(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class FrozenList(list):
+    """
+    A read-only list, that can still be concatenated to regular lists.
+    Copying it returns a regular (mutable) list.
+    """
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def copy(self):
+        return thaw(self)
+
+    def __copy__(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+class Record(Mapping):
+    """
+    A compact read-only row, e.g. the description of a datacenter or of a location.
+    The field names (and their positions) are shared by all the records having the same
+    fields, so that each record only stores the tuple of its values.
+    """
+    __slots__ = ('_fields', '_values')
+
+    def __init__(self, fields: dict, values: tuple):
+        self._fields = fields
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._fields[key]]
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self)!r})'
+
+    def __copy__(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (type(self), (dict(self._fields), self._values))
+
+
+# Flat dictionaries with at most this number of fields are stored as Records
+MAX_RECORD_FIELDS = 8
+
+# Single NaN object, so that rows with missing values can be shared as well
+NAN = float('nan')
+
+
+class InternPool:
+    """
+    Freezes data while sharing identical objects between everything frozen by the same pool.
+    Strings and numbers are interned, small flat dictionaries become Records and identical
+    rows and containers are only stored once. Used across the data versions, the memory
+    then grows with the number of rows that actually changed rather than with the
+    number of versions.
+    """
+
+    def __init__(self):
+        self._scalars = {}
+        self._containers = {}
+        self._fields = {}
+
+    def freeze(self, obj):
+        """ Recursively converts dictionaries and lists to their read-only (and shared) counterparts. """
+        if isinstance(obj, dict):
+            items = tuple((self._intern_scalar(key), self.freeze(value)) for key, value in obj.items())
+            if len(items) <= MAX_RECORD_FIELDS and not any(isinstance(value, (Mapping, list)) for _, value in items):
+                keys = tuple(key for key, _ in items)
+                fields = self._fields.get(keys)
+                if fields is None:
+                    fields = self._fields[keys] = FrozenDict({key: i for i, key in enumerate(keys)})
+                return self._intern_container(Record(fields, tuple(value for _, value in items)), items)
+            return self._intern_container(FrozenDict(items), items)
+        if isinstance(obj, list):
+            values = tuple(self.freeze(value) for value in obj)
+            return self._intern_container(FrozenList(values), tuple(enumerate(values)))
+        return self._intern_scalar(obj)
+
+    def _intern_container(self, container, items: tuple):
+        """
+        Returns the shared container of the same type holding the same items as the given one,
+        registering the latter if there is none. As the children are already interned, items are
+        compared by identity, so the pool only needs to store a hash per container.
+        """
+        key = hash((type(container), tuple((item_key, id(value)) for item_key, value in items)))
+        candidates = self._containers.setdefault(key, [])
+        for candidate in candidates:
+            if type(candidate) is type(container) and len(candidate) == len(items) and all(
+                candidate_key == item_key and candidate_value is value
+                for (candidate_key, candidate_value), (item_key, value) in zip(_items(candidate), items)
+            ):
+                return candidate
+        candidates.append(container)
+        return container
+
+    def _intern_scalar(self, value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, float) and math.isnan(value):
+            return NAN
+        try:
+            return self._scalars.setdefault(type(value), {}).setdefault(value, value)
+        except TypeError:
+            # unhashable values are not shared
+            return value
+
+
+def _items(container):
+    if isinstance(container, list):
+        return enumerate(container)
+    return container.items()
+
+
+def freeze(obj):
+    """ Recursively converts dictionaries and lists to their read-only counterparts. """
+    return InternPool().freeze(obj)
+
+
+def thaw(obj):
+    """ Recursively converts read-only containers back to regular dictionaries and lists. """
+    if isinstance(obj, Mapping):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(value) for value in obj]
+    return obj
+
+
+###################################################
+## REGISTRY
+
+class DataRegistry:
+    """
+    Memoizes the backend data per version.
+
+    Args:
+        loader (callable): function taking a version and returning its data as a dictionary.
+        It is called at most once per version and per process.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._snapshots = {}
+        self._indexes = {}
+        # shared by all the versions, so that their identical rows are stored only once
+        self._pool = InternPool()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.warmed_up = False
+
+    def get(self, version: str):
+        """
+        Returns the read-only snapshot of the data of the given version,
+        loading it if it has not been requested yet in this process.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(version)
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            snapshot = self._pool.freeze(self._loader(version))
+            self._snapshots[version] = snapshot
+            return snapshot
+
+    def get_index(self, version: str, name: str, builder):
+        """
+        Returns an index derived from the data of the given version, built with
+        builder(snapshot) the first time it is requested in this process.
+        Indexes made of dictionaries and lists are frozen like the snapshots.
+        """
+        index = self._indexes.get((version, name))
+        if index is not None:
+            return index
+        snapshot = self.get(version)
+        with self._lock:
+            index = self._indexes.get((version, name))
+            if index is None:
+                index = builder(snapshot)
+                if isinstance(index, (dict, list)):
+                    index = self._pool.freeze(index)
+                self._indexes[(version, name)] = index
+            return index
+
+    def warm_up(self, versions: list, indexes: dict = None):
+        """
+        Eagerly loads the given versions. When run in the gunicorn master process
+        before forking (preload mode), the snapshots are then shared by all the workers.
+        The indexes given as {name: builder} are built as well for each version.
+        Objects created so far are moved to the permanent generation of the garbage
+        collector, so that its collections do not touch (and duplicate) the shared pages.
+        """
+        for version in versions:
+            self.get(version)
+            for name, builder in (indexes or {}).items():
+                self.get_index(version, name, builder)
+        gc.collect()
+        gc.freeze()
+        self.warmed_up = True
+
+    def stats(self):
+        """ Returns the hit/miss counters of the registry along with the loaded versions. """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'versions': sorted(self._snapshots),
+                'indexes': sorted(self._indexes),
+                'warmed_up': self.warmed_up,
+            }
+
+    def clear(self):
+        """ Drops all the snapshots and indexes, e.g. after the data files were modified. """
+        with self._lock:
+            self._snapshots = {}
+            self._indexes = {}
+            self._pool = InternPool()
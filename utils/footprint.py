@@ -0,0 +1,216 @@
+"""
+Computation of the carbon footprint of computing jobs.
+
+This module does not depend on Dash: it is used by the form callbacks to compute the
+metrics of the job described in the form, but also to score many jobs at once.
+All the functions take columnar inputs (one value per job, as lists or NumPy arrays)
+and return NumPy arrays, scalars being broadcast to all the jobs.
+The fields of the form used by the formula are worked out here as well (see get_used_fields),
+so that the form, the batch and the API apply the same rules.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _is_null(value):
+    return (value is None) or (isinstance(value, float) and math.isnan(value))
+
+
+def get_platform_PUE(platformType: str, provider: str, server: str, versioned_data: dict):
+    """
+    Returns the PUE used for a platform when the user does not provide their own:
+        - personal computers have a PUE of 1,
+        - local servers and unknown cloud providers use the default PUE,
+        - cloud servers use the PUE of their data centre, or the provider's default
+        if we don't know the PUE of this specific data centre or if we don't know the data centre.
+    """
+    if platformType == 'personalComputer':
+        return 1
+    defaultPUE = versioned_data['pueDefault_dict']['Unknown']
+    if (platformType == 'localServer') or (provider == 'other'):
+        return defaultPUE
+    server_data = versioned_data['datacenters_dict_byName'].get(server)
+    if (server_data is None) or _is_null(server_data['PUE']):
+        return versioned_data['pueDefault_dict'][provider]
+    return server_data['PUE']
+
+
+def resolve_PUE(platformType, provider, server, versioned_data: dict, PUE=None, use_PUE=False):
+    """
+    Vectorized version of get_platform_PUE: returns the PUE of each job.
+    Jobs for which use_PUE is True use their own PUE instead.
+    The platform PUE is looked up only once per distinct (platform, provider, server).
+    """
+    platformType, provider, server = np.broadcast_arrays(
+        np.asarray(platformType, dtype=object), np.asarray(provider, dtype=object), np.asarray(server, dtype=object)
+    )
+    cache = {}
+    platform_PUE = np.empty(platformType.shape, dtype=float)
+    for i, key in enumerate(zip(platformType.flat, provider.flat, server.flat)):
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = get_platform_PUE(*key, versioned_data)
+        platform_PUE.flat[i] = value
+    if PUE is None:
+        return platform_PUE
+    return np.where(use_PUE, np.asarray(PUE, dtype=float), platform_PUE)
+
+
+def lookup_carbon_intensity(location, versioned_data: dict):
+    """
+    Returns the carbon intensity (in gCO2e/kWh) of each location.
+    """
+    location = np.asarray(location, dtype=object)
+    CI_dict_byLoc = versioned_data['CI_dict_byLoc']
+    cache = {}
+    carbonIntensity = np.empty(location.shape, dtype=float)
+    for i, loc in enumerate(location.flat):
+        value = cache.get(loc)
+        if value is None:
+            value = cache[loc] = CI_dict_byLoc[loc]['carbonIntensity']
+        carbonIntensity.flat[i] = value
+    return carbonIntensity
+
+
+def compute_footprint(runTime, PUE, numberCPUs, tdpCPU, usageCPU, numberGPUs, tdpGPU, usageGPU,
+                      memory, memoryPower, carbonIntensity, mult_factor):
+    """
+    Computes the power, energy and carbon emissions of the jobs.
+
+    Args:
+        runTime: running time, in hours.
+        PUE: PUE of the platform (see resolve_PUE).
+        numberCPUs, tdpCPU, usageCPU: number of CPU cores, TDP per core (in W) and usage factor.
+        Jobs not using CPUs should have 0 cores.
+        numberGPUs, tdpGPU, usageGPU: same for GPUs.
+        memory: memory available, in GB.
+        memoryPower: power draw of the memory, in W/GB (refValues_dict['memoryPower']).
+        carbonIntensity: carbon intensity of the location, in gCO2e/kWh.
+        mult_factor: number of times the job is run.
+
+    Returns:
+        A dictionary of arrays: power_needed (in W), energy_needed (in kWh), carbonEmissions,
+        CE_CPU, CE_GPU, CE_core and CE_memory (in gCO2e).
+    """
+    runTime, PUE, numberCPUs, tdpCPU, usageCPU, numberGPUs, tdpGPU, usageGPU, memory, memoryPower, \
+        carbonIntensity, mult_factor = (
+            np.asarray(x, dtype=float) for x in (
+                runTime, PUE, numberCPUs, tdpCPU, usageCPU, numberGPUs, tdpGPU, usageGPU,
+                memory, memoryPower, carbonIntensity, mult_factor
+            )
+        )
+
+    # Power needed, in Watt
+    powerNeeded_CPU = PUE * numberCPUs * tdpCPU * usageCPU
+    powerNeeded_GPU = PUE * numberGPUs * tdpGPU * usageGPU
+    powerNeeded_core = powerNeeded_CPU + powerNeeded_GPU
+    powerNeeded_memory = PUE * (memory * memoryPower)
+    powerNeeded = powerNeeded_core + powerNeeded_memory
+
+    # Energy needed, in kWh (so dividing by 1000 to convert to kW)
+    energyNeeded_CPU = runTime * powerNeeded_CPU * mult_factor / 1000
+    energyNeeded_GPU = runTime * powerNeeded_GPU * mult_factor / 1000
+    energyNeeded_core = runTime * powerNeeded_core * mult_factor / 1000
+    energyNeeded_memory = runTime * powerNeeded_memory * mult_factor / 1000
+    energyNeeded = runTime * powerNeeded * mult_factor / 1000
+
+    # Carbon emissions: carbonIntensity is in g per kWh, so results in gCO2
+    return {
+        'power_needed': powerNeeded,
+        'energy_needed': energyNeeded,
+        'carbonEmissions': energyNeeded * carbonIntensity,
+        'CE_CPU': energyNeeded_CPU * carbonIntensity,
+        'CE_GPU': energyNeeded_GPU * carbonIntensity,
+        'CE_core': energyNeeded_core * carbonIntensity,
+        'CE_memory': energyNeeded_memory * carbonIntensity,
+    }
+
+
+def get_used_fields(values: pd.DataFrame, server_provided: np.ndarray, versioned_data: dict):
+    """
+    Works out, for each row, which fields of the form are used to compute the footprint of the job,
+    i.e. the ones that the form shows for these values.
+
+    Args:
+        values (pd.DataFrame): the values of the fields of the form, the used fields
+        being returned in the same order as its columns.
+        server_provided (np.ndarray): whether the server was provided in the raw inputs.
+
+    Returns:
+        A DataFrame of booleans with the fields as columns, along with whether the job runs on
+        a specific data centre (otherwise its location is used) and whether the PUE question is shown.
+    """
+    n_rows = len(values)
+    cloud = (values['platformType'] == 'cloudComputing').to_numpy()
+    used_fields = {key: np.ones(n_rows, dtype=bool) for key in ['runTime_hour', 'runTime_min', 'coreType', 'memory', 'platformType', 'mult_factor_radio']}
+    used_fields['mult_factor'] = (values['mult_factor_radio'] == 'Yes').to_numpy()
+
+    for coreType in ['CPU', 'GPU']:
+        use_core = values['coreType'].isin([coreType, 'Both']).to_numpy()
+        for key in [f'number{coreType}s', f'{coreType}model', f'usage{coreType}radio']:
+            used_fields[key] = use_core
+        used_fields[f'tdp{coreType}'] = use_core & (values[f'{coreType}model'] == 'other').to_numpy()
+        used_fields[f'usage{coreType}'] = use_core & (values[f'usage{coreType}radio'] == 'Yes').to_numpy()
+
+    # NOTE: the server of the providers other than gcp is not exported (see clean_non_used_inputs_for_export)
+    # so we fall back on the location when it is missing
+    used_fields['provider'] = cloud
+    used_fields['serverContinent'] = cloud & server_provided & \
+        ~values['provider'].isin(['other'] + list(versioned_data['providers_withoutDC'])).to_numpy()
+    used_fields['server'] = used_fields['serverContinent'] & (values['serverContinent'] != 'other').to_numpy()
+    server_other = used_fields['serverContinent'] & ~used_fields['server'] | \
+        used_fields['server'] & (values['server'] == 'other').to_numpy()
+    use_server = used_fields['server'] & ~server_other
+    for key in ['locationContinent', 'locationCountry', 'locationRegion']:
+        used_fields[key] = ~use_server
+
+    show_PUE_question = (values['platformType'] == 'localServer').to_numpy() | \
+        cloud & ((values['provider'] == 'other').to_numpy() | server_other)
+    used_fields['PUEradio'] = show_PUE_question
+    used_fields['PUE'] = show_PUE_question & (values['PUEradio'] == 'Yes').to_numpy()
+
+    used_fields = pd.DataFrame(used_fields, index=values.index, columns=[key for key in values.columns if key in used_fields])
+    return used_fields, use_server, show_PUE_question
+
+
+def get_job_used_fields(values: dict, server_provided: bool, versioned_data: dict):
+    """
+    Same as get_used_fields, for the values of a single job.
+    Returns the set of the used fields, along with use_server and show_PUE_question.
+    """
+    used_fields = {'runTime_hour', 'runTime_min', 'coreType', 'memory', 'platformType', 'mult_factor_radio'}
+    if values['mult_factor_radio'] == 'Yes':
+        used_fields.add('mult_factor')
+    for coreType in ['CPU', 'GPU']:
+        if values['coreType'] in [coreType, 'Both']:
+            used_fields.update([f'number{coreType}s', f'{coreType}model', f'usage{coreType}radio'])
+            if values[f'{coreType}model'] == 'other':
+                used_fields.add(f'tdp{coreType}')
+            if values[f'usage{coreType}radio'] == 'Yes':
+                used_fields.add(f'usage{coreType}')
+
+    cloud = values['platformType'] == 'cloudComputing'
+    use_serverContinent = cloud and server_provided and \
+        values['provider'] not in ['other'] + list(versioned_data['providers_withoutDC'])
+    use_server = use_serverContinent and values['serverContinent'] != 'other'
+    server_other = (use_serverContinent and not use_server) or (use_server and values['server'] == 'other')
+    use_server = use_server and not server_other
+    if cloud:
+        used_fields.add('provider')
+    if use_serverContinent:
+        used_fields.add('serverContinent')
+        if values['serverContinent'] != 'other':
+            used_fields.add('server')
+    if not use_server:
+        used_fields.update(['locationContinent', 'locationCountry', 'locationRegion'])
+
+    show_PUE_question = (values['platformType'] == 'localServer') or \
+        (cloud and (values['provider'] == 'other' or server_other))
+    if show_PUE_question:
+        used_fields.add('PUEradio')
+        if values['PUEradio'] == 'Yes':
+            used_fields.add('PUE')
+    return used_fields, use_server, show_PUE_question
@@ -350,3 +350,120 @@ def create_cores_memory_pie_graphic(form_agg_data, form_metrics):
         }
     )
     return fig
+
+###################################################
+## PLACEMENT HEATMAP
+
+
+def get_placement_heatmap_layout(n_sites: int):
+    layout_heatmap = copy.deepcopy(PLOTS_LAYOUT)
+    layout_heatmap['height'] = max(350, 25 * n_sites + 150)
+    layout_heatmap['margin'] = dict(l=0, r=0, b=0, t=20)
+    layout_heatmap['xaxis'] = dict(
+        color=MY_COLORS['fontColor'],
+        tickangle=-45,
+        side='top',
+    )
+    layout_heatmap['yaxis'] = dict(
+        color=MY_COLORS['fontColor'],
+        autorange='reversed',
+    )
+    return layout_heatmap
+
+
+def create_placement_heatmap_graphic(site_labels, hardware_labels, emissions):
+    """
+    Heatmap of the emissions (in gCO2e) of the job for some places (rows)
+    and hardware options (columns), see utils/placement.py.
+    """
+    fig = go.Figure(
+        data=[
+            go.Heatmap(
+                z=emissions,
+                x=list(hardware_labels),
+                y=list(site_labels),
+                colorscale=MY_COLORS['map1'],
+                colorbar=dict(
+                    title=dict(text='gCO2e', side='top'),
+                ),
+                hovertemplate='%{y}<br>%{x}<br>%{z:.0f} gCO2e<extra></extra>',
+                hoverlabel=dict(
+                    font=dict(
+                        family=FONT_GRAPHS,
+                        color=MY_COLORS['fontColor'],
+                    )
+                ),
+            )
+        ],
+        layout=get_placement_heatmap_layout(len(site_labels))
+    )
+    return fig
+
+
+def get_pareto_front_layout():
+    layout_front = copy.deepcopy(PLOTS_LAYOUT)
+    layout_front['height'] = 450
+    layout_front['margin'] = dict(l=0, r=0, b=0, t=20)
+    layout_front['xaxis'] = dict(
+        title=dict(text='Runtime (hours)'),
+        color=MY_COLORS['fontColor'],
+        type='log',
+        showgrid=True,
+        gridcolor=MY_COLORS['plotGrid'],
+    )
+    layout_front['yaxis'] = dict(
+        title=dict(text='Carbon emissions (gCO2e)'),
+        color=MY_COLORS['fontColor'],
+        showgrid=True,
+        gridcolor=MY_COLORS['plotGrid'],
+    )
+    layout_front['legend'] = dict(orientation='h', y=-0.2)
+    return layout_front
+
+
+def create_pareto_front_graphic(fronts: dict, overall: list, current: dict = None):
+    """
+    Pareto fronts of the emissions vs runtime of a workload for each group of sites,
+    along with the overall front and the job of the form, see utils/pareto.py.
+    Groups can be hidden by clicking on the legend.
+    """
+    hovertemplate = '%{customdata[0]}<br>%{customdata[1]} x %{customdata[2]}<br>' \
+                    '%{x:.1f} h<br>%{y:.0f} gCO2e<extra></extra>'
+
+    def get_customdata(points):
+        return [[point['site'], point['cores'], point['model']] for point in points]
+
+    data = [
+        go.Scatter(
+            x=[point['runTime'] for point in points],
+            y=[point['carbonEmissions'] for point in points],
+            customdata=get_customdata(points),
+            mode='lines',
+            name=group,
+            hovertemplate=hovertemplate,
+        )
+        for group, points in fronts.items()
+    ]
+    data.append(
+        go.Scatter(
+            x=[point['runTime'] for point in overall],
+            y=[point['carbonEmissions'] for point in overall],
+            customdata=get_customdata(overall),
+            mode='markers',
+            name='Overall front',
+            marker=dict(color=MY_COLORS['map1'][0], size=6),
+            hovertemplate=hovertemplate,
+        )
+    )
+    if current is not None:
+        data.append(
+            go.Scatter(
+                x=[current['runTime']],
+                y=[current['carbonEmissions']],
+                mode='markers',
+                name='Your job',
+                marker=dict(color=MY_COLORS['map1'][-1], size=12, symbol='star'),
+                hovertemplate='Your job<br>%{x:.1f} h<br>%{y:.0f} gCO2e<extra></extra>',
+            )
+        )
+    return go.Figure(data=data, layout=get_pareto_front_layout())
@@ -5,13 +5,18 @@ used at page loading or when a csv is uploaded.
 
 import os
 import copy
+import math
 import base64
 import io
 
+import numpy as np
 import pandas as pd
 
 from types import SimpleNamespace
 from utils.utils import check_CIcountries_df, unlist, put_value_first
+from utils.data_registry import DataRegistry, thaw
+from utils.data_bundle import load_or_build_bundle
+from utils.uncertainty import PERCENTILE_KEYS
 
 
 ###################################################
@@ -29,6 +34,22 @@ def get_available_versions():
     appVersions_options = [{'label': f'{CURRENT_VERSION} (latest)', 'value': CURRENT_VERSION}] + [{'label': k, 'value': k} for k in APP_VERSION_OPTIONS_LIST]
     return appVersions_options
 
+# When True, the "versioned_data" store of the app only holds a version token
+# (e.g. {'version': 'v3.0'}) and the callbacks resolve the backend data from
+# a process-local registry, instead of sending the whole dataset back and forth
+# between the browser and the server. Set SERVER_SIDE_VERSIONED_DATA=0 to go back
+# to shipping the data through the browser.
+SERVER_SIDE_VERSIONED_DATA = os.environ.get('SERVER_SIDE_VERSIONED_DATA', '1') == '1'
+
+# When True, the backend data is read from the precompiled bundle of each
+# data directory (see utils/data_bundle.py) instead of being parsed from the CSVs.
+USE_DATA_BUNDLES = os.environ.get('USE_DATA_BUNDLES', '1') == '1'
+
+# When True, all the data versions are loaded when the app is imported, i.e. in the
+# gunicorn master process if the app is preloaded (see gunicorn.conf.py),
+# so that the workers share them instead of loading them on their first requests.
+PRELOAD_DATA = os.environ.get('PRELOAD_DATA', '0') == '1'
+
 # The default values used to fill in the form when no other input is provided
 # WARNING: do not modify the order unless modifying the order of the outputs of 
 # the filling_from_inputs callback accordingly
@@ -64,7 +85,7 @@ DEFAULT_VALUES.update(
     {
         'locationContinent': 'North America',
         'locationCountry': 'Canada', 
-        'locationRegion': 'Ontario', 
+        'locationRegion': 'CA-ON', 
         'provider': 'gcp', 
         'serverContinent': 'Europe',
         'server': 'gcp--europe-west1',
@@ -117,6 +138,14 @@ INPUT_KEYS_TO_IGNORE = [
     'main_carbonEmissions',
     'R&D_carbonEmissions',
     'retrainings_carbonEmissions',
+    # percentiles of the outputs, exported from the uncertainty mode
+    *PERCENTILE_KEYS,
+    # start time of the jobs of a batch and their emissions with the hourly carbon intensity
+    'startTime',
+    'carbonEmissions_hourly',
+    'startHorizon',
+    'recommendedStartTime',
+    'carbonEmissions_recommended',
 ]
 
 
@@ -165,25 +194,20 @@ def load_data(data_dir: str, **kwargs):
     check_CIcountries_df(CI_df)
     assert len(set(CI_df.location)) == len(CI_df.location)
 
-    data_dict.CI_dict_byLoc = {}
-    for location in CI_df.location:
-        foo = {}
-        for col in ['continentName', 'countryName', 'regionName', 'carbonIntensity']:
-            foo[col] = CI_df.loc[CI_df.location == location, col].values[0]
-        data_dict.CI_dict_byLoc[location] = foo
+    # e.g. {'FR': {'continentName': 'Europe', 'countryName': 'France', 'regionName': 'Any', 'carbonIntensity': 51.28}, ...
+    data_dict.CI_dict_byLoc = CI_df.set_index('location', drop=False)[
+        ['continentName', 'countryName', 'regionName', 'carbonIntensity']
+    ].to_dict(orient='index')
 
+    # e.g. {'Europe': {'France': {'Any': {'location': 'FR', 'carbonIntensity': 51.28}}, ...
+    # Built in a single pass over the rows, keeping the first row of duplicated regions
     data_dict.CI_dict_byName = {}
-    for continent in set(CI_df.continentName):
-        foo = CI_df.loc[CI_df.continentName == continent]
-        data_dict.CI_dict_byName[continent] = dict()
-        for country in set(foo.countryName):
-            bar = foo.loc[foo.countryName == country]
-            data_dict.CI_dict_byName[continent][country] = dict()
-            for region in set(bar.regionName):
-                baar = bar.loc[bar.regionName == region]
-                data_dict.CI_dict_byName[continent][country][region] = dict()
-                data_dict.CI_dict_byName[continent][country][region]['location'] = baar.location.values[0]
-                data_dict.CI_dict_byName[continent][country][region]['carbonIntensity'] = baar.carbonIntensity.values[0]
+    names = CI_df[['continentName', 'countryName', 'regionName']].itertuples(index=False, name=None)
+    values = CI_df[['location', 'carbonIntensity']].to_dict(orient='records')
+    for (continent, country, region), value in zip(names, values):
+        regions = data_dict.CI_dict_byName.setdefault(continent, {}).setdefault(country, {})
+        if region not in regions:
+            regions[region] = value
 
     ### CLOUD DATACENTERS ###
     cloudDatacenters_df = pd.read_csv(os.path.join(data_dir, "cloudProviders_datacenters.csv"),
@@ -196,9 +220,7 @@ def load_data(data_dir: str, **kwargs):
     datacenters_df.dropna(subset=['location'], inplace=True)
 
     # Create unique names (in case some names are shared between providers)
-    for x in set(datacenters_df.provider):
-        foo = datacenters_df.loc[datacenters_df.provider == x]
-        assert len(foo.Name) == len(set(foo.Name))
+    assert not datacenters_df.duplicated(subset=['provider', 'Name']).any()
 
     datacenters_df['name_unique'] = datacenters_df.provider + '--' + datacenters_df.Name
 
@@ -213,10 +235,11 @@ def load_data(data_dir: str, **kwargs):
 
     data_dict.providersTypes = pd.Series(providersNames_df.platformName.values, index=providersNames_df.platformType).to_dict()
 
-    data_dict.platformName_byType = {}
-    for platformType in set(providersNames_df.platformType):
-        foo = providersNames_df.loc[providersNames_df.platformType == platformType]
-        data_dict.platformName_byType[platformType] = pd.Series(providersNames_df.providerName.values, index=providersNames_df.provider).to_dict()
+    # NOTE: all the providers are listed for each platform type, whatever their own platform type
+    providersNames = pd.Series(providersNames_df.providerName.values, index=providersNames_df.provider).to_dict()
+    data_dict.platformName_byType = {
+        platformType: dict(providersNames) for platformType in set(providersNames_df.platformType)
+    }
 
     ### REFERENCE VALUES
     refValues_df = pd.read_csv(os.path.join(data_dir, "referenceValues.csv"),
@@ -227,172 +250,277 @@ def load_data(data_dir: str, **kwargs):
     return data_dict # This is a SimpleNamespace
 
 
+def get_data_dir(version: str):
+    """
+    Returns the directory containing the data of the given version.
+    The data of the current version is stored in the 'latest' directory.
+    """
+    if version == CURRENT_VERSION:
+        return os.path.join(DATA_DIR, 'latest')
+    return os.path.join(DATA_DIR, version)
+
+
+def build_versioned_data(data_dir: str, **kwargs):
+    """
+    Builds the backend data of a data directory as a dictionary (see load_data).
+    """
+    return vars(load_data(data_dir, **kwargs))
+
+
+def _load_versioned_data(version: str):
+    if USE_DATA_BUNDLES:
+        return load_or_build_bundle(get_data_dir(version), build_versioned_data, version=version)
+    return build_versioned_data(get_data_dir(version), version=version)
+
+
+# Process-local registry of the backend data: each version is parsed once
+# per worker and then served as a read-only snapshot
+DATA_REGISTRY = DataRegistry(loader=_load_versioned_data)
+
+def get_versioned_data(version: str):
+    """
+    Returns the backend data of the given version as a read-only dictionary.
+    The data is loaded only once per process and then served from the registry.
+    """
+    assert version in APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION]
+    return DATA_REGISTRY.get(version)
+
+
+def get_data_directories():
+    """
+    Returns the names of all the data directories, including the ones
+    that are not offered in the app (e.g. 'dev').
+    """
+    return sorted(x for x in os.listdir(DATA_DIR) if os.path.isdir(os.path.join(DATA_DIR, x)))
+
+
+def get_pinned_versioned_data(data_version: str):
+    """
+    Returns the backend data of any directory under data/, to pin the data version
+    in offline tools. 'latest' stands for the current version.
+    NOTE: unlike get_versioned_data, this must not be exposed to the users of the app.
+    """
+    if data_version == 'latest':
+        data_version = CURRENT_VERSION
+    assert data_version in get_data_directories() + [CURRENT_VERSION], f'Unknown data version: {data_version}'
+    return DATA_REGISTRY.get(data_version)
+
+
+def warm_up_versioned_data():
+    """
+    Loads the data of all the available versions, along with their indexes, in the registry.
+    """
+    DATA_REGISTRY.warm_up(
+        [option['value'] for option in get_available_versions()],
+        indexes={'options': build_options_index, 'main_form_validator': MainFormValidator},
+    )
+
+
+def is_versioned_data_ready():
+    """
+    In preload mode, the app is ready to serve requests only once all the data versions are loaded.
+    """
+    return DATA_REGISTRY.warmed_up or not PRELOAD_DATA
+
+
+def get_versioned_data_store_content(version: str):
+    """
+    Returns the content of the "versioned_data" store for the given version:
+    either a small version token or the whole backend data.
+    """
+    if SERVER_SIDE_VERSIONED_DATA:
+        return {'version': version}
+    return thaw(get_versioned_data(version))
+
+
+def resolve_versioned_data(versioned_data: dict):
+    """
+    Returns the backend data corresponding to the content of the "versioned_data" store,
+    which is either the data itself or only its version token.
+    As the token comes from the browser, an unknown (stale or tampered) version falls back on the current one.
+    """
+    if versioned_data is None:
+        return None
+    if not isinstance(versioned_data, dict):
+        return get_versioned_data(CURRENT_VERSION)
+    if 'cores_dict' not in versioned_data:
+        version = versioned_data.get('version')
+        if version not in APP_VERSION_OPTIONS_LIST + [CURRENT_VERSION]:
+            version = CURRENT_VERSION
+        return get_versioned_data(version)
+    return versioned_data
+
+
 ###################################################
 ## DROPDOWN OPTIONS
 
 # The following functions return the options for the target dropdown
 # of the form. They are called within the Form blueprints.
+# They are served from indexes built once per data version (see build_options_index),
+# so the returned lists are read-only.
+
+def build_options_index(versioned_data: dict):
+    """
+    Precomputes the options of the location and server dropdowns:
+        - continents_byProvider: provider -> sorted continents of its datacenters
+        - servers_byProvider: provider -> continent -> datacenters sorted by name
+        - countries_byContinent: continent -> sorted countries
+        - regions_byCountry: continent -> country -> locations of the regions ('Any' first)
+    """
+    data_dict = SimpleNamespace(**versioned_data)
+
+    locations_byContinent = {
+        continent: {region['location'] for country in countries.values() for region in country.values()}
+        for continent, countries in data_dict.CI_dict_byName.items()
+    }
+
+    continents_byProvider = {}
+    servers_byProvider = {}
+    for provider, servers in data_dict.datacenters_dict_byProvider.items():
+        locations = {server['location'] for server in servers.values()}
+        continents_byProvider[provider] = sorted(
+            {data_dict.CI_dict_byLoc[x]['continentName'] for x in locations if x in data_dict.CI_dict_byLoc}
+        )
+        sorted_servers = [servers[name] for name in sorted(server['Name'] for server in servers.values())]
+        servers_byProvider[provider] = {
+            continent: [server for server in sorted_servers if server['location'] in locationsINcontinent]
+            for continent, locationsINcontinent in locations_byContinent.items()
+        }
+
+    countries_byContinent = {
+        continent: sorted(countries) for continent, countries in data_dict.CI_dict_byName.items()
+    }
+
+    regions_byCountry = {}
+    for continent, countries in data_dict.CI_dict_byName.items():
+        regions_byCountry[continent] = {}
+        for country, regions in countries.items():
+            regions_names = put_value_first(sorted(regions), 'Any')
+            regions_byCountry[continent][country] = [regions[x]['location'] for x in regions_names]
+
+    return dict(
+        continents_byProvider=continents_byProvider,
+        servers_byProvider=servers_byProvider,
+        countries_byContinent=countries_byContinent,
+        regions_byCountry=regions_byCountry,
+    )
+
+
+def get_options_index(versioned_data: dict):
+    """
+    Returns the options index of the version of the given backend data.
+    """
+    return DATA_REGISTRY.get_index(versioned_data['version'], 'options', build_options_index)
+
 
 def availableLocations_continent(selected_provider: str, versioned_data: dict):
     """
     Provides the available continents for a given provider.
     """
-    if versioned_data is not None:
-        data_dict = SimpleNamespace(**versioned_data)
-        dict_per_server_id_in_provider = data_dict.datacenters_dict_byProvider.get(selected_provider)
-    else:
-        dict_per_server_id_in_provider = None
-
-    if dict_per_server_id_in_provider is not None:
-        availableLocations = [x['location'] for x in dict_per_server_id_in_provider.values()]
-        availableLocations = list(set(availableLocations))
-        availableOptions = list(set(
-            [data_dict.CI_dict_byLoc[x]['continentName'] for x in availableLocations if x in data_dict.CI_dict_byLoc]
-        ))
-        return availableOptions
-    else:
+    if versioned_data is None:
         return []
+    return get_options_index(versioned_data)['continents_byProvider'].get(selected_provider, [])
 
 
 def availableOptions_servers(selected_provider: str, selected_continent: str, versioned_data: dict):
     """
     Provides the available servers for the given provider and continent.
     """
-    if versioned_data is not None:
-        data_dict = SimpleNamespace(**versioned_data)
-        ci_by_country_in_continent = data_dict.CI_dict_byName.get(selected_continent)
-        dict_per_server_id_in_provider = data_dict.datacenters_dict_byProvider.get(selected_provider)
-    else:
-        ci_by_country_in_continent, dict_per_server_id_in_provider = None, None
-
-    if ci_by_country_in_continent is not None:
-        locationsINcontinent = [region['location'] for country in ci_by_country_in_continent.values() for region in country.values()]
-    else:
-        locationsINcontinent = []
-
-    if dict_per_server_id_in_provider is not None:
-        availableOptions_Names = [server['Name'] for server in dict_per_server_id_in_provider.values() if server['location'] in locationsINcontinent]
-        availableOptions_Names.sort()
-        availableOptions = [dict_per_server_id_in_provider[name] for name in availableOptions_Names]
-        return availableOptions
-    else:
+    if versioned_data is None:
         return []
+    servers_byContinent = get_options_index(versioned_data)['servers_byProvider'].get(selected_provider, {})
+    return servers_byContinent.get(selected_continent, [])
 
 
 def availableOptions_country(selected_continent: str, versioned_data: dict):
     """
     Provides the available country for the selected continent.
     """
-    if versioned_data is not None:
-        data_dict = SimpleNamespace(**versioned_data)
-        ci_per_country_dit = data_dict.CI_dict_byName.get(selected_continent)
-    else:
-        ci_per_country_dit = None
-
-    if ci_per_country_dit is not None:
-        availableOptions = [country for country in ci_per_country_dit]
-        availableOptions = sorted(availableOptions)
-        return availableOptions
-    else:
+    if versioned_data is None:
         return []
+    return get_options_index(versioned_data)['countries_byContinent'].get(selected_continent, [])
+
 
 def availableOptions_region(selected_continent: str,selected_country: str, data: dict):
     """
     Provides the available region for the selected continent and contry.
     """
-    if data is not None:
-        data_dict = SimpleNamespace(**data)
-        ci_per_country_dict = data_dict.CI_dict_byName.get(selected_continent)
-        if ci_per_country_dict is not None:
-            availableOptions_data = ci_per_country_dict.get(selected_country)
-        else:
-            availableOptions_data = None
-    else:
-        availableOptions_data = None
-
-    if availableOptions_data is not None:
-        availableOptions_names = list(availableOptions_data.keys())
-        availableOptions_names.sort()
-        # Move Any to the first row:
-        availableOptions_names.remove('Any')
-        availableOptions_names = ['Any'] + availableOptions_names
-        availableOptions_loc = [availableOptions_data[x]['location'] for x in availableOptions_names]
-    else:
-        availableOptions_loc = []
-
-    return availableOptions_loc
+    if data is None:
+        return []
+    regions_byCountry = get_options_index(data)['regions_byCountry'].get(selected_continent, {})
+    return regions_byCountry.get(selected_country, [])
 
 
 ###################################################
 ## PROPERLY HANDLE INPUTS
 
-def validate_main_form_inputs(input_dict: dict, data_dict: dict, keys_of_interest: list):
+class MainFormValidator:
     """
-    Validates the inputs: ensures the consistency between the keys and corresponding 
-    value but also between some values.
-    args:
-        - input_dict: inputs to process
-        - data_dict: backend data used to check consistency between provided values.
-        - keyOfInterest [list]: a list of keys to process.
-    returns: 
-        - clean_inputs [dict]: a curated subset of input_dict with clean inputs. Its keys
-        are contained in keysofInterest.
-        - wrong_imputs [dict]: a subset of the input_dict containing inputs
-        either raising erorrs either not corresponding to keysOfInterest.
-        - TO IMPLEMENT: unkonwn_inputs [dict]: a subset of the input_dict containing 
-        inputs with an unknown key.
+    Validates the inputs of the main form against the backend data of one version.
+    All the allowed values of the categorical keys are compiled once in sets,
+    so validating an input only costs a few hashed lookups (see get_main_form_validator).
     """
-    if type(data_dict) == dict:
-        data_dict = SimpleNamespace(**data_dict)
-    appVersions_options_list = get_available_versions()
 
-    ############################
-    # We first build some data frameworks to be used later on during our checkings
-    
-    ### CPU AND GPU options
-    if set(['CPUmodel','GPUmodel']) & set(input_dict.keys()):
-        coreModels_options = dict()
-        for coreType in ['CPU', 'GPU']:
-            availableOptions = sorted(list(data_dict.cores_dict[coreType].keys()))
-            availableOptions = put_value_first(availableOptions, 'Any')
-            coreModels_options[coreType] = [
-                {'label': k, 'value': v} for k, v in list(zip(availableOptions, availableOptions)) +
-                                                    [("Other", "other")]
-            ]
-    else:
-        coreModels_options = None
-
-    ### PLATFORM TYPE options
-    if 'platformType' in input_dict:
-        platformType_options = [
-            {'label': k,
-            'value': v} for v, k in list(data_dict.providersTypes.items()) +
-                                    [('personalComputer', 'Personal computer')] +
-                                    [('localServer', 'Local server')]
-        ]
-    else:
-        platformType_options = None
+    # Keys whose validity depends on the value of other keys
+    DEPENDENCIES = {
+        'provider': ['platformType'],
+        'serverContinent': ['provider'],
+        'server': ['provider', 'serverContinent'],
+        'locationCountry': ['locationContinent'],
+        'locationRegion': ['locationContinent', 'locationCountry'],
+    }
 
-    def validateKey(key, value):
+    def __init__(self, versioned_data: dict):
+        data_dict = SimpleNamespace(**versioned_data)
+        options_index = build_options_index(versioned_data)
+
+        self.coreModels = {
+            coreType: set(data_dict.cores_dict[coreType]) | {'other'} for coreType in ['CPU', 'GPU']
+        }
+        self.platformTypes = set(data_dict.providersTypes) | {'personalComputer', 'localServer'}
+        self.cloudProviders = set(data_dict.platformName_byType.get('cloudComputing', {})) | {'other'}
+        self.serverContinents_byProvider = {
+            provider: set(continents) | {'other'}
+            for provider, continents in options_index['continents_byProvider'].items()
+        }
+        self.servers_byProvider = {
+            provider: {
+                continent: {server['name_unique'] for server in servers} | {'other'}
+                for continent, servers in servers_byContinent.items()
+            }
+            for provider, servers_byContinent in options_index['servers_byProvider'].items()
+        }
+        self.locationContinents = set(data_dict.CI_dict_byName)
+        self.countries_byContinent = {
+            continent: set(countries) for continent, countries in options_index['countries_byContinent'].items()
+        }
+        self.regions_byCountry = {
+            continent: {country: set(locations) for country, locations in locations_byCountry.items()}
+            for continent, locations_byCountry in options_index['regions_byCountry'].items()
+        }
+        self.appVersions = set(APP_VERSION_OPTIONS_LIST) | {CURRENT_VERSION}
+
+    def validateKey(self, key, value, input_dict: dict):
         """
         Ensures the consistency between the key and the provided value and
         checks the dependencies between different values.
 
         WARNING: the keys used to check should be the same as those used
         in the DEFAULT_VALUES and aggregate_data.
+        The numbers must be finite (e.g. 1e400 or 'inf' are rejected), as the outputs are sent as JSON.
         """
         new_val = copy.copy(value)
         if key in ['runTime_hour', 'numberCPUs', 'numberGPUs']:
             new_val = int(float(new_val))
         elif key in ['runTime_min']:
             new_val = float(new_val)
-            assert new_val >= 0
+            assert math.isfinite(new_val) and (new_val >= 0)
         elif key in ['mult_factor']:
             new_val = int(new_val)
             assert new_val >= 1
         elif key in ['tdpCPU', 'tdpGPU', 'memory']:
             new_val = float(new_val)
-            assert new_val >= 0
+            assert math.isfinite(new_val) and (new_val >= 0)
         elif key in ['usageCPU', 'usageGPU']:
             new_val = float(new_val)
             assert (new_val >= 0) & (new_val <= 1)
@@ -401,51 +529,122 @@ def validate_main_form_inputs(input_dict: dict, data_dict: dict, keys_of_interes
         elif key == 'coreType':
             assert new_val in ['CPU', 'GPU', 'Both']
         elif key in ['CPUmodel', 'GPUmodel']:
-            assert new_val in [x['value'] for x in coreModels_options[key[:3]]]
+            assert new_val in self.coreModels[key[:3]]
         elif key == 'platformType':
-            assert new_val in [x['value'] for x in platformType_options]
+            assert new_val in self.platformTypes
         elif key == 'provider':
             if unlist(input_dict['platformType']) == 'cloudComputing':  # TODO: I don't think this if is necessary?
-                assert (new_val in data_dict.platformName_byType['cloudComputing']) | (new_val == 'other')
+                assert new_val in self.cloudProviders
         elif key == 'serverContinent':
-            assert new_val in availableLocations_continent(unlist(input_dict['provider']), versioned_data=vars(data_dict)) + ['other']
+            assert new_val in self.serverContinents_byProvider.get(unlist(input_dict['provider']), {'other'})
         elif key == 'server':
-            list_servers = availableOptions_servers(unlist(input_dict['provider']),
-                                                    unlist(input_dict['serverContinent']),
-                                                    versioned_data=vars(data_dict))
-            assert new_val in [x['name_unique'] for x in list_servers] + ["other"]
+            servers_byContinent = self.servers_byProvider.get(unlist(input_dict['provider']), {})
+            assert new_val in servers_byContinent.get(unlist(input_dict['serverContinent']), {'other'})
         elif key == 'locationContinent':
-            assert new_val in list(data_dict.CI_dict_byName.keys())
+            assert new_val in self.locationContinents
         elif key == 'locationCountry':
-            assert new_val in availableOptions_country(unlist(input_dict['locationContinent']), versioned_data=vars(data_dict))
+            assert new_val in self.countries_byContinent.get(unlist(input_dict['locationContinent']), set())
         elif key == 'locationRegion':
-            list_loc = availableOptions_region(unlist(input_dict['locationContinent']),
-                                               unlist(input_dict['locationCountry']), data=vars(data_dict))
-            assert new_val in list_loc
+            regions_byCountry = self.regions_byCountry.get(unlist(input_dict['locationContinent']), {})
+            assert new_val in regions_byCountry.get(unlist(input_dict['locationCountry']), set())
         elif key == 'PUE':
             new_val = float(new_val)
-            assert new_val >= 1
+            assert math.isfinite(new_val) and (new_val >= 1)
         elif key == 'appVersion':
-            assert new_val in [option['value'] for option in appVersions_options_list] + [CURRENT_VERSION]
+            assert new_val in self.appVersions
         else:
             assert False, 'Unknown key'
         return new_val
 
-    ############################
-    # Now we validate each of the target key from the input dict
+    def validate(self, input_dict: dict, keys_of_interest: list):
+        """
+        Validates one set of inputs, see validate_main_form_inputs.
+        """
+        clean_inputs = {}
+        wrong_imputs = {}
+        for key in keys_of_interest:
+            if key not in INPUT_KEYS_TO_IGNORE:
+                new_value = unlist(input_dict[key])
+                try:
+                    clean_inputs[key] = self.validateKey(key, new_value, input_dict)
+                except Exception as e:
+                    ### TODO: distinguish between wrong_inputs and unknown_inputs
+                    wrong_imputs[key] = new_value
+        return clean_inputs, wrong_imputs
+
+    def validate_many(self, input_dicts: list, keys_of_interest: list = None):
+        """
+        Validates several sets of inputs, e.g. the rows of a csv.
+        When keys_of_interest is None, all the keys of each row are processed.
+        Returns the list of (clean_inputs, wrong_inputs) of the rows.
+        """
+        return [
+            self.validate(input_dict, list(input_dict.keys()) if keys_of_interest is None else keys_of_interest)
+            for input_dict in input_dicts
+        ]
 
-    clean_inputs = {}
-    wrong_imputs = {}
-    for key in keys_of_interest:
-        if key not in INPUT_KEYS_TO_IGNORE:
-            new_value = unlist(input_dict[key])
-            try:
-                clean_inputs[key] = validateKey(key, new_value)
-            except Exception as e:
-                ### TODO: distinguish between wrong_inputs and unknown_inputs
-                wrong_imputs[key] = new_value
+    def validate_columns(self, inputs_df: pd.DataFrame, keys_of_interest: list):
+        """
+        Column-wise version of validate_many, for large batches: each distinct value of a
+        column (along with the values it depends on) is validated only once.
+        Returns two DataFrames with the keys of interest as columns: the clean values
+        (None when invalid) and whether each value is valid.
+        """
+        clean_inputs = {}
+        valid_inputs = {}
+        for key in keys_of_interest:
+            columns = [key] + self.DEPENDENCIES.get(key, [])
+            if len(columns) == 1:
+                codes, uniques = pd.factorize(inputs_df[key], use_na_sentinel=False)
+                uniques = [(value,) for value in uniques]
+            else:
+                codes, uniques = pd.factorize(
+                    pd.Series(list(zip(*(inputs_df[column] for column in columns))), dtype=object),
+                    use_na_sentinel=False,
+                )
+            unique_clean = np.empty(len(uniques), dtype=object)
+            unique_valid = np.zeros(len(uniques), dtype=bool)
+            for i, values in enumerate(uniques):
+                try:
+                    unique_clean[i] = self.validateKey(key, values[0], dict(zip(columns, values)))
+                    unique_valid[i] = True
+                except Exception as e:
+                    pass
+            clean_inputs[key] = unique_clean[codes]
+            valid_inputs[key] = unique_valid[codes]
+        return (
+            pd.DataFrame(clean_inputs, index=inputs_df.index, columns=keys_of_interest),
+            pd.DataFrame(valid_inputs, index=inputs_df.index, columns=keys_of_interest),
+        )
+
+
+def get_main_form_validator(versioned_data: dict):
+    """
+    Returns the validator of the version of the given backend data,
+    compiled only once per version and per process.
+    """
+    return DATA_REGISTRY.get_index(versioned_data['version'], 'main_form_validator', MainFormValidator)
 
-    return clean_inputs, wrong_imputs
+
+def validate_main_form_inputs(input_dict: dict, data_dict: dict, keys_of_interest: list):
+    """
+    Validates the inputs: ensures the consistency between the keys and corresponding 
+    value but also between some values.
+    args:
+        - input_dict: inputs to process
+        - data_dict: backend data used to check consistency between provided values.
+        - keyOfInterest [list]: a list of keys to process.
+    returns: 
+        - clean_inputs [dict]: a curated subset of input_dict with clean inputs. Its keys
+        are contained in keysofInterest.
+        - wrong_imputs [dict]: a subset of the input_dict containing inputs
+        either raising erorrs either not corresponding to keysOfInterest.
+        - TO IMPLEMENT: unkonwn_inputs [dict]: a subset of the input_dict containing 
+        inputs with an unknown key.
+    """
+    if isinstance(data_dict, SimpleNamespace):
+        data_dict = vars(data_dict)
+    return get_main_form_validator(data_dict).validate(input_dict, keys_of_interest)
 
 
 def validate_ai_page_specific_inputs(input_dict: dict, keys_of_interest: list):
@@ -514,14 +713,14 @@ def validate_ai_page_specific_inputs(input_dict: dict, keys_of_interest: list):
     return clean_inputs, wrong_imputs
 
 
-def open_input_csv_and_comment(upload_csv_content: str, filename: str):
+def read_input_csv(upload_csv_content: str, filename: str):
     """
     Args:
         upload_csv_content [str]: a binary string corresponding to the uploaded file.
         filename [str]: the uploaded file name.
 
-    Opens the input file content and stores it in a pandas DataFrame.
-    NOTE: so far, only the first line of an input csv is read.
+    Opens the input file content and stores all its rows in a pandas DataFrame.
+    Returns None instead of the DataFrame when the file can't be read.
     """
     _, upload_string = upload_csv_content.split(',')
     decoded = base64.b64decode(upload_string)
@@ -530,13 +729,28 @@ def open_input_csv_and_comment(upload_csv_content: str, filename: str):
         if 'csv' in filename:
             df = pd.read_csv(io.StringIO(decoded.decode('utf-8')), sep=';')
         else:
-            return {}, 'CSV file can’t be read, doing nothing…', 'The file extension is not "csv".'
+            return None, 'CSV file can’t be read, doing nothing…', 'The file extension is not "csv".'
     except Exception as e:
         subtitle = 'CSV file can’t be read, doing nothing…'
         message = f'We got the following error type: {type(e)}, and message: {str(e)}.'
+        return None, subtitle, message
+    return df, 'Input can be opened correctly', ''
+
+
+def open_input_csv_and_comment(upload_csv_content: str, filename: str):
+    """
+    Args:
+        upload_csv_content [str]: a binary string corresponding to the uploaded file.
+        filename [str]: the uploaded file name.
+
+    Opens the input file content and stores it in a pandas DataFrame.
+    NOTE: only the first line of an input csv is used to fill in the form,
+    the files with several rows are processed as a batch (see utils.batch).
+    """
+    df, subtitle, message = read_input_csv(upload_csv_content, filename)
+    if df is None:
         return {}, subtitle, message
-    # TODO : raise a warning if there are several rows in the input csv
-    return {key: val[0] for key, val in df.to_dict().items()}, 'Input can be opened correctly', ''
+    return {key: val[0] for key, val in df.to_dict().items()}, subtitle, message
 
 
 def read_base_form_inputs_from_csv(upload_csv:dict):
@@ -555,10 +769,7 @@ def read_base_form_inputs_from_csv(upload_csv:dict):
     if 'appVersion' in upload_csv:
         new_version = unlist(upload_csv['appVersion'])
     assert new_version in [option['value'] for option in appVersions_options_list] + [CURRENT_VERSION]
-    if new_version == CURRENT_VERSION:
-        newData = load_data(os.path.join(DATA_DIR, 'latest'), version=CURRENT_VERSION)
-    else:
-        newData = load_data(os.path.join(DATA_DIR, new_version), version=new_version)
+    newData = get_versioned_data(new_version)
 
     # Validates the inputs against the data
     processed_inputs, invalid_inputs = validate_main_form_inputs(
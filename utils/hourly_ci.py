@@ -0,0 +1,304 @@
+"""
+Time-varying carbon intensity.
+
+CI_aggregated.csv holds one annual average per location. A data version can optionally hold
+hourly series as well, in a hourly_CI directory next to its CSVs, with one file per location
+named after its code (e.g. data/latest/hourly_CI/FR.csv). Like the other CSVs of the data,
+the first row of these files holds metadata, followed by the columns:
+    - datetime: start of the hour, in UTC (e.g. 2024-01-01T00:00),
+    - carbonIntensity: average carbon intensity over the hour, in gCO2e/kWh.
+The hours must be consecutive.
+
+The prefix sums of each series are computed once per version and per process (see HourlySeries),
+so that the carbon intensity integrated over any time window costs O(1) whatever its length.
+They are also used to recommend the start time minimising the emissions of a job (see recommend_start_times).
+This module does not depend on Dash.
+"""
+
+import os
+import glob
+import collections
+
+import numpy as np
+import pandas as pd
+
+from utils.handle_inputs import DATA_REGISTRY, get_data_dir
+
+
+HOURLY_CI_DIRNAME = 'hourly_CI'
+
+ONE_HOUR = np.timedelta64(1, 'h')
+
+
+def to_datetime64(times):
+    """
+    Converts timestamps (strings, datetimes or datetime64, as scalars or arrays) to UTC datetime64 arrays.
+    Naive timestamps are assumed to be in UTC already.
+    """
+    times = np.atleast_1d(np.asarray(times))
+    if np.issubdtype(times.dtype, np.datetime64):
+        return times.astype('datetime64[ns]')
+    times = pd.to_datetime(times.astype(object), utc=True, format='ISO8601')
+    return times.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+
+class HourlySeries:
+    """
+    Hourly carbon intensity of a location, along with its prefix sums:
+    cumulated[i] is the carbon intensity integrated over the first i hours (in gCO2e/kWh x h).
+
+    Args:
+        start (datetime64): start of the first hour of the series, in UTC.
+        carbonIntensity (np.ndarray): carbon intensity of each hour, in gCO2e/kWh.
+    """
+
+    def __init__(self, start, carbonIntensity):
+        self.start = np.datetime64(start, 'ns')
+        self.carbonIntensity = np.asarray(carbonIntensity, dtype=float)
+        self.cumulated = np.concatenate([[0.], np.cumsum(self.carbonIntensity)])
+
+    def __len__(self):
+        return len(self.carbonIntensity)
+
+    @property
+    def end(self):
+        return self.start + len(self) * ONE_HOUR
+
+    def to_hours(self, times):
+        """ Converts timestamps to the number of hours elapsed since the start of the series. """
+        return (to_datetime64(times) - self.start) / ONE_HOUR
+
+    def cumulative(self, hours):
+        """
+        Carbon intensity integrated from the start of the series up to the given numbers of hours
+        (floats), assuming that the carbon intensity is constant within each hour.
+        Hours outside the series give NaN.
+        """
+        hours = np.asarray(hours, dtype=float)
+        outside = ~((hours >= 0) & (hours <= len(self)))
+        hours = np.where(outside, 0., hours)
+        whole_hours = np.minimum(np.floor(hours).astype(np.intp), len(self) - 1)
+        cumulative = self.cumulated[whole_hours] + (hours - whole_hours) * self.carbonIntensity[whole_hours]
+        return np.where(outside, np.nan, cumulative)
+
+    def integrate(self, start, end):
+        """
+        Carbon intensity integrated over each window [start, end) (in gCO2e/kWh x h),
+        NaN for the windows that are not fully covered by the series.
+        """
+        return self.cumulative(self.to_hours(end)) - self.cumulative(self.to_hours(start))
+
+    def mean(self, start, end):
+        """ Average carbon intensity over each window [start, end), in gCO2e/kWh. """
+        duration = (to_datetime64(end) - to_datetime64(start)) / ONE_HOUR
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.integrate(start, end) / duration
+
+
+def read_hourly_series(csv_path: str):
+    """ Reads an hourly carbon intensity file (see the format above). """
+    df = pd.read_csv(csv_path, sep=',', skiprows=1)
+    datetimes = to_datetime64(df.datetime)
+    assert len(datetimes) > 0, f'Empty hourly carbon intensity file: {csv_path}'
+    assert (np.diff(datetimes) == ONE_HOUR).all(), f'Hours are not consecutive in {csv_path}'
+    return HourlySeries(datetimes[0], df.carbonIntensity.to_numpy(dtype=float))
+
+
+class HourlyCarbonIntensity:
+    """
+    The hourly series of a data version, by location.
+    Only the locations of CI_dict_byLoc are loaded, and there may be none.
+    """
+
+    def __init__(self, versioned_data: dict):
+        self.series = {}
+        hourly_dir = os.path.join(get_data_dir(versioned_data['version']), HOURLY_CI_DIRNAME)
+        for csv_path in sorted(glob.glob(os.path.join(hourly_dir, '*.csv'))):
+            location = os.path.splitext(os.path.basename(csv_path))[0]
+            if location in versioned_data['CI_dict_byLoc']:
+                self.series[location] = read_hourly_series(csv_path)
+
+    def __contains__(self, location):
+        return location in self.series
+
+    def __len__(self):
+        return len(self.series)
+
+    def get(self, location: str):
+        return self.series.get(location)
+
+    def integrate(self, location, start, end):
+        """
+        Vectorized version of HourlySeries.integrate over jobs in different locations:
+        each distinct location is processed at once. Jobs in a location without hourly
+        series (or outside of its series) give NaN.
+        """
+        start, end = to_datetime64(start), to_datetime64(end)
+        location = np.broadcast_to(np.asarray(location, dtype=object), start.shape)
+        codes, uniques = pd.factorize(pd.Series(location, dtype=object))
+        integrated = np.full(start.shape, np.nan)
+        for code, loc in enumerate(uniques):
+            series = self.series.get(loc)
+            if series is None:
+                continue
+            rows = codes == code
+            integrated[rows] = series.integrate(start[rows], end[rows])
+        return integrated
+
+
+def get_hourly_carbon_intensity(versioned_data: dict):
+    """
+    Returns the hourly carbon intensity series of the version of the given backend data,
+    loaded once per version and per process.
+    """
+    return DATA_REGISTRY.get_index(versioned_data['version'], 'hourly_CI', HourlyCarbonIntensity)
+
+
+def compute_emissions_over_windows(power_needed, start, end, location, versioned_data: dict, mult_factor=1):
+    """
+    Carbon emissions of jobs drawing a constant power over their [start, end) window,
+    using the hourly carbon intensity of their location.
+
+    Args:
+        power_needed: power draw of the jobs, PUE included, in W (see compute_footprint).
+        start, end: the windows of the jobs (timestamps in UTC).
+        location: location code of the jobs (keys of CI_dict_byLoc).
+        mult_factor: number of times each job is run over the same window.
+
+    Returns:
+        The emissions of the jobs, in gCO2e, NaN for those not covered by any hourly series.
+    """
+    integrated = get_hourly_carbon_intensity(versioned_data).integrate(location, start, end)
+    return np.asarray(power_needed, dtype=float) / 1000 * integrated * np.asarray(mult_factor, dtype=float)
+
+
+###################################################
+## START TIME RECOMMENDATION
+
+def sliding_window_argmin(values: np.ndarray, width: int):
+    """
+    For each position i, returns the position of the minimum of values[i:i+width]
+    (the first one in case of ties), in a single pass keeping a queue of candidates.
+    """
+    n = len(values)
+    argmins = np.empty(n, dtype=np.intp)
+    candidates = collections.deque()
+    # the window starting at i ends at i + width - 1: windows are filled from the end
+    for j in range(n - 1, -1, -1):
+        while candidates and values[candidates[-1]] >= values[j]:
+            candidates.pop()
+        candidates.append(j)
+        if candidates[0] >= j + width:
+            candidates.popleft()
+        argmins[j] = candidates[0]
+    return argmins
+
+
+def window_integrals(series: HourlySeries, runTime: float):
+    """
+    Carbon intensity integrated over the window of a job of runTime hours (float)
+    started at each hour of the series, inf for the jobs that would end after the series.
+    """
+    starts = np.arange(len(series), dtype=float)
+    integrals = series.cumulative(starts + runTime) - series.cumulative(starts)
+    return np.where(np.isnan(integrals), np.inf, integrals)
+
+
+# Number of candidate windows evaluated at once when they are evaluated job by job
+MAX_CANDIDATES_PER_CHUNK = 1_000_000
+
+
+def best_whole_hours(series: HourlySeries, first_hours: np.ndarray, widths: np.ndarray, runTime: np.ndarray):
+    """
+    For each job, finds the hour of the series within [first_hours, first_hours + widths) at which
+    starting a job of runTime hours integrates the least carbon intensity.
+    Jobs sharing the same runtime and width share a sliding window pass over the whole series when
+    they are numerous enough for it to be cheaper than evaluating each of their candidates,
+    which is done for the other jobs by chunks of at most MAX_CANDIDATES_PER_CHUNK windows.
+
+    Returns:
+        The best hours and their integrals (inf when no window fits in the series).
+    """
+    best_hours = np.empty(len(first_hours), dtype=np.intp)
+    best_integrals = np.full(len(first_hours), np.inf)
+
+    groups = pd.DataFrame({'runTime': runTime, 'width': widths}).groupby(['runTime', 'width'], sort=False).ngroup().to_numpy()
+    shared = np.bincount(groups)[groups] * widths >= len(series)
+    for group in np.unique(groups[shared]):
+        rows = np.flatnonzero(groups == group)
+        integrals = window_integrals(series, runTime[rows[0]])
+        best_hours[rows] = sliding_window_argmin(integrals, widths[rows[0]])[first_hours[rows]]
+        best_integrals[rows] = integrals[best_hours[rows]]
+
+    direct = np.flatnonzero(~shared)
+    if len(direct) > 0:
+        chunk_size = max(1, MAX_CANDIDATES_PER_CHUNK // int(widths[direct].max()))
+        for i in range(0, len(direct), chunk_size):
+            rows = direct[i:i + chunk_size]
+            offsets = np.arange(widths[rows].max())
+            candidates = first_hours[rows, None] + offsets
+            integrals = series.cumulative(candidates + runTime[rows, None]) - series.cumulative(candidates)
+            integrals[np.isnan(integrals) | (offsets >= widths[rows, None])] = np.inf
+            best_offsets = integrals.argmin(axis=1)
+            best_hours[rows] = first_hours[rows] + best_offsets
+            best_integrals[rows] = integrals[np.arange(len(rows)), best_offsets]
+    return best_hours, best_integrals
+
+
+def recommend_start_times(location, earliest, runTime, horizon, versioned_data: dict):
+    """
+    Finds, for each job, the start time minimising its emissions among its earliest start
+    and the whole hours between it and the end of its horizon.
+    The integrals of the possible windows are computed from the prefix sums of the series
+    of each location, and the best one within each horizon is found by best_whole_hours.
+
+    Args:
+        location: location code of the jobs (keys of CI_dict_byLoc).
+        earliest: earliest start time of the jobs (timestamps in UTC).
+        runTime: running time of the jobs, in hours.
+        horizon: number of hours after the earliest start during which the jobs can start.
+
+    Returns:
+        The best start times (NaT when no hourly series covers any of the possible windows),
+        along with the carbon intensity integrated over the best window and over the window
+        starting at the earliest time (in gCO2e/kWh x h, NaN when not covered).
+    """
+    hourly_CI = get_hourly_carbon_intensity(versioned_data)
+    earliest = to_datetime64(earliest)
+    n_jobs = len(earliest)
+    location = np.broadcast_to(np.asarray(location, dtype=object), (n_jobs,))
+    runTime = np.broadcast_to(np.asarray(runTime, dtype=float), (n_jobs,))
+    horizon = np.broadcast_to(np.asarray(horizon, dtype=np.intp), (n_jobs,))
+
+    best_start = np.full(n_jobs, np.datetime64('NaT'), dtype='datetime64[ns]')
+    best_integral = np.full(n_jobs, np.nan)
+    integral_at_earliest = hourly_CI.integrate(
+        location, earliest, earliest + (runTime * 3600e9).astype('timedelta64[ns]')
+    )
+
+    codes, uniques = pd.factorize(pd.Series(location, dtype=object))
+    for code, loc in enumerate(uniques):
+        series = hourly_CI.get(loc)
+        if series is None:
+            continue
+        rows = np.flatnonzero(codes == code)
+        earliest_hours = series.to_hours(earliest[rows])
+        # jobs that can start before the series can still start at its first hour
+        first_hours = np.maximum(np.ceil(earliest_hours), 0)
+        # number of whole hours between the earliest start and the end of the horizon
+        widths = np.floor(earliest_hours + horizon[rows]) - first_hours + 1
+        covered = (first_hours >= 0) & (first_hours < len(series)) & (widths > 0)
+        rows = rows[covered]
+        best_hours, integrals = best_whole_hours(
+            series, first_hours[covered].astype(np.intp), widths[covered].astype(np.intp), runTime[rows]
+        )
+        found = np.isfinite(integrals)
+        rows, best_hours = rows[found], best_hours[found]
+        best_start[rows] = series.start + best_hours * ONE_HOUR
+        best_integral[rows] = integrals[found]
+
+    # the earliest start itself is a candidate as well, when it is not a whole hour
+    earliest_is_better = ~(best_integral <= integral_at_earliest) & ~np.isnan(integral_at_earliest)
+    best_start[earliest_is_better] = earliest[earliest_is_better]
+    best_integral[earliest_is_better] = integral_at_earliest[earliest_is_better]
+    return best_start, best_integral, integral_at_earliest
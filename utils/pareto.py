@@ -0,0 +1,113 @@
+"""
+Trade-off between the emissions and the runtime of a workload.
+
+A workload is given as a number of core-hours (or GPU-hours) on a single core, and can be spread over
+any number n of cores. Following Amdahl's law with a parallel fraction p, it then runs for
+    runTime(n) = workload * ((1 - p) + p / n) hours,
+all the n cores being held during the whole runtime. The emissions of running it with n cores of a given
+model on a given site then use the formula of the calculator (see utils.footprint):
+    carbonEmissions = runTime(n) * (n * TDP per core * usage + memory * memoryPower) * PUE * carbonIntensity / 1000,
+the cores of all the models being assumed to be equally fast, as the data only describes their power draw.
+
+Since the runtime does not depend on the model nor on the site, a combination of a model, a site and a number
+of cores is dominated by the same number of cores of the model with the lowest TDP per core on the site with
+the lowest emissions factor (carbon intensity times PUE). The search over all the models x sites x numbers
+of cores thus reduces to a pass over the models and sites, then to the front of the numbers of cores.
+The sites are grouped by platform (the locations, then each cloud provider), each group having its own front.
+This module does not depend on Dash.
+"""
+
+import numpy as np
+
+from utils.placement import get_sites_index
+
+
+# Default parallel fraction of the workloads and largest number of cores considered
+DEFAULT_PARALLEL_FRACTION = 0.95
+DEFAULT_MAX_CORES = 128
+
+# Group of the sites that are not datacenters
+LOCATIONS_GROUP = 'Locations'
+
+
+def pareto_front(runTime: np.ndarray, carbonEmissions: np.ndarray):
+    """
+    Returns the positions of the points that are not dominated, i.e. such that no other point has
+    both a lower or equal runtime and lower or equal emissions (one being strictly lower),
+    sorted by increasing runtime. Runs in O(n log n) by scanning the points sorted by runtime.
+    """
+    order = np.lexsort((carbonEmissions, runTime))
+    sorted_emissions = carbonEmissions[order]
+    # a point is on the front when it emits strictly less than all the faster ones
+    previous_min = np.concatenate([[np.inf], np.minimum.accumulate(sorted_emissions)[:-1]])
+    return order[sorted_emissions < previous_min]
+
+
+def workload_runtime(workload: float, n_cores: np.ndarray, parallel_fraction: float):
+    """ Runtime (in hours) of a workload of core-hours spread over n_cores cores, see Amdahl's law above. """
+    return workload * ((1 - parallel_fraction) + parallel_fraction / n_cores)
+
+
+def optimise_workload(workload: float, coreType: str, models: list, memory: float, usage: float,
+                      location_PUE: float, versioned_data: dict,
+                      parallel_fraction: float = DEFAULT_PARALLEL_FRACTION, max_cores: int = DEFAULT_MAX_CORES):
+    """
+    Computes the Pareto front of the emissions vs runtime of a workload, for each group of sites
+    and over all of them.
+
+    Args:
+        workload (float): number of core-hours (CPU) or GPU-hours (GPU) on a single core.
+        coreType (str): 'CPU' or 'GPU'.
+        models (list): the models of cores_dict[coreType] considered (all of them when empty).
+        memory (float): memory available, in GB.
+        usage (float): usage factor of the cores.
+        location_PUE (float): the PUE used for the locations, the datacenters using their own.
+        parallel_fraction (float): fraction of the workload that can be parallelised, between 0 and 1.
+        max_cores (int): the numbers of cores considered range from 1 to max_cores.
+
+    Returns:
+        The points of the front of each group of sites (as a dictionary), and those of the overall front.
+        Each point is described by its group, site, model, number of cores, runtime (in hours),
+        energy needed (in kWh) and carbon emissions (in gCO2e).
+    """
+    models_TDP = versioned_data['cores_dict'][coreType]
+    models = [model for model in models if model in models_TDP] or list(models_TDP)
+    best_model = min(models, key=lambda model: (models_TDP[model], model))
+
+    n_cores = np.arange(1, max_cores + 1)
+    runTime = workload_runtime(workload, n_cores, parallel_fraction)
+    # energy needed without any overhead (PUE of 1), in kWh
+    energy_needed = runTime * (n_cores * models_TDP[best_model] * usage + memory * versioned_data['refValues_dict']['memoryPower']) / 1000
+
+    sites = get_sites_index(versioned_data)
+    PUE = np.where(sites.is_datacenter, sites.PUE, location_PUE)
+    emissions_factor = PUE * sites.carbonIntensity
+    groups = np.where(sites.is_datacenter, sites.provider, LOCATIONS_GROUP)
+
+    fronts = {}
+    all_points = []
+    for group in [LOCATIONS_GROUP] + sorted(set(sites.provider[sites.is_datacenter])):
+        in_group = np.flatnonzero(groups == group)
+        if len(in_group) == 0:
+            continue
+        best_site = in_group[np.argmin(emissions_factor[in_group])]
+        carbonEmissions = energy_needed * emissions_factor[best_site]
+        fronts[group] = [
+            {
+                'group': group,
+                'site': sites.label[best_site],
+                'model': best_model,
+                'cores': int(n_cores[i]),
+                'runTime': float(runTime[i]),
+                'energy_needed': float(energy_needed[i] * PUE[best_site]),
+                'carbonEmissions': float(carbonEmissions[i]),
+            }
+            for i in pareto_front(runTime, carbonEmissions)
+        ]
+        all_points += fronts[group]
+
+    overall = pareto_front(
+        np.array([point['runTime'] for point in all_points], dtype=float),
+        np.array([point['carbonEmissions'] for point in all_points], dtype=float),
+    )
+    return fronts, [all_points[i] for i in overall]
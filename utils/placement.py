@@ -0,0 +1,247 @@
+"""
+Where would a job emit least?
+
+All the places where a job can run (the locations of CI_dict_byLoc and the datacenters of
+datacenters_dict_byName) are gathered once per data version in a columnar index (see SitesIndex).
+The emissions of a job for every place and every hardware option are then computed at once,
+as the outer product of the energy needed by each hardware option and of the
+carbon intensity times PUE of each place.
+This module does not depend on Dash.
+"""
+
+import numpy as np
+
+from utils.handle_inputs import DATA_REGISTRY
+from utils.footprint import get_platform_PUE, compute_footprint
+
+
+LOCATION = 'location'
+DATACENTER = 'datacenter'
+
+# Default and maximum number of datacenters returned by the lowest-carbon queries
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 100
+
+
+class SitesIndex:
+    """
+    Columnar description of the places where a job can run, one array per attribute.
+    The PUE of the datacenters is the one used by the form for cloud servers
+    (see get_platform_PUE), while that of the locations is NaN since it depends on the platform.
+    Datacenters whose location has no known carbon intensity are left out.
+    """
+
+    def __init__(self, versioned_data: dict):
+        names, labels, kinds, providers, continents, countries, carbonIntensities, PUEs = [], [], [], [], [], [], [], []
+        CI_dict_byLoc = versioned_data['CI_dict_byLoc']
+
+        for location, location_data in CI_dict_byLoc.items():
+            names.append(location)
+            if location_data['regionName'] == 'Any':
+                labels.append(location_data['countryName'])
+            else:
+                labels.append(f"{location_data['countryName']} ({location_data['regionName']})")
+            kinds.append(LOCATION)
+            providers.append('')
+            continents.append(location_data['continentName'])
+            countries.append(location_data['countryName'])
+            carbonIntensities.append(location_data['carbonIntensity'])
+            PUEs.append(np.nan)
+
+        for name, datacenter in versioned_data['datacenters_dict_byName'].items():
+            location_data = CI_dict_byLoc.get(datacenter['location'])
+            if location_data is None:
+                continue
+            names.append(name)
+            labels.append(f"{datacenter['provider']} {datacenter['Name']}")
+            kinds.append(DATACENTER)
+            providers.append(datacenter['provider'])
+            continents.append(location_data['continentName'])
+            countries.append(location_data['countryName'])
+            carbonIntensities.append(location_data['carbonIntensity'])
+            PUEs.append(get_platform_PUE('cloudComputing', datacenter['provider'], name, versioned_data))
+
+        self.name = np.array(names, dtype=object)
+        self.label = np.array(labels, dtype=object)
+        self.kind = np.array(kinds, dtype=object)
+        self.provider = np.array(providers, dtype=object)
+        self.continent = np.array(continents, dtype=object)
+        self.country = np.array(countries, dtype=object)
+        self.carbonIntensity = np.array(carbonIntensities, dtype=float)
+        self.PUE = np.array(PUEs, dtype=float)
+        self.is_datacenter = self.kind == DATACENTER
+
+    def __len__(self):
+        return len(self.name)
+
+
+def get_sites_index(versioned_data: dict):
+    """ Returns the SitesIndex of the version of the given backend data, built once per version and per process. """
+    return DATA_REGISTRY.get_index(versioned_data['version'], 'sites', SitesIndex)
+
+
+def get_hardware_options(form_agg_data: dict, versioned_data: dict):
+    """
+    Lists the hardware the job could run on: its current hardware, then each model
+    of the cores it uses (GPUs when it uses both CPUs and GPUs), keeping the other inputs.
+
+    Returns:
+        The labels of the options, along with the arguments of compute_footprint
+        describing the cores of each option (as arrays).
+    """
+    uses_CPU = form_agg_data['coreType'] in ['CPU', 'Both']
+    uses_GPU = form_agg_data['coreType'] in ['GPU', 'Both']
+    current = dict(
+        numberCPUs=form_agg_data['numberCPUs'] if uses_CPU else 0,
+        tdpCPU=form_agg_data['tdpCPU'],
+        usageCPU=form_agg_data['usageCPU'],
+        numberGPUs=form_agg_data['numberGPUs'] if uses_GPU else 0,
+        tdpGPU=form_agg_data['tdpGPU'],
+        usageGPU=form_agg_data['usageGPU'],
+    )
+    coreType = 'GPU' if uses_GPU else 'CPU'
+    models = versioned_data['cores_dict'][coreType]
+    # options using another model use it at full capacity if the usage was not given
+    usage = current[f'usage{coreType}'] or 1.
+
+    labels = ['Current hardware'] + list(models)
+    cores = {key: np.full(len(labels), value, dtype=float) for key, value in current.items()}
+    cores[f'number{coreType}s'][1:] = form_agg_data[f'number{coreType}s']
+    cores[f'tdp{coreType}'][1:] = list(models.values())
+    cores[f'usage{coreType}'][1:] = usage
+    return np.array(labels, dtype=object), cores
+
+
+def compute_emissions_matrix(form_agg_data: dict, runTime: float, versioned_data: dict):
+    """
+    Computes the carbon emissions of the job described by the form for every place where
+    it could run (rows) and every hardware option (columns, see get_hardware_options).
+
+    The datacenters use their own PUE. The locations use the PUE of the job, unless it runs
+    in the cloud in which case that of an unknown data centre is used.
+
+    Returns:
+        The SitesIndex, the PUE used for each site, the labels of the hardware options
+        and the matrix of the emissions (in gCO2e).
+    """
+    sites = get_sites_index(versioned_data)
+    hardware_labels, cores = get_hardware_options(form_agg_data, versioned_data)
+
+    # Energy needed by each hardware option without any overhead (PUE of 1)
+    energy_needed = compute_footprint(
+        runTime=runTime,
+        PUE=1,
+        memory=form_agg_data['memory'],
+        memoryPower=versioned_data['refValues_dict']['memoryPower'],
+        carbonIntensity=1,
+        mult_factor=form_agg_data['mult_factor'],
+        **cores,
+    )['energy_needed']
+
+    if form_agg_data['platformType'] == 'cloudComputing':
+        location_PUE = versioned_data['pueDefault_dict']['Unknown']
+    else:
+        location_PUE = form_agg_data['PUE']
+    PUE = np.where(sites.is_datacenter, sites.PUE, location_PUE)
+    return sites, PUE, hardware_labels, np.outer(PUE * sites.carbonIntensity, energy_needed)
+
+
+def rank_sites(emissions: np.ndarray):
+    """ Returns the positions of the sites sorted from the lowest to the highest emissions. """
+    return np.argsort(emissions, kind='stable')
+
+
+class DatacenterIndex:
+    """
+    The datacenters of datacenters_dict_byProvider sorted by their effective emissions factor
+    (carbon intensity of their location times their PUE, in gCO2e/kWh of IT energy), along with the
+    positions of the datacenters of each provider, continent and provider-continent pair in that order.
+    Datacenters whose location has no known carbon intensity are left out.
+    """
+
+    def __init__(self, versioned_data: dict):
+        rows = []
+        CI_dict_byLoc = versioned_data['CI_dict_byLoc']
+        for provider, datacenters in versioned_data['datacenters_dict_byProvider'].items():
+            for datacenter in datacenters.values():
+                location_data = CI_dict_byLoc.get(datacenter['location'])
+                if location_data is None:
+                    continue
+                PUE = get_platform_PUE('cloudComputing', provider, datacenter['name_unique'], versioned_data)
+                rows.append((
+                    location_data['carbonIntensity'] * PUE,
+                    datacenter['name_unique'],
+                    provider,
+                    datacenter['Name'],
+                    datacenter['location'],
+                    location_data['continentName'],
+                    location_data['countryName'],
+                    location_data['carbonIntensity'],
+                    PUE,
+                ))
+        # ties are broken by name so that the order does not depend on the data files
+        rows.sort(key=lambda row: (row[0], row[1]))
+        columns = list(zip(*rows)) or [()] * 9
+
+        self.emissionsFactor = np.array(columns[0], dtype=float)
+        self.name_unique = np.array(columns[1], dtype=object)
+        self.provider = np.array(columns[2], dtype=object)
+        self.Name = np.array(columns[3], dtype=object)
+        self.location = np.array(columns[4], dtype=object)
+        self.continent = np.array(columns[5], dtype=object)
+        self.country = np.array(columns[6], dtype=object)
+        self.carbonIntensity = np.array(columns[7], dtype=float)
+        self.PUE = np.array(columns[8], dtype=float)
+
+        self.positions = {(None, None): np.arange(len(rows))}
+        for i, (provider, continent) in enumerate(zip(self.provider, self.continent)):
+            for key in [(provider, None), (None, continent), (provider, continent)]:
+                self.positions.setdefault(key, []).append(i)
+        self.positions = {key: np.asarray(positions, dtype=np.intp) for key, positions in self.positions.items()}
+
+    def __len__(self):
+        return len(self.name_unique)
+
+    def top_k(self, k: int = 5, provider: str = None, continent: str = None, max_carbon_intensity: float = None):
+        """
+        Returns the positions of the k datacenters with the lowest emissions factor,
+        among those of the given provider and continent and whose carbon intensity
+        does not exceed max_carbon_intensity (None meaning no constraint).
+        """
+        positions = self.positions.get((provider or None, continent or None))
+        if positions is None:
+            return np.empty(0, dtype=np.intp)
+        if max_carbon_intensity is not None:
+            positions = positions[self.carbonIntensity[positions] <= max_carbon_intensity]
+        return positions[:k]
+
+    def records(self, positions):
+        """ Describes the datacenters at the given positions as a list of dictionaries. """
+        return [
+            {
+                'name_unique': self.name_unique[i],
+                'provider': self.provider[i],
+                'Name': self.Name[i],
+                'location': self.location[i],
+                'continent': self.continent[i],
+                'country': self.country[i],
+                'carbonIntensity': float(self.carbonIntensity[i]),
+                'PUE': float(self.PUE[i]),
+                'emissionsFactor': float(self.emissionsFactor[i]),
+            }
+            for i in positions
+        ]
+
+
+def get_datacenter_index(versioned_data: dict):
+    """ Returns the DatacenterIndex of the version of the given backend data, built once per version and per process. """
+    return DATA_REGISTRY.get_index(versioned_data['version'], 'datacenters', DatacenterIndex)
+
+
+def lowest_carbon_datacenters(versioned_data: dict, k: int = 5, provider: str = None, continent: str = None, max_carbon_intensity: float = None):
+    """
+    Returns the k datacenters with the lowest emissions factor (carbon intensity times PUE)
+    matching the constraints, see DatacenterIndex.top_k.
+    """
+    index = get_datacenter_index(versioned_data)
+    return index.records(index.top_k(k, provider, continent, max_carbon_intensity))
@@ -0,0 +1,304 @@
+"""
+Replay of a queue of jobs on a cluster, under different scheduling policies.
+
+The jobs are described with the same fields as the csv exported from the app (see utils.batch),
+plus the time at which they were submitted (SUBMIT_TIME_KEY, in UTC). Their footprint is first computed
+for all of them at once by utils.batch. They are then scheduled on the sites of the cluster by a
+discrete-event simulation, which only keeps track of the cores and GPUs in use. Finally, their emissions
+are accounted for at once over the windows during which they actually ran, with the hourly carbon
+intensity of the site they ran on when available (see utils.hourly_ci), and its annual average otherwise.
+
+Scheduling policies (see POLICIES):
+    - fifo: each job runs at its own location, in the order of submission, as soon as enough cores are free,
+    - carbon_delay: same as fifo, but each job is only released at the start time minimising its emissions
+      within max_delay hours of its submission (see recommend_start_times),
+    - cross_site: the jobs are queued in the order of submission and each one runs on the site with the
+      lowest carbon intensity at the time, among those where enough cores are free.
+The power drawn by a job, PUE included, is the same wherever it runs, and a job with a multiplicative
+factor runs once on the cluster while its emissions are multiplied by it, as in the form.
+This module does not depend on Dash.
+
+It can also be run from the command line, the sites being given as LOCATION:CORES[:GPUS]:
+    python -m utils.simulation jobs.csv --policy carbon_delay --max-delay 24 --site FR:1024:32 --site DE:512
+"""
+
+import sys
+import math
+import heapq
+import argparse
+import collections
+
+import numpy as np
+import pandas as pd
+
+from utils.handle_inputs import CURRENT_VERSION, get_pinned_versioned_data
+from utils.batch import INVALID_INPUTS_KEY, START_TIME_KEY, estimate_batch_from_dataframe, parse_start_time
+from utils.hourly_ci import ONE_HOUR, get_hourly_carbon_intensity, compute_emissions_over_windows, recommend_start_times
+
+
+FIFO = 'fifo'
+CARBON_DELAY = 'carbon_delay'
+CROSS_SITE = 'cross_site'
+POLICIES = [FIFO, CARBON_DELAY, CROSS_SITE]
+
+# Column with the time (in UTC) at which each job was submitted. When missing, the start time of the
+# jobs in the history is used instead.
+SUBMIT_TIME_KEY = 'submitTime'
+
+# Columns added to each job by the simulation
+SIMULATION_OUTPUT_KEYS = [
+    'site',
+    'simulatedStartTime',
+    'simulatedEndTime',
+    'waitTime',
+    'carbonEmissions_simulated',
+]
+
+# Events of the simulation. At equal times, the jobs finishing free their cores before others are released.
+FINISH = 0
+RELEASE = 1
+
+ONE_SECOND = np.timedelta64(1, 's')
+
+
+def parse_site(site: str):
+    """ Parses a site given as LOCATION:CORES[:GPUS] on the command line. """
+    location, *capacities = site.split(':')
+    if not 1 <= len(capacities) <= 2:
+        raise argparse.ArgumentTypeError(f'Sites should be given as LOCATION:CORES[:GPUS], not {site}')
+    cores = int(capacities[0])
+    gpus = int(capacities[1]) if len(capacities) == 2 else 0
+    return location, {'cores': cores, 'gpus': gpus}
+
+
+class SiteCarbonIntensity:
+    """
+    Carbon intensity of the sites at a given number of seconds since the start of the simulation,
+    taken from their hourly series when covered and from their annual average otherwise.
+    Used by the cross_site policy, which needs it event by event.
+    """
+
+    def __init__(self, sites: list, origin: np.datetime64, versioned_data: dict):
+        hourly_CI = get_hourly_carbon_intensity(versioned_data)
+        self.annual = [versioned_data['CI_dict_byLoc'][site]['carbonIntensity'] for site in sites]
+        self.hourly, self.offsets = [], []
+        for site in sites:
+            series = hourly_CI.get(site)
+            self.hourly.append(None if series is None else series.carbonIntensity.tolist())
+            self.offsets.append(None if series is None else float(series.to_hours(origin)[0]))
+
+    def at(self, site: int, seconds: float):
+        hourly = self.hourly[site]
+        if hourly is not None:
+            hour = math.floor(seconds / 3600 + self.offsets[site])
+            if 0 <= hour < len(hourly):
+                return hourly[hour]
+        return self.annual[site]
+
+
+def schedule(release: np.ndarray, runTime: np.ndarray, cores: np.ndarray, gpus: np.ndarray, sites: np.ndarray,
+             capacities: list, site_CI: SiteCarbonIntensity = None):
+    """
+    Discrete-event simulation of the jobs on the sites, driven by a heap of the release and end times of the jobs.
+    A job waits in its queue until enough cores and GPUs are free on a site, without being overtaken by the
+    jobs released after it in the same queue.
+
+    Args:
+        release (np.ndarray): time at which each job is released, in seconds since the start of the simulation.
+        Jobs with the same release time are released in the order of their positions.
+        runTime (np.ndarray): running time of each job, in seconds.
+        cores, gpus (np.ndarray): number of cores and GPUs used by each job.
+        sites (np.ndarray): position of the site of each job, in capacities.
+        capacities (list): the number of cores and GPUs of each site (as dictionaries, inf meaning unlimited).
+        site_CI (SiteCarbonIntensity, optional): when given, all the jobs are in the same queue
+        and each one runs on the site with the lowest carbon intensity among those where it fits.
+
+    Returns:
+        The start time of each job and the site it ran on. Jobs that do not fit on any site
+        are not run, with a NaN start time.
+    """
+    n_jobs = len(release)
+    start = np.full(n_jobs, np.nan)
+    ran_on = np.array(sites, dtype=np.intp)
+    free_cores = [capacity['cores'] for capacity in capacities]
+    free_gpus = [capacity['gpus'] for capacity in capacities]
+    cores, gpus, runTime, release = cores.tolist(), gpus.tolist(), runTime.tolist(), release.tolist()
+    sites = ran_on.tolist()
+
+    if site_CI is None:
+        fits = [(cores[job] <= free_cores[sites[job]]) and (gpus[job] <= free_gpus[sites[job]]) for job in range(n_jobs)]
+    else:
+        fits = [any(cores[job] <= c and gpus[job] <= g for c, g in zip(free_cores, free_gpus)) for job in range(n_jobs)]
+    events = [(release[job], RELEASE, job) for job in range(n_jobs) if fits[job]]
+    heapq.heapify(events)
+    queues = collections.defaultdict(collections.deque)
+
+    def dispatch(queue_key, now):
+        queue = queues[queue_key]
+        while queue:
+            job = queue[0]
+            if site_CI is None:
+                site = sites[job]
+                if (cores[job] > free_cores[site]) or (gpus[job] > free_gpus[site]):
+                    return
+            else:
+                candidates = [
+                    site for site in range(len(capacities))
+                    if (cores[job] <= free_cores[site]) and (gpus[job] <= free_gpus[site])
+                ]
+                if not candidates:
+                    return
+                site = min(candidates, key=lambda candidate: site_CI.at(candidate, now))
+            queue.popleft()
+            free_cores[site] -= cores[job]
+            free_gpus[site] -= gpus[job]
+            start[job] = now
+            sites[job] = site
+            heapq.heappush(events, (now + runTime[job], FINISH, job))
+
+    while events:
+        now, event, job = heapq.heappop(events)
+        queue_key = None if site_CI is not None else sites[job]
+        if event == FINISH:
+            free_cores[sites[job]] += cores[job]
+            free_gpus[sites[job]] += gpus[job]
+        else:
+            queues[queue_key].append(job)
+        dispatch(queue_key, now)
+
+    ran_on[:] = sites
+    return start, ran_on
+
+
+def simulate(jobs_df: pd.DataFrame, policy: str = FIFO, sites: dict = None, max_delay: int = 0, data_version: str = CURRENT_VERSION):
+    """
+    Replays the queue of jobs under the scheduling policy (see POLICIES).
+
+    Args:
+        jobs_df (pd.DataFrame): the jobs, with the same columns as the csv exported from the app
+        and their submission time (see SUBMIT_TIME_KEY).
+        sites (dict, optional): the number of cores and GPUs of each site of the cluster by location code,
+        e.g. {'FR': {'cores': 1024, 'gpus': 32}}. The locations of the jobs that are not listed have an
+        unlimited capacity, and the cross_site policy places the jobs on the listed sites only
+        (on all the locations of the jobs when none is listed).
+        max_delay (int): number of hours the jobs can be delayed by with the carbon_delay policy.
+        data_version (str): the data used for all the jobs, which can be any directory under data/.
+
+    Returns:
+        The jobs with the outputs of estimate_batch_from_dataframe and those of the simulation (see
+        SIMULATION_OUTPUT_KEYS, the wait time being in hours), along with a summary of the simulation.
+        Jobs with invalid inputs or a missing submission time, as well as those that do not fit on their
+        site, are not simulated.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f'Unknown policy: {policy}')
+    versioned_data = get_pinned_versioned_data(data_version)
+    sites = dict(sites or {})
+    unknown_sites = [site for site in sites if site not in versioned_data['CI_dict_byLoc']]
+    if unknown_sites:
+        raise ValueError(f"Unknown locations: {', '.join(unknown_sites)}")
+
+    results_df = estimate_batch_from_dataframe(jobs_df, data_version=data_version)
+    submit_key = SUBMIT_TIME_KEY if SUBMIT_TIME_KEY in jobs_df else START_TIME_KEY
+    submit = parse_start_time(jobs_df[submit_key].to_numpy()) if submit_key in jobs_df else \
+        np.full(len(results_df), np.datetime64('NaT'), dtype='datetime64[ns]')
+    for key in SIMULATION_OUTPUT_KEYS:
+        results_df[key] = None
+
+    valid = (results_df[INVALID_INPUTS_KEY] == '').to_numpy() & ~np.isnat(submit)
+    jobs = results_df.loc[valid]
+    submit = submit[valid]
+    runTime = jobs['runTime'].to_numpy(dtype=float)
+    power_needed = jobs['power_needed'].to_numpy(dtype=float)
+    mult_factor = jobs['mult_factor'].to_numpy(dtype=float)
+    coreType = jobs['coreType'].to_numpy()
+    cores = np.where(np.isin(coreType, ['CPU', 'Both']), jobs['numberCPUs'], 0).astype(float)
+    gpus = np.where(np.isin(coreType, ['GPU', 'Both']), jobs['numberGPUs'], 0).astype(float)
+    location = jobs['location'].to_numpy(dtype=object)
+
+    # Times of the simulation are counted in seconds since the first submission
+    origin = submit.min() if len(submit) > 0 else np.datetime64('NaT', 'ns')
+    release = (submit - origin) / ONE_SECOND
+    if (policy == CARBON_DELAY) and (len(submit) > 0):
+        best_start, _, _ = recommend_start_times(location, submit, runTime, max_delay, versioned_data)
+        release = np.where(np.isnat(best_start), release, (best_start - origin) / ONE_SECOND)
+
+    if policy == CROSS_SITE:
+        site_names = list(sites) or list(pd.unique(location))
+        site_CI = SiteCarbonIntensity(site_names, origin, versioned_data)
+        job_sites = np.zeros(len(jobs), dtype=np.intp)
+    else:
+        job_sites, site_names = pd.factorize(pd.Series(location, dtype=object))
+        site_names = list(site_names)
+        site_CI = None
+    capacities = [
+        {key: sites[site].get(key, 0) for key in ['cores', 'gpus']} if site in sites else {'cores': math.inf, 'gpus': math.inf}
+        for site in site_names
+    ]
+    # jobs are queued in the order of their release, then of their submission
+    order = np.lexsort((submit, release))
+    start, ran_on = np.full(len(jobs), np.nan), np.zeros(len(jobs), dtype=np.intp)
+    start[order], ran_on[order] = schedule(
+        release[order], runTime[order] * 3600, cores[order], gpus[order], np.asarray(job_sites)[order], capacities, site_CI
+    )
+
+    # Vectorized accounting over the windows during which the jobs ran
+    scheduled = ~np.isnan(start)
+    site = np.array(site_names, dtype=object)[ran_on]
+    start_time = origin + np.round(np.where(scheduled, start, 0) * 1e9).astype('timedelta64[ns]')
+    end_time = start_time + (runTime * 3600e9).astype('timedelta64[ns]')
+    carbonEmissions = compute_emissions_over_windows(power_needed, start_time, end_time, site, versioned_data, mult_factor)
+    annual_CI = np.array([versioned_data['CI_dict_byLoc'][name]['carbonIntensity'] for name in site_names], dtype=float)[ran_on]
+    carbonEmissions = np.where(np.isnan(carbonEmissions), power_needed / 1000 * runTime * annual_CI * mult_factor, carbonEmissions)
+
+    simulated_rows = results_df.index[valid][scheduled]
+    results_df.loc[simulated_rows, 'site'] = site[scheduled]
+    results_df.loc[simulated_rows, 'simulatedStartTime'] = np.datetime_as_string(start_time[scheduled], unit='m')
+    results_df.loc[simulated_rows, 'simulatedEndTime'] = np.datetime_as_string(end_time[scheduled], unit='m')
+    results_df.loc[simulated_rows, 'waitTime'] = (start_time[scheduled] - submit[scheduled]) / ONE_HOUR
+    results_df.loc[simulated_rows, 'carbonEmissions_simulated'] = carbonEmissions[scheduled]
+
+    wait_time = (start_time[scheduled] - submit[scheduled]) / ONE_HOUR
+    summary = {
+        'policy': policy,
+        'appVersion': versioned_data['version'],
+        'jobs': len(results_df),
+        'simulated_jobs': int(scheduled.sum()),
+        'invalid_jobs': int((~valid).sum()),
+        'unscheduled_jobs': int((~scheduled).sum()),
+        'energy_needed': float(jobs['energy_needed'].to_numpy(dtype=float)[scheduled].sum()),
+        'carbonEmissions': float(carbonEmissions[scheduled].sum()),
+        'mean_waitTime': float(wait_time.mean()) if len(wait_time) > 0 else None,
+        'max_waitTime': float(wait_time.max()) if len(wait_time) > 0 else None,
+    }
+    return results_df, summary
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.simulation',
+        description='Replays a queue of jobs on a cluster under a scheduling policy, '
+                    'and reports the energy needed and carbon emissions of the jobs.',
+    )
+    parser.add_argument('manifest', help="csv (';'-separated) file of jobs, with their submission time, '-' for stdin")
+    parser.add_argument('-o', '--output', default=None, help='csv file where the simulated jobs are written')
+    parser.add_argument('--policy', choices=POLICIES, default=FIFO, help='scheduling policy (default: fifo)')
+    parser.add_argument('--max-delay', type=int, default=24, help='number of hours the jobs can be delayed by with the carbon_delay policy')
+    parser.add_argument('--site', type=parse_site, action='append', default=[],
+                        help='site of the cluster, as LOCATION:CORES[:GPUS] (can be repeated)')
+    parser.add_argument('--data-version', default=CURRENT_VERSION, help='data used for all the jobs, any directory under data/')
+    parser.add_argument('--sep', default=';', help="separator of the csv files (default: ';')")
+    args = parser.parse_args(argv)
+
+    jobs_df = pd.read_csv(sys.stdin if args.manifest == '-' else args.manifest, sep=args.sep)
+    results_df, summary = simulate(
+        jobs_df, policy=args.policy, sites=dict(args.site), max_delay=args.max_delay, data_version=args.data_version
+    )
+    if args.output is not None:
+        results_df.to_csv(args.output, sep=args.sep, index=False)
+    for key, value in summary.items():
+        print(f'{key}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Uncertainty of the footprint of a job, estimated by Monte Carlo sampling.
+
+The PUE, usage factors, TDP per core and carbon intensity can be given as distributions
+around the values used for the point estimate. All the samples are drawn at once as NumPy
+arrays and run through the same kernel as the point estimate (see utils.footprint),
+which gives the percentiles of the energy needed and of the carbon emissions.
+This module does not depend on Dash.
+"""
+
+import numpy as np
+
+from utils.footprint import compute_footprint
+
+
+DISTRIBUTIONS = ['uniform', 'triangular', 'normal']
+
+# Inputs that can be uncertain, along with the bounds of their samples
+UNCERTAIN_INPUTS = {
+    'PUE': (1, np.inf),
+    'usage': (0, 1),
+    'tdp': (0, np.inf),
+    'carbonIntensity': (0, np.inf),
+}
+
+# Relative spread of each uncertain input used by default
+DEFAULT_UNCERTAINTIES = {
+    'PUE': {'distribution': 'triangular', 'spread': 0.1},
+    'usage': {'distribution': 'uniform', 'spread': 0.},
+    'tdp': {'distribution': 'triangular', 'spread': 0.1},
+    'carbonIntensity': {'distribution': 'normal', 'spread': 0.15},
+}
+
+N_SAMPLES = 100_000
+
+PERCENTILES = [5, 50, 95]
+
+# Outputs whose percentiles are computed
+UNCERTAIN_OUTPUTS = ['energy_needed', 'carbonEmissions']
+
+
+def percentile_key(output_key: str, percentile: int):
+    """ Key of a percentile in the results, e.g. carbonEmissions_p95. """
+    return f'{output_key}_p{percentile}'
+
+
+# Keys of the results of footprint_percentiles, also used in the exported csv
+PERCENTILE_KEYS = [percentile_key(key, percentile) for key in UNCERTAIN_OUTPUTS for percentile in PERCENTILES]
+
+
+def _draw_samples(value: float, distribution: str, width: float, n_samples: int, rng: np.random.Generator):
+    if distribution == 'uniform':
+        return rng.uniform(value - width, value + width, n_samples)
+    elif distribution == 'triangular':
+        return rng.triangular(value - width, value, value + width, n_samples)
+    elif distribution == 'normal':
+        return rng.normal(value, width, n_samples)
+    raise ValueError(f'Unknown distribution: {distribution}')
+
+
+def sample_distribution(value: float, distribution: str, spread: float, n_samples: int, rng: np.random.Generator, bounds: tuple = (-np.inf, np.inf)):
+    """
+    Draws samples of an uncertain input centred on its value.
+
+    Args:
+        value (float): the value used for the point estimate.
+        distribution (str): one of DISTRIBUTIONS.
+        spread (float): relative spread of the distribution, i.e. its half-width for the uniform
+        and triangular distributions and its standard deviation for the normal one (e.g. 0.1 for 10%).
+        bounds (tuple): the distribution is truncated to these bounds (e.g. a PUE cannot be lower than 1):
+        the samples out of the bounds are drawn again, rather than clipped which would pile them up on the bounds.
+
+    Returns:
+        An array of n_samples values, or the value itself when it is not uncertain.
+    """
+    if (spread == 0) or (value == 0):
+        return value
+    width = abs(value) * spread
+    # the distributions are symmetric around their centre, so that when it is within the bounds
+    # at least half of the samples are accepted at each draw
+    centre = min(max(value, bounds[0]), bounds[1])
+    samples = _draw_samples(centre, distribution, width, n_samples, rng)
+    out_of_bounds = np.flatnonzero((samples < bounds[0]) | (samples > bounds[1]))
+    while len(out_of_bounds) > 0:
+        samples[out_of_bounds] = _draw_samples(centre, distribution, width, len(out_of_bounds), rng)
+        out_of_bounds = out_of_bounds[(samples[out_of_bounds] < bounds[0]) | (samples[out_of_bounds] > bounds[1])]
+    return samples
+
+
+def sample_footprint(inputs: dict, uncertainties: dict, n_samples: int = N_SAMPLES, seed: int = 0):
+    """
+    Computes the footprint of a job for n_samples draws of its uncertain inputs.
+
+    Args:
+        inputs (dict): the arguments of compute_footprint for the point estimate.
+        uncertainties (dict): the distribution and spread of the uncertain inputs (see DEFAULT_UNCERTAINTIES).
+        The usage and tdp distributions apply to both CPUs and GPUs, which are sampled independently.
+        seed (int): the samples are seeded so that the same job always gets the same results.
+
+    Returns:
+        The outputs of compute_footprint, as arrays of n_samples values.
+    """
+    rng = np.random.default_rng(seed)
+    inputs = dict(inputs)
+    for input_key, bounds in UNCERTAIN_INPUTS.items():
+        uncertainty = {**DEFAULT_UNCERTAINTIES[input_key], **uncertainties.get(input_key, {})}
+        if input_key in ['usage', 'tdp']:
+            keys = [f'{input_key}CPU', f'{input_key}GPU']
+        else:
+            keys = [input_key]
+        for key in keys:
+            inputs[key] = sample_distribution(
+                inputs[key], uncertainty['distribution'], uncertainty['spread'], n_samples, rng, bounds
+            )
+    return compute_footprint(**inputs)
+
+
+def footprint_percentiles(inputs: dict, uncertainties: dict, n_samples: int = N_SAMPLES, percentiles: list = PERCENTILES, seed: int = 0):
+    """
+    Returns the percentiles of the energy needed and of the carbon emissions of a job
+    (see sample_footprint), as a flat dictionary using the keys given by percentile_key.
+    """
+    footprint = sample_footprint(inputs, uncertainties, n_samples=n_samples, seed=seed)
+    results = {}
+    for key in UNCERTAIN_OUTPUTS:
+        values = np.broadcast_to(footprint[key], (n_samples,))
+        for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+            results[percentile_key(key, percentile)] = float(value)
+    return results